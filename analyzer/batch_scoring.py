@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import config, scoring
+
+
+def _level_matrix(level_lists: List[list]) -> np.ndarray:
+    """Candidates x skills matrix of proficiency levels, zero-padded to the longest list."""
+    lengths = np.fromiter((len(levels) for levels in level_lists), dtype=np.int64, count=len(level_lists))
+    matrix = np.zeros((len(level_lists), int(lengths.max(initial=0))), dtype=np.int64)
+    # Fill all cells in one scatter: row i, columns 0..len(i)-1.
+    rows = np.repeat(np.arange(len(level_lists)), lengths)
+    columns = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, columns] = [scoring.safe_level(level) for levels in level_lists for level in levels]
+    return matrix
+
+
+class JobScoringBatch:
+    """
+    Columnar scoring inputs of one job's screenings: a candidates x skills proficiency matrix
+    for must-have and nice-to-have matches (column j is the j-th match of the analysis) plus
+    per-candidate vectors. Scores for any number of weight profiles are computed in one
+    vectorized pass and equal `scoring.weighted_score` / `scoring.final_score` exactly.
+    """
+    def __init__(
+        self,
+        requirements: dict,
+        must_have_levels: np.ndarray,
+        nice_to_have_levels: np.ndarray,
+        candidate_exp: np.ndarray,
+        certifications: np.ndarray,
+        leadership: np.ndarray,
+        quality_multiplier: np.ndarray,
+    ):
+        self.requirements = requirements
+        self.must_have_levels = must_have_levels
+        self.nice_to_have_levels = nice_to_have_levels
+        self.candidate_exp = candidate_exp
+        self.certifications = certifications
+        self.leadership = leadership
+        self.quality_multiplier = quality_multiplier
+
+    def __len__(self):
+        return len(self.candidate_exp)
+
+    @classmethod
+    def from_level_lists(
+        cls,
+        requirements: dict,
+        must_have_levels: List[list],
+        nice_to_have_levels: List[list],
+        candidate_exp: Sequence[float],
+        certifications: Sequence[int],
+        leadership: Sequence[int],
+        quality_multiplier: Sequence[float],
+    ) -> "JobScoringBatch":
+        return cls(
+            requirements,
+            _level_matrix(must_have_levels),
+            _level_matrix(nice_to_have_levels),
+            np.asarray(candidate_exp, dtype=np.float64),
+            np.asarray(certifications, dtype=np.int64),
+            np.asarray(leadership, dtype=np.int64),
+            np.asarray(quality_multiplier, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_screenings(cls, requirements: dict, screenings: List[dict]) -> "JobScoringBatch":
+        """
+        Builds the columns from per-screening dicts with the inputs of `scoring.weighted_score`:
+        {"analysis", "resume", "candidate_exp", "quality_multiplier"}.
+        """
+        must_have, nice_to_have, exp, certifications, leadership, quality = [], [], [], [], [], []
+        for screening in screenings:
+            matches = screening["analysis"].get("skill_match_analysis", {})
+            must_have.append([skill.get("proficiency_level") for skill in matches.get("must_have_matches", [])])
+            nice_to_have.append([skill.get("proficiency_level") for skill in matches.get("nice_to_have_matches", [])])
+            exp.append(screening["candidate_exp"])
+            certifications.append(len(screening["resume"].get("certifications_and_awards", [])))
+            leadership.append(len(screening["resume"].get("leadership_and_extracurriculars", [])))
+            quality.append(screening.get("quality_multiplier", 1.0))
+        return cls.from_level_lists(requirements, must_have, nice_to_have, exp, certifications, leadership, quality)
+
+    def unadjusted_scores(self, profiles: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Weighted scores before the quality multiplier, shape (len(profiles), candidates).
+        Every operation mirrors `scoring.score_features` in the same order, so the floating
+        point results, and therefore the truncated scores, are identical.
+        """
+        profiles = list(profiles or [config.SCORING_PROFILE])
+        weights = [scoring.get_weights(self.requirements, profile) for profile in profiles]
+
+        def column(key: str) -> np.ndarray:
+            return np.array([w[key] for w in weights], dtype=np.int64)[:, None]
+
+        must_have_w, nice_to_have_w = column("must_have"), column("nice_to_have")
+        experience_w, certification_w, leadership_w = column("experience"), column("certification"), column("leadership")
+
+        requirement = scoring.requirement_features(self.requirements)
+        must_have_sum = self.must_have_levels.sum(axis=1)
+        nice_to_have_sum = self.nice_to_have_levels.sum(axis=1)
+
+        score = must_have_sum * must_have_w + nice_to_have_sum * nice_to_have_w
+        max_score = (requirement["must_have_required"] * must_have_w + requirement["nice_to_have_required"] * nice_to_have_w) * scoring.MAX_PROFICIENCY_LEVEL
+
+        max_score = max_score + experience_w
+        required_exp = requirement["required_exp"]
+        if required_exp > 0:
+            experience_ratio = np.minimum(self.candidate_exp / required_exp, 1.2)
+            score = score + experience_w * experience_ratio
+        else:
+            score = score + experience_w
+
+        max_score = max_score + self.certifications * certification_w
+        score = score + self.certifications * certification_w
+        max_score = max_score + self.leadership * leadership_w
+        score = score + self.leadership * leadership_w
+
+        max_score = np.broadcast_to(max_score, score.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = ((score / max_score) * 90).astype(np.int64) + 10
+        return np.where(max_score == 0, 0, np.minimum(normalized, 100))
+
+    def final_scores(self, profiles: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Scores after the quality multiplier, shape (len(profiles), candidates)."""
+        return (self.unadjusted_scores(profiles) * self.quality_multiplier).astype(np.int64)
+
+
+def percentile_bands(scores: np.ndarray, percentiles: Sequence[float] = (25, 50, 75, 90)) -> Dict[str, float]:
+    """Score cut-offs of a job's candidates, e.g. {"p25": 41.0, "p50": 55.0, ...}."""
+    if len(scores) == 0:
+        return {f"p{p:g}": None for p in percentiles}
+    return {f"p{p:g}": float(value) for p, value in zip(percentiles, np.percentile(scores, percentiles))}
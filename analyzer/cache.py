@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from . import config, prompts
+
+
+def make_cache_key(model: str, temperature: float, prompt: str, prompt_version: str = prompts.PROMPT_VERSION) -> str:
+    """Content address for an LLM call: identical inputs always map to the same key."""
+    payload = json.dumps([model, temperature, prompt_version, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU tier with per-entry TTL. Values are kept serialized so callers
+    can mutate what they get back without corrupting the cache.
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    async def set(self, key: str, value: dict):
+        self._entries[key] = (time.time() + self.ttl_seconds, json.dumps(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Persistent tier in a local SQLite file, so cached responses survive restarts.
+    Expired rows are purged and the least recently used rows evicted once `max_entries` is exceeded.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+
+    def _get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: dict):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl_seconds, now),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 100:
+                self._writes_since_prune = 0
+                self._prune(now)
+
+    def _prune(self, now: float):
+        expired = self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,)).rowcount
+        overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+        self.evictions += expired + max(overflow, 0)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: dict):
+        await asyncio.to_thread(self._set, key, value)
+
+
+class LLMCache:
+    """
+    Tiered response cache. Lookups walk the tiers in order and backfill faster tiers on a hit;
+    writes go to every tier.
+    """
+    def __init__(self, backends: List):
+        self.backends = backends
+        self.hits = {backend.name: 0 for backend in backends}
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        for index, backend in enumerate(self.backends):
+            value = await backend.get(key)
+            if value is not None:
+                self.hits[backend.name] += 1
+                for faster in self.backends[:index]:
+                    await faster.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: dict):
+        for backend in self.backends:
+            await backend.set(key, value)
+
+    def stats(self) -> dict:
+        total_hits = sum(self.hits.values())
+        lookups = total_hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round(total_hits / lookups, 4) if lookups else 0.0,
+            "evictions": {backend.name: backend.evictions for backend in self.backends},
+        }
+
+
+def build_default_cache() -> Optional[LLMCache]:
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    backends = [MemoryCacheBackend(config.LLM_CACHE_MEMORY_ENTRIES, config.LLM_CACHE_TTL_SECONDS)]
+    if config.LLM_CACHE_PATH:
+        backends.append(SQLiteCacheBackend(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_ENTRIES, config.LLM_CACHE_TTL_SECONDS))
+    return LLMCache(backends)
+
+
+# Built on first use, so importing the analyzer never creates the SQLite file.
+llm_cache: Optional[LLMCache] = None
+_llm_cache_configured = False
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """The process-wide response cache (None when disabled), built from config on first use."""
+    global llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        if not _llm_cache_configured:
+            llm_cache = build_default_cache()
+            _llm_cache_configured = True
+    return llm_cache
+
+
+def set_llm_cache(value: Optional[LLMCache]):
+    """Replaces the process-wide response cache; None disables caching (e.g. for benchmarks)."""
+    global llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        llm_cache = value
+        _llm_cache_configured = True
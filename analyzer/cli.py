@@ -0,0 +1,428 @@
+"""
+Batch screener for backfills: screens a directory or archive of PDF resumes against one job description.
+
+    python -m analyzer.cli --jd jd.txt --resumes resumes/ [--output results.jsonl | results.parquet | postgres]
+
+--resumes is a directory (searched recursively), a .zip or a .tar(.gz) of PDFs. Text is
+extracted by PDF_EXTRACTION_WORKERS processes (--extraction-workers), at most --concurrency
+resumes are analyzed at once, and the LLM calls go through the same per-model rate limits as
+the API (analyzer.scheduler), so a run can keep the provider busy without the web tier.
+
+Finished resumes are appended to a checkpoint file (default: <output>.checkpoint.jsonl) once
+their results are written; running the same command again skips them (and any results written
+but not yet checkpointed when the run died) and retries failures.
+SIGINT/SIGTERM stop taking new resumes and flush what is in flight. Outputs:
+
+- .jsonl: one result per line.
+- .parquet: a directory of part files with the main fields as columns and the full result as
+  JSON (needs `pip install pyarrow`).
+- postgres: screenings saved to DATABASE_URL under the job for this description (created if
+  needed), exactly as the API would save them, in multi-row writes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import config, fingerprint, pipeline
+
+DONE_STATUSES = ("saved", "skipped")
+
+
+def iter_resume_files(path: str) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """(name, load bytes) for every PDF in a directory, zip or tar, in a stable order."""
+    source = Path(path)
+    if source.is_dir():
+        for pdf in sorted(p for p in source.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf"):
+            yield str(pdf.relative_to(source)), pdf.read_bytes
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf") and "__MACOSX" not in info.filename:
+                    yield info.filename, lambda info=info: archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, mode="r:*") as archive:
+            # Members are read as the archive is walked, so compressed tars are decompressed once.
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    yield member.name, lambda member=member: archive.extractfile(member).read()
+    else:
+        raise SystemExit(f"{path} is not a directory, zip or tar archive.")
+
+
+class Checkpoint:
+    """
+    Append-only record of finished resumes; the first line identifies the job description.
+    Failed resumes carry the stage results they finished and their settings
+    (analyzer.main.stage_settings); the next attempt reuses them if it runs under the same settings.
+    """
+    def __init__(self, path: str, jd_text: str):
+        self.path = Path(path)
+        self.jd_hash = fingerprint.hash_text(jd_text)
+        self.done = set()
+        self._stages: Dict[str, Tuple[str, dict]] = {}
+        self.structured_jd: Optional[dict] = None
+        if self.path.exists():
+            with self.path.open() as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("jd_hash") != self.jd_hash:
+                    raise SystemExit(f"{self.path} belongs to another job description; pass a new --checkpoint.")
+                self.structured_jd = header.get("structured_jd")
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short when the previous run was killed.
+                    if entry.get("status") in DONE_STATUSES:
+                        self.done.add(entry["resume"])
+                        self._stages.pop(entry["resume"], None)
+                    elif entry.get("stages"):
+                        self._stages[entry["resume"]] = (entry.get("settings"), entry["stages"])
+        self._file = None
+
+    def take_stages(self, name: str, settings: str) -> Optional[dict]:
+        """The stage results stored for a failed resume, if they were produced under `settings`."""
+        stored_settings, stages = self._stages.pop(name, (None, None))
+        return stages if stored_settings == settings else None
+
+    def start(self, structured_jd: dict):
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = self.path.open("a")
+        if new:
+            self._file.write(json.dumps({"jd_hash": self.jd_hash, "structured_jd": structured_jd}) + "\n")
+            self._file.flush()
+
+    def mark(self, entries: List[dict]):
+        for entry in entries:
+            self._file.write(json.dumps(entry) + "\n")
+            if entry["status"] in DONE_STATUSES:
+                self.done.add(entry["resume"])
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+# --- Outputs: `write` persists a flushed group of results before they are checkpointed, and
+# `finished` lists the resumes already written as saved or skipped, so results written just
+# before a crash are checkpointed on the next run instead of being screened and written again. ---
+
+class JsonlOutput:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(path, "a")
+        if self._file.tell() and not self.path.read_bytes().endswith(b"\n"):
+            self._file.write("\n")  # End a line cut short by a killed run so the next result starts its own.
+
+    def finished(self) -> Dict[str, str]:
+        statuses = {}
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if result.get("status") in DONE_STATUSES:
+                    statuses[result["resume"]] = result["status"]
+        return statuses
+
+    async def write(self, results: List[dict]):
+        for result in results:
+            self._file.write(json.dumps(result, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetOutput:
+    COLUMNS = ["resume", "status", "file_hash", "full_name", "contact_info", "final_score", "quality_score", "experience_years", "result_json"]
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs `pip install pyarrow`.") from e
+        self._pa, self._pq = pyarrow, pyarrow.parquet
+        self.directory = Path(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._parts = len(list(self.directory.glob("part-*.parquet")))
+
+    def finished(self) -> Dict[str, str]:
+        statuses = {}
+        for part in sorted(self.directory.glob("part-*.parquet")):
+            for row in self._pq.read_table(part, columns=["resume", "status"]).to_pylist():
+                if row["status"] in DONE_STATUSES:
+                    statuses[row["resume"]] = row["status"]
+        return statuses
+
+    async def write(self, results: List[dict]):
+        rows = []
+        for result in results:
+            resume = result.get("structured_resume") or {}
+            experience = (result.get("llm_analysis") or {}).get("experience_match_analysis") or {}
+            rows.append({
+                "resume": result["resume"],
+                "status": result["status"],
+                "file_hash": result.get("file_hash"),
+                "full_name": resume.get("full_name"),
+                "contact_info": resume.get("contact_info"),
+                "final_score": result.get("final_score"),
+                "quality_score": (result.get("quality_assessment") or {}).get("quality_score"),
+                "experience_years": experience.get("calculated_candidate_years"),
+                "result_json": json.dumps(result, default=str),
+            })
+        table = self._pa.Table.from_pylist(rows)
+        part = self.directory / f"part-{self._parts:05d}.parquet"
+        # Written under a temporary name and renamed, so a killed run never leaves a torn part file.
+        partial = part.with_suffix(".parquet.tmp")
+        await asyncio.to_thread(self._pq.write_table, table, partial)
+        os.replace(partial, part)
+        self._parts += 1
+
+    def close(self):
+        pass
+
+
+class PostgresOutput:
+    """Screenings are saved by backend.screening as they finish; `write` has nothing left to do."""
+    def __init__(self):
+        from backend.migrations import upgrade_schema
+        upgrade_schema()
+
+    async def write(self, results: List[dict]):
+        pass
+
+    def finished(self) -> Dict[str, str]:
+        return {}  # A resume screened again is found by its file hash and skipped.
+
+    def close(self):
+        pass
+
+
+async def _postgres_job(jd_text: str, structured_jd: dict, title: Optional[str], pipeline_mode: Optional[str]):
+    from backend import async_crud, schemas
+    from backend.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        db_job = await async_crud.get_job_by_text_hash(db, text_hash=fingerprint.hash_text(jd_text))
+        if db_job is None:
+            signature = fingerprint.minhash_signature(jd_text)
+            db_job = await async_crud.create_job(db, job=schemas.JobCreate(
+                title=title or structured_jd.get("job_title") or "Backfill",
+                raw_jd_text=jd_text,
+                structured_jd=structured_jd,
+                text_hash=fingerprint.hash_text(jd_text),
+                minhash=signature,
+                minhash_bands=fingerprint.lsh_bands(signature),
+                pipeline_mode=pipeline_mode,
+            ))
+        return db_job
+
+
+class BatchScreener:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.stopping = asyncio.Event()
+        self.pending: List[Tuple[dict, dict]] = []  # (checkpoint entry, result) not yet written
+        self.counts = {"saved": 0, "skipped": 0, "failed": 0, "already_done": 0}
+        self.started_at = time.perf_counter()
+
+    async def _screen_file(self, name: str, data: bytes) -> Tuple[dict, dict]:
+        from .main import analyze_single_resume
+        from .parsers import extract_pdf_document_async
+
+        file_hash = fingerprint.hash_bytes(data)
+        document = await extract_pdf_document_async(data)
+        del data
+        if not document["text"]:
+            entry = {"resume": name, "status": "skipped", "error": "No text could be extracted."}
+            return entry, {**entry, "file_hash": file_hash}
+        checkpoint = pipeline.StageCheckpoint(self.checkpoint.take_stages(name, self.settings))
+        try:
+            result = await analyze_single_resume(
+                self.structured_jd, document, name, pipeline_mode=self.pipeline_mode, checkpoint=checkpoint
+            )
+        except Exception as e:
+            print(f"[backfill] {name} failed: {e}")
+            result = {"error": str(e)}
+        if "error" in result or result["incomplete_stages"]:
+            error = result.get("details") or result.get("error") or f"Incomplete analysis: {result['incomplete_stages']} failed."
+            entry = {"resume": name, "status": "failed", "error": error}
+            stages = {"stages": checkpoint.finished, "settings": self.settings}
+            return {**entry, **stages}, {**entry, "file_hash": file_hash}
+        result.pop("structured_jd", None)
+        return {"resume": name, "status": "saved"}, {"resume": name, "status": "saved", "file_hash": file_hash, **result}
+
+    async def _screen_postgres(self, name: str, data: bytes) -> Tuple[dict, dict]:
+        from backend.screening import process_and_save_resume
+
+        outcome = {}
+
+        def on_event(event_type: str, **fields):
+            if event_type in ("resume_saved", "resume_skipped", "resume_failed"):
+                outcome.update(status=event_type[len("resume_"):], error=fields.get("reason"))
+        screening = await process_and_save_resume(
+            name, "application/pdf", data, self.structured_jd, self.job_id, self.writer, on_event,
+            pipeline_mode=self.pipeline_mode
+        )
+        entry = {"resume": name, "status": outcome.get("status", "failed"), "error": outcome.get("error")}
+        if screening is not None:
+            entry["screening_id"] = screening.id
+        return entry, entry
+
+    async def _flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        await self.output.write([result for _, result in pending])
+        self.checkpoint.mark([entry for entry, _ in pending])
+
+    def _report(self):
+        finished = self.counts["saved"] + self.counts["skipped"] + self.counts["failed"]
+        elapsed = time.perf_counter() - self.started_at
+        rate = finished / elapsed * 60 if elapsed else 0
+        print(f"[backfill] {finished + self.counts['already_done']} done ({self.counts}), {rate:.1f} resumes/min")
+
+    async def run(self) -> dict:
+        from .main import deconstruct_jd, stage_settings
+
+        args = self.args
+        jd_text = Path(args.jd).read_text()
+        self.checkpoint = Checkpoint(args.checkpoint, jd_text)
+        self.structured_jd = self.checkpoint.structured_jd
+        if self.structured_jd is None:
+            self.structured_jd = await deconstruct_jd(jd_text)
+            if "error" in self.structured_jd:
+                raise SystemExit(f"Could not deconstruct the job description: {self.structured_jd}")
+        self.checkpoint.start(self.structured_jd)
+
+        screen = self._screen_file
+        self.pipeline_mode = args.pipeline_mode
+        if args.output == "postgres":
+            from backend.writer import ScreeningWriter
+
+            self.output = PostgresOutput()
+            db_job = await _postgres_job(jd_text, self.structured_jd, args.job_title, args.pipeline_mode)
+            self.job_id, self.pipeline_mode = db_job.id, db_job.pipeline_mode
+            print(f"[backfill] Saving screenings under job {db_job.id} ({db_job.title}).")
+            self.writer = await ScreeningWriter().__aenter__()
+            screen = self._screen_postgres
+        elif args.output.endswith(".parquet"):
+            self.output = ParquetOutput(args.output)
+        else:
+            self.output = JsonlOutput(args.output)
+        # Stage results are reused only from attempts under the mode the resumes are screened with.
+        self.settings = stage_settings(self.pipeline_mode)
+        recovered = {name: status for name, status in self.output.finished().items() if name not in self.checkpoint.done}
+        if recovered:
+            print(f"[backfill] {len(recovered)} results were written but not checkpointed; checkpointing them.")
+            self.checkpoint.mark([{"resume": name, "status": status} for name, status in recovered.items()])
+
+        # The input is walked once (an archive is decompressed once), so there is no total up front;
+        # bytes are read by the producer, at most a queue's worth ahead.
+        print(f"[backfill] Screening {args.resumes}, {len(self.checkpoint.done)} resumes already done.")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency)
+
+        async def produce():
+            files = iter_resume_files(args.resumes)
+            while not self.stopping.is_set():
+                item = await asyncio.to_thread(next, files, None)
+                if item is None:
+                    break
+                name, load = item
+                if name in self.checkpoint.done:
+                    self.counts["already_done"] += 1
+                    continue
+                await queue.put([name, await asyncio.to_thread(load)])
+            for _ in range(args.concurrency):
+                await queue.put(None)
+
+        async def consume():
+            while (item := await queue.get()) is not None:
+                if self.stopping.is_set():
+                    continue
+                name = item[0]
+                try:
+                    # Popped so the screening holds the only reference to the bytes and can free them.
+                    entry, result = await screen(name, item.pop())
+                except Exception as e:
+                    print(f"[backfill] {name} failed: {e}")
+                    entry = result = {"resume": name, "status": "failed", "error": str(e)}
+                self.counts[entry["status"]] += 1
+                self.pending.append((entry, result))
+                if len(self.pending) >= args.flush_every:
+                    await self._flush()
+                    self._report()
+
+        work = asyncio.gather(produce(), *(consume() for _ in range(args.concurrency)))
+
+        def on_signal():
+            if self.stopping.is_set():
+                print("[backfill] Abandoning the resumes in flight; they will be screened on the next run.")
+                work.cancel()
+            else:
+                print("[backfill] Stopping after the resumes in flight (interrupt again to abandon them).")
+                self.stopping.set()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, on_signal)
+
+        try:
+            await work
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if args.output == "postgres":
+                await self.writer.__aexit__(None, None, None)
+            await self._flush()
+            self.output.close()
+            self.checkpoint.close()
+        self._report()
+        return self.counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jd", required=True, help="Job description text file.")
+    parser.add_argument("--resumes", required=True, help="Directory, .zip or .tar(.gz) of PDF resumes.")
+    parser.add_argument("--output", default="results.jsonl", help="A .jsonl file, a .parquet directory, or 'postgres'.")
+    parser.add_argument("--checkpoint", default=None, help="Progress file (default: <output>.checkpoint.jsonl).")
+    parser.add_argument("--job-title", default=None, help="Title of a job created for the postgres output.")
+    parser.add_argument("--pipeline-mode", choices=config.PIPELINE_MODES, default=None,
+                        help="Pipeline mode (default: PIPELINE_MODE; postgres output uses the job's).")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BACKFILL_CONCURRENCY", 64)),
+                        help="Resumes analyzed at the same time; the per-model limits still apply.")
+    parser.add_argument("--extraction-workers", type=int, default=None, help="PDF text extraction processes.")
+    parser.add_argument("--flush-every", type=int, default=100, help="Results written and checkpointed per group.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    args = build_parser().parse_args(argv)
+    if args.checkpoint is None:
+        target = "postgres-" + Path(args.resumes).name if args.output == "postgres" else args.output.rstrip("/")
+        args.checkpoint = f"{target}.checkpoint.jsonl"
+    if args.extraction_workers:
+        config.PDF_EXTRACTION_WORKERS = args.extraction_workers
+
+    from .parsers import shutdown_extraction_pool
+
+    try:
+        return asyncio.run(BatchScreener(args).run())
+    finally:
+        shutdown_extraction_pool()
+
+
+if __name__ == "__main__":
+    main()
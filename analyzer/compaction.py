@@ -0,0 +1,198 @@
+import re
+from typing import List, Optional, Tuple
+
+# Shrinks the resume text embedded in every per-resume prompt. PyMuPDF returns the PDF's
+# layout line by line: wrapped lines, words hyphenated across lines, bullet glyphs, runs of
+# spaces from columns, and page headers/footers repeated on every page. None of it helps the
+# model, and the same text is sent three times per resume.
+
+# Share of the token budget each section gets when the resume is over budget. A section that
+# needs less than its share leaves the rest to the others.
+SECTION_WEIGHTS = {
+    "header": 1.0,
+    "summary": 1.0,
+    "experience": 4.0,
+    "projects": 3.0,
+    "skills": 2.0,
+    "education": 1.0,
+    "certifications": 1.0,
+    "leadership": 1.0,
+    "other": 1.0,
+}
+
+# A line that is exactly one of these words (optionally with a colon) starts a "references"
+# section, which is dropped unless it is long enough to have swallowed content under a heading
+# that was not recognized.
+_REFERENCES_HEADINGS = {"references", "referees"}
+_MAX_REFERENCES_LINES = 12
+
+# Heading keywords of each section.
+_SECTION_KEYWORDS = [
+    ("experience", ("experience", "employment", "work history", "career history", "internship")),
+    ("projects", ("project",)),
+    ("skills", ("skill", "technologies", "tech stack", "technical", "tools", "competenc")),
+    ("education", ("education", "academic", "qualification")),
+    ("certifications", ("certif", "award", "honor", "honour", "achievement", "course", "publication")),
+    ("leadership", ("leadership", "extracurricular", "volunteer", "activities", "position", "responsibilit")),
+    ("summary", ("summary", "profile", "objective", "about me")),
+    ("other", ("interest", "hobbies", "language")),
+]
+
+_LIGATURES = {"\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl"}
+_INVISIBLE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_BULLET = re.compile("^[\u2022\u2023\u2043\u2219\u25aa\u25ab\u25cf\u25cb\u25e6\u25a0\u25a1\u2013\u2014\u27a2\u2794\u25ba\u00b7\uf0b7*>-]+\\s*")
+_SPACES = re.compile("[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_BOILERPLATE = re.compile(
+    r"^(curriculum vitae|resume|résumé|cv|references available( up)?on request\.?|"
+    r"i hereby declare\b.*|declaration:?)$",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"[.!?:;]$")
+_TRUNCATED = "[...]"
+# A line this long that ends mid-sentence was most likely wrapped by the layout.
+_WRAP_MIN_LENGTH = 30
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count, four characters per token, as used for the scheduler's estimates."""
+    return len(text) // 4
+
+
+def _normalize_line(line: str) -> str:
+    for ligature, letters in _LIGATURES.items():
+        line = line.replace(ligature, letters)
+    line = _INVISIBLE.sub("", line)
+    line = _SPACES.sub(" ", line).strip()
+    if _BULLET.match(line):
+        line = _BULLET.sub("- ", line)
+    return line
+
+
+def _is_noise(line: str) -> bool:
+    # Lines starting with '#' could be read as the prompts' "###" section markers.
+    return (
+        line.startswith("#")
+        or bool(_PAGE_NUMBER.match(line))
+        or bool(_BOILERPLATE.match(line))
+        or not any(char.isalnum() for char in line)
+    )
+
+
+def _section_of(line: str) -> Optional[str]:
+    """The section a heading line starts, or None if the line is not a heading."""
+    heading = line.rstrip(":").strip()
+    if not heading or len(heading) > 40 or len(heading.split()) > 4 or _SENTENCE_END.search(heading):
+        return None
+    lowered = heading.lower()
+    if lowered in _REFERENCES_HEADINGS:
+        return "references"
+    for section, keywords in _SECTION_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return section
+    return None
+
+
+def _join_wrapped(lines: List[str]) -> List[str]:
+    """Re-joins lines the PDF layout wrapped, and words hyphenated across them."""
+    joined: List[str] = []
+    for line in lines:
+        if joined and not line.startswith("- ") and _section_of(line) is None:
+            previous = joined[-1]
+            if re.search(r"[a-z]-$", previous) and line[:1].islower():
+                joined[-1] = previous[:-1] + line
+                continue
+            if (
+                line[:1].islower()
+                and len(previous) >= _WRAP_MIN_LENGTH
+                and not _SENTENCE_END.search(previous)
+                and _section_of(previous) is None
+            ):
+                joined[-1] = f"{previous} {line}"
+                continue
+        joined.append(line)
+    return joined
+
+
+def clean_lines(text: str) -> List[str]:
+    """Normalized, de-hyphenated, de-duplicated lines without boilerplate."""
+    lines = [_normalize_line(line) for line in text.splitlines()]
+    lines = [line for line in lines if line and not _is_noise(line)]
+    lines = _join_wrapped(lines)
+    # Repeated lines are mostly page headers and footers; short ones ("Python") can repeat legitimately.
+    seen = set()
+    unique = []
+    for line in lines:
+        key = line.lower()
+        if len(line) >= 20 and key in seen:
+            continue
+        seen.add(key)
+        unique.append(line)
+    return unique
+
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """[(section, lines)] in resume order; text before the first heading is the "header"."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in lines:
+        section = _section_of(line)
+        if section is not None:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(section, section_lines) for section, section_lines in sections if section_lines]
+
+
+def _allocate(sizes: List[int], weights: List[float], budget: int) -> List[int]:
+    """Weighted water-filling: sections under their share keep everything, the rest split what is left."""
+    allocation = [0] * len(sizes)
+    pending = list(range(len(sizes)))
+    remaining = budget
+    while pending:
+        total_weight = sum(weights[index] for index in pending)
+        fitting = [index for index in pending if sizes[index] <= remaining * weights[index] / total_weight]
+        if not fitting:
+            for index in pending:
+                allocation[index] = int(remaining * weights[index] / total_weight)
+            break
+        for index in fitting:
+            allocation[index] = sizes[index]
+            remaining -= sizes[index]
+            pending.remove(index)
+    return allocation
+
+
+def _truncate(lines: List[str], token_budget: int) -> List[str]:
+    """The section's first lines that fit in `token_budget`; the first line (its heading) always stays."""
+    kept, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if kept and used + cost > token_budget:
+            kept.append(_TRUNCATED)
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def compact_resume_text(text: str, token_budget: Optional[int] = None) -> str:
+    """
+    Cleans the extracted resume text and, if it is still longer than `token_budget`, trims each
+    section to its share of the budget (SECTION_WEIGHTS), keeping every section's first lines.
+    """
+    sections = [
+        (section, lines) for section, lines in split_sections(clean_lines(text))
+        if section != "references" or len(lines) > _MAX_REFERENCES_LINES + 1
+    ]
+    if token_budget:
+        sizes = [sum(count_tokens(line) + 1 for line in lines) for _, lines in sections]
+        if sum(sizes) > token_budget:
+            weights = [SECTION_WEIGHTS.get(section, 1.0) for section, _ in sections]
+            allocation = _allocate(sizes, weights, token_budget)
+            sections = [(section, _truncate(lines, budget)) for (section, lines), budget in zip(sections, allocation)]
+    return "\n".join(line for _, lines in sections for line in lines)
+
+
+def compact_prompt(prompt: str) -> str:
+    """Drops the blank lines and indentation of an instruction template; the wording is unchanged."""
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
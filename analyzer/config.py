@@ -4,6 +4,8 @@ load_dotenv()
 
 # Groq API Key
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Chat-completions endpoint; point it at a local `python -m benchmarks.fake_groq` to run without Groq quota.
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
 
 # Models
 
@@ -12,4 +14,87 @@ STRUCTURING_MODEL = "llama-3.1-8b-instant"
 # ANALYSIS_MODEL = "openai/gpt-oss-120b"
 ANALYSIS_MODEL = "groq/compound"
 
-TEMPERATURE = 0.2
\ No newline at end of file
+TEMPERATURE = 0.2
+
+# Provider rate limits per model, enforced by analyzer.scheduler.
+# Defaults follow the Groq free tier; raise them to match your account's limits.
+MODEL_LIMITS = {
+    STRUCTURING_MODEL: {
+        "max_concurrency": int(os.getenv("STRUCTURING_MODEL_CONCURRENCY", 8)),
+        "requests_per_minute": int(os.getenv("STRUCTURING_MODEL_RPM", 30)),
+        "tokens_per_minute": int(os.getenv("STRUCTURING_MODEL_TPM", 6000)),
+    },
+    ANALYSIS_MODEL: {
+        "max_concurrency": int(os.getenv("ANALYSIS_MODEL_CONCURRENCY", 4)),
+        "requests_per_minute": int(os.getenv("ANALYSIS_MODEL_RPM", 30)),
+        "tokens_per_minute": int(os.getenv("ANALYSIS_MODEL_TPM", 70000)),
+    },
+}
+DEFAULT_MODEL_LIMITS = {"max_concurrency": 4, "requests_per_minute": 30, "tokens_per_minute": 6000}
+
+# Retry policy for throttled (429) and server-side (5xx) LLM errors.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 6))
+LLM_RETRY_BASE_DELAY = 2.0
+LLM_RETRY_MAX_DELAY = 60.0
+ESTIMATED_COMPLETION_TOKENS = 600
+
+# LLM response cache (analyzer.cache): an in-process LRU tier plus a persistent SQLite tier.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# The SQLite file defaults to the user's cache directory, wherever the process is started from;
+# an empty LLM_CACHE_PATH keeps only the in-process tier.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "smart-resume-screener", "llm_cache.sqlite3"
+))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 2048))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 200000))
+
+# Worker processes used for PDF text extraction (analyzer.parsers).
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+# Estimated Jaccard similarity above which a new job description is reported as a near
+# duplicate of a stored one (analyzer.fingerprint MinHash).
+JD_NEAR_DUPLICATE_THRESHOLD = float(os.getenv("JD_NEAR_DUPLICATE_THRESHOLD", 0.8))
+
+# Weight profile used for new screenings (see analyzer.scoring.WEIGHT_PROFILES).
+SCORING_PROFILE = os.getenv("SCORING_PROFILE", "v1")
+
+# Shortlist mode (analyzer.prefilter): when either limit is set, resumes are first ranked by a
+# keyword-based skill score and only the top K, and/or those scoring at least the minimum, get
+# the LLM analysis; the rest are stored with their provisional score. Unset means no shortlist.
+SHORTLIST_TOP_K = int(os.getenv("SHORTLIST_TOP_K")) if os.getenv("SHORTLIST_TOP_K") else None
+SHORTLIST_MIN_SCORE = float(os.getenv("SHORTLIST_MIN_SCORE")) if os.getenv("SHORTLIST_MIN_SCORE") else None
+
+# Local embeddings for semantic candidate search (analyzer.embeddings, analyzer.vector_index).
+# EMBEDDING_BACKEND is "hashing" (NumPy only) or "sentence-transformers" (optional package).
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 384 if EMBEDDING_BACKEND == "sentence-transformers" else 256))
+EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", "embedding_index")
+# The index is split into IVF lists once it holds this many vectors; searches scan the nearest lists.
+EMBEDDING_IVF_MIN_VECTORS = int(os.getenv("EMBEDDING_IVF_MIN_VECTORS", 20000))
+EMBEDDING_IVF_PROBES = int(os.getenv("EMBEDDING_IVF_PROBES", 8))
+
+# Prompt compaction (analyzer.compaction): resume text is cleaned of PDF layout artifacts and
+# trimmed per section to RESUME_TOKEN_BUDGET tokens, and instruction templates lose their
+# blank lines. Token usage per stage is reported at /token-usage.
+PROMPT_COMPACTION = os.getenv("PROMPT_COMPACTION", "true").lower() == "true"
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", 2500))
+
+# Per-resume pipeline: "multi_call" sends the resume to the skill analysis, holistic parse and
+# quality prompts separately; "single_pass" makes one combined call and retries only the
+# sections that fail validation with their own prompts. Jobs can override it (Job.pipeline_mode).
+PIPELINE_MODES = ("multi_call", "single_pass")
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "multi_call")
+
+# LLM outputs are validated per stage (analyzer.stage_outputs); missing or invalid fields are
+# asked for again this many times before the stage counts as failed.
+LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", 1))
+
+# Tracing and metrics (analyzer.tracing, analyzer.metrics, GET /metrics). OTEL_TRACING=true also
+# exports spans over OTLP (optional opentelemetry packages; configure with the standard OTEL_*
+# variables); TRACE_LOG=true prints each finished span as a JSON line.
+OTEL_TRACING = os.getenv("OTEL_TRACING", "false").lower() == "true"
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "resume-screener")
+TRACE_LOG = os.getenv("TRACE_LOG", "false").lower() == "true"
+EVENT_LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", 0.5))
@@ -0,0 +1,100 @@
+import asyncio
+import math
+import re
+import zlib
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+
+from . import config
+from .prefilter import SKILL_ALIASES
+
+# Text embeddings computed locally on the CPU, for semantic search over stored candidates
+# (analyzer.vector_index). Two backends:
+#   "hashing" (default): signed feature hashing of words and word pairs, NumPy only. Captures
+#       shared vocabulary (skills, tools, titles) rather than meaning, which is what matching a
+#       resume to a JD's skill list mostly needs.
+#   "sentence-transformers": any model of that library (EMBEDDING_MODEL), if it is installed.
+# Vectors are float32 and L2-normalized, so a dot product is the cosine similarity.
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to was were will with "
+    "we you your i my me this that using used use etc".split()
+)
+# Single-word aliases of a skill are folded into one spelling, so "k8s" and "kubernetes" hash alike.
+_CANONICAL = {alias: group[0] for group in SKILL_ALIASES for alias in group if " " not in alias and " " not in group[0]}
+
+_sentence_model = None
+
+
+def model_name() -> str:
+    """Identifies the vector space; vectors of different models are never compared."""
+    if config.EMBEDDING_BACKEND == "sentence-transformers":
+        return f"st:{config.EMBEDDING_MODEL}"
+    return f"hashing-{config.EMBEDDING_DIM}"
+
+
+def _tokens(text: str) -> List[str]:
+    words = [_CANONICAL.get(word, word) for word in _TOKEN.findall(text.lower()) if word not in _STOP_WORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def _hashing_embed(texts: List[str], dim: int) -> np.ndarray:
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature, count in Counter(_tokens(text)).items():
+            # crc32 rather than hash(): vectors must not change between processes.
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vectors[row, digest % dim] += sign * (1.0 + math.log(count))
+    return vectors
+
+
+def _sentence_embed(texts: List[str]) -> np.ndarray:
+    global _sentence_model
+    if _sentence_model is None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=sentence-transformers needs `pip install sentence-transformers`."
+            ) from e
+        _sentence_model = SentenceTransformer(config.EMBEDDING_MODEL, device="cpu")
+    return np.asarray(_sentence_model.encode(texts, batch_size=32), dtype=np.float32)
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embeds texts as rows of a float32 matrix of unit vectors (all-zero rows stay zero)."""
+    if config.EMBEDDING_BACKEND == "sentence-transformers":
+        vectors = _sentence_embed(texts)
+    else:
+        vectors = _hashing_embed(texts, config.EMBEDDING_DIM)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+async def embed_texts_async(texts: List[str]) -> np.ndarray:
+    """`embed_texts` in a thread, so a model does not block the event loop."""
+    return await asyncio.to_thread(embed_texts, texts)
+
+
+def job_text(structured_jd: dict) -> str:
+    """The part of a structured JD a candidate is matched on; must-have skills count twice."""
+    must_have = structured_jd.get("must_have_skills", [])
+    return " \n".join([
+        structured_jd.get("job_title", ""),
+        structured_jd.get("seniority_level", ""),
+        ", ".join(must_have),
+        ", ".join(must_have),
+        ", ".join(structured_jd.get("nice_to_have_skills", [])),
+    ])
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    return np.frombuffer(data, dtype=np.float32) if data else None
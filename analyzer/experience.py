@@ -0,0 +1,181 @@
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+# Dates are handled at month precision as month indexes (year * 12 + month - 1); intervals
+# are half-open, so "Jan 2023 - Mar 2023" is [Jan 2023, Apr 2023) = 3 months.
+
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+# (first month, last month) of the season within its year.
+_SEASONS = {"spring": (3, 5), "summer": (6, 8), "fall": (9, 11), "autumn": (9, 11), "winter": (1, 2)}
+
+_PRESENT = re.compile(r"\b(present|current(ly)?|now|ongoing|today|date)\b")
+_RANGE_SEPARATOR = re.compile(r"\s*(?:-|–|—|→|\bto\b|\buntil\b|\btill\b)\s*")
+_NUMERIC_MONTH_YEAR = re.compile(r"\b(\d{1,2})[/.-](\d{4})\b")
+_NUMERIC_YEAR_MONTH = re.compile(r"\b(\d{4})[/.-](\d{1,2})\b")
+_LENGTH = re.compile(r"(\d+(?:\.\d+)?)\s*(years?|yrs?|months?|mos?|weeks?|wks?)\b")
+_YEAR = re.compile(r"^(\d{4}|'\d{2})$")
+
+# How many experience lists were calculated locally vs. sent to the LLM.
+EXPERIENCE_STATS = {"local": 0, "llm_fallback": 0}
+
+
+class _Point:
+    """A parsed date: the half-open month interval it covers, or the present."""
+    def __init__(self, start: Optional[int] = None, end: Optional[int] = None, year_only: bool = False,
+                 month: Optional[int] = None, present: bool = False):
+        self.start = start
+        self.end = end
+        self.year_only = year_only
+        self.month = month  # Set for a month without a year, as in "Jan - Mar 2023".
+        self.present = present
+
+
+def _parse_year(token: str) -> int:
+    if token.startswith("'"):
+        return 2000 + int(token[1:])
+    return int(token)
+
+
+def _parse_point(text: str) -> Optional[_Point]:
+    text = text.strip(" ,.()")
+    if not text:
+        return None
+    if _PRESENT.search(text):
+        return _Point(present=True)
+
+    tokens = [token.strip(".,") for token in text.split()]
+    if len(tokens) == 1 and _YEAR.match(tokens[0]):
+        year = _parse_year(tokens[0])
+        return _Point(year * 12, year * 12 + 12, year_only=True)
+    if len(tokens) == 1 and tokens[0] in _MONTHS:
+        return _Point(month=_MONTHS[tokens[0]])
+    if len(tokens) == 2 and _YEAR.match(tokens[1]):
+        year = _parse_year(tokens[1])
+        if tokens[0] in _MONTHS:
+            start = year * 12 + _MONTHS[tokens[0]] - 1
+            return _Point(start, start + 1)
+        if tokens[0] in _SEASONS:
+            first, last = _SEASONS[tokens[0]]
+            return _Point(year * 12 + first - 1, year * 12 + last)
+        if tokens[0].isdigit() and 1 <= int(tokens[0]) <= 12:
+            start = year * 12 + int(tokens[0]) - 1
+            return _Point(start, start + 1)
+    return None
+
+
+def _parse_length(text: str) -> Optional[float]:
+    """Months in a plain length such as "6 months", "2 yrs" or "1 year 3 months"."""
+    matches = _LENGTH.findall(text)
+    if not matches:
+        return None
+    months = 0.0
+    for amount, unit in matches:
+        if unit.startswith("y"):
+            months += float(amount) * 12
+        elif unit.startswith("w"):
+            months += float(amount) * 12 / 52
+        else:
+            months += float(amount)
+    return months
+
+
+def parse_duration(duration: str, today: Optional[date] = None):
+    """
+    Parses one duration string. Returns ("interval", (start, end)) in month indexes for a date
+    or date range, ("length", months) for a plain length, or None if the format is not understood.
+    """
+    today = today or date.today()
+    current = today.year * 12 + today.month  # Exclusive end of the current month.
+    text = duration.lower().strip()
+    # Numeric dates become "month year" so their dashes are not taken for range separators.
+    text = _NUMERIC_YEAR_MONTH.sub(lambda m: f"{m.group(2)} {m.group(1)}", text)
+    text = _NUMERIC_MONTH_YEAR.sub(lambda m: f"{m.group(1)} {m.group(2)}", text)
+    # A range takes precedence over a length in brackets, as in "Jun 2021 - Aug 2021 (3 months)".
+    text_without_brackets = re.sub(r"\(.*?\)", " ", text).strip()
+
+    parts = _RANGE_SEPARATOR.split(text_without_brackets)
+    parts = [part for part in parts if part.strip()]
+    if len(parts) == 2:
+        start, end = _parse_point(parts[0]), _parse_point(parts[1])
+        if start and end and not start.present and end.month is None:
+            if start.month is not None:
+                if end.present:
+                    return None
+                year = (end.start // 12) if end.start is not None else None
+                start = _Point(year * 12 + start.month - 1, year * 12 + start.month)
+            if not end.present and end.end <= start.start:
+                return None
+            if end.present:
+                end_index = current
+            elif end.year_only:
+                # "2019 - 2021" reads as two years, not three.
+                end_index = max(end.start, start.start + (12 if start.year_only else 1))
+            else:
+                end_index = end.end
+            end_index = min(end_index, current)
+            if end_index < start.start:
+                return None
+            return "interval", (start.start, end_index)
+    elif len(parts) == 1:
+        point = _parse_point(parts[0])
+        if point and point.start is not None:
+            return "interval", (point.start, min(point.end, current))
+
+    months = _parse_length(text)
+    if months is not None:
+        return "length", months
+    return None
+
+
+def _merged_months(intervals: List[Tuple[int, int]]) -> int:
+    total = 0
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def calculate_experience_years(experience_list: list, today: Optional[date] = None) -> Optional[float]:
+    """
+    Total years of experience from the `duration` of each experience entry. Overlapping date
+    ranges (concurrent jobs and projects) are merged so they are only counted once; plain
+    lengths like "6 months" cannot be placed in time and are added on top.
+    Returns None if any duration is in a format this parser does not understand.
+    """
+    intervals = []
+    length_months = 0.0
+    for entry in experience_list:
+        duration = entry.get("duration") if isinstance(entry, dict) else None
+        if not duration or not str(duration).strip():
+            continue
+        parsed = parse_duration(str(duration), today=today)
+        if parsed is None:
+            return None
+        kind, value = parsed
+        if kind == "interval":
+            if value[1] > value[0]:
+                intervals.append(value)
+        else:
+            length_months += value
+    return round((_merged_months(intervals) + length_months) / 12, 1)
+
+
+def experience_stats() -> dict:
+    total = EXPERIENCE_STATS["local"] + EXPERIENCE_STATS["llm_fallback"]
+    return {
+        **EXPERIENCE_STATS,
+        "fallback_rate": round(EXPERIENCE_STATS["llm_fallback"] / total, 4) if total else 0.0,
+    }
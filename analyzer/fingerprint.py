@@ -0,0 +1,75 @@
+import hashlib
+import random
+import re
+import unicodedata
+from typing import List
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of extracted document text: Unicode-normalized, lowercased, with all
+    whitespace collapsed. Re-exports of the same document normalize to the same string.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def hash_bytes(content: bytes) -> str:
+    """SHA-256 of the raw uploaded file."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 of the normalized text, stable across PDF re-exports and whitespace changes."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+# --- Near-duplicate detection ---
+# MinHash estimates the Jaccard similarity of two texts' word shingles from fixed-size
+# signatures. Signatures are split into LSH bands: texts sharing any band are candidates,
+# which finds pairs above ~0.5 similarity without comparing against every stored text.
+
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MERSENNE_PRIME = (1 << 31) - 1  # Keeps signature values within a 32-bit signed integer.
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Overlapping `size`-word sequences of the normalized text."""
+    words = re.findall(r"\w+", normalize_text(text))
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash signature of the text's shingles, one value per permutation."""
+    hashed = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+        for shingle in shingles(text)
+    ]
+    if not hashed:
+        return [_MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashed) for a, b in _PERMUTATIONS]
+
+
+def lsh_bands(signature: List[int], bands: int = LSH_BANDS) -> List[str]:
+    """One bucket key per band of the signature; similar texts share at least one key with high probability."""
+    rows = len(signature) // bands
+    return [
+        f"{band}:{hashlib.blake2b(str(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8).hexdigest()}"
+        for band in range(bands)
+    ]
+
+
+def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Estimated Jaccard similarity: the share of permutations whose minimum agrees."""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
@@ -1,129 +1,148 @@
 import json
+from datetime import date
+from typing import Callable, Optional, Tuple
 from groq import AsyncGroq
-from . import config, prompts, parsers
-
-client = AsyncGroq(api_key=config.GROQ_API_KEY)
-
-def _clean_json_from_llm(raw_output: str) -> str:
-    """Finds and extracts the first valid JSON object from a raw LLM output string."""
-    try:
-        start_index = raw_output.find('{')
-        end_index = raw_output.rfind('}')
-        if start_index != -1 and end_index != -1 and end_index > start_index:
-            return raw_output[start_index:end_index+1]
-    except Exception:
-        pass
-    return raw_output
-
-async def _call_llm(prompt: str, model: str) -> dict:
-    # Makes an asynchronous call to the LLM and returns the parsed JSON response.
-    try:
-        chat_completion = await client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=model,
-            temperature=config.TEMPERATURE,
-            response_format={"type": "json_object"},
+from . import config, prompts, pipeline, scheduler, cache, compaction, experience, metrics, partial_json, scoring, stage_outputs, token_usage, tracing
+
+# Retries are owned by the scheduler so throttling is handled in one place.
+client = AsyncGroq(api_key=config.GROQ_API_KEY, base_url=config.GROQ_BASE_URL, max_retries=0)
+
+def _format_prompt(template: str, **fields) -> str:
+    # Fills a prompt template; with PROMPT_COMPACTION its blank lines are dropped first.
+    if config.PROMPT_COMPACTION:
+        template = compaction.compact_prompt(template)
+    return template.format(**fields)
+
+async def _call_llm(prompt: str, model: str, priority: int = scheduler.PRIORITY_RESUME, stage: str = "other") -> Tuple[dict, bool]:
+    # Makes an asynchronous call to the LLM through the shared scheduler and returns the parsed JSON
+    # response, and whether it came from the response cache. Identical (model, temperature, prompt
+    # version, prompt) calls are answered from that cache, which only holds validated outputs:
+    # callers store fresh responses with `_cache_response` once they pass.
+    # Token usage is recorded under `stage` (see token_usage). A truncated response keeps its
+    # finished fields (analyzer.partial_json); one without any JSON is {}.
+    # Each call is an "llm" span with its model, stage, tokens, retries and cache hit (analyzer.tracing).
+    with tracing.span("llm", model=model, stage=stage, cache_hit=False) as llm_span:
+        outcome = "error"
+        try:
+            llm_cache = cache.get_llm_cache()
+            if llm_cache is not None:
+                cached = await llm_cache.get(cache.make_cache_key(model, config.TEMPERATURE, prompt))
+                if cached is not None:
+                    token_usage.record(stage, cached=True)
+                    llm_span.set(cache_hit=True)
+                    outcome = "cached"
+                    return cached, True
+            chat_completion = await scheduler.llm_scheduler.submit(
+                model,
+                lambda: client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=model,
+                    temperature=config.TEMPERATURE,
+                    response_format={"type": "json_object"},
+                ),
+                estimated_tokens=scheduler.estimate_tokens(prompt),
+                priority=priority,
+            )
+            usage = getattr(chat_completion, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", None) or compaction.count_tokens(prompt)
+            completion_tokens = getattr(usage, "completion_tokens", None) or 0
+            token_usage.record(stage, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            metrics.LLM_TOKENS.inc(prompt_tokens, model=model, stage=stage, kind="prompt")
+            metrics.LLM_TOKENS.inc(completion_tokens, model=model, stage=stage, kind="completion")
+            llm_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            response_content = chat_completion.choices[0].message.content or ""
+            parsed, complete = partial_json.parse_json_object(response_content)
+            if not complete:
+                stage_outputs.REPAIR_STATS["incomplete_json"] += 1
+                print(f"Incomplete JSON from model {model} ({stage}); kept fields: {sorted(parsed or {})}")
+                outcome = "incomplete"
+                return parsed or {}, False
+            outcome = "ok"
+            return parsed, False
+        except Exception as e:
+            print(f"An error occurred with the LLM call using model {model}: {e}")
+            llm_span.fail(str(e))
+            return {"error": str(e)}, False
+        finally:
+            metrics.LLM_CALLS.inc(model=model, stage=stage, outcome=outcome)
+
+async def _call_validated(
+    prompt: str,
+    model: str,
+    output_model,
+    priority: int = scheduler.PRIORITY_RESUME,
+    stage: str = "other"
+) -> dict:
+    # `_call_llm` with the response validated against `output_model` (analyzer.stage_outputs).
+    # Missing or invalid fields are asked for again on their own, up to LLM_REPAIR_ATTEMPTS
+    # times, and merged into the response. Returns the normalized output, or {"error": ...}.
+    response, cached = await _call_llm(prompt, model=model, priority=priority, stage=stage)
+    if "error" in response:
+        return response
+    output, fields, problems = stage_outputs.validate(output_model, response)
+    attempts = 0
+    while output is None and attempts < config.LLM_REPAIR_ATTEMPTS:
+        attempts += 1
+        print(f"Re-asking for {fields} of the {stage} output: {'; '.join(problems[:3])}")
+        repair_prompt = _format_prompt(
+            prompts.REPAIR_PROMPT,
+            original_prompt=prompt,
+            problems="\n".join(f"- {problem}" for problem in problems[:10]),
+            fields=", ".join(fields)
         )
-        response_content = chat_completion.choices[0].message.content
-        cleaned_response = _clean_json_from_llm(response_content)
-        return json.loads(cleaned_response)
-    except Exception as e:
-        print(f"An error occurred with the LLM call using model {model}: {e}")
-        return {"error": str(e)}
-
-async def _calculate_experience_years(experience_list: list) -> float:
-    # Uses an LLM to parse varied date formats and calculate total experience.
+        repair, _ = await _call_llm(repair_prompt, model=model, priority=priority, stage=f"{stage}_repair")
+        if "error" in repair:
+            break
+        response = {**response, **{field: repair[field] for field in fields if field in repair}}
+        output, fields, problems = stage_outputs.validate(output_model, response)
+
+    if output is None:
+        stage_outputs.REPAIR_STATS["unrepaired"] += 1
+        return {"error": f"Invalid {stage} output: {'; '.join(problems[:3])}"}
+    stage_outputs.REPAIR_STATS["repaired" if attempts else "valid"] += 1
+    # Cached under the original prompt, so the next identical call gets the valid (possibly repaired)
+    # output; a cache hit that needed no repair is already stored as it is.
+    if not cached or attempts:
+        await _cache_response(prompt, model, output)
+    return output
+
+async def _cache_response(prompt: str, model: str, output: dict):
+    # Stores a validated output for `prompt`. Raw or invalid responses, and the answers to
+    # repair prompts, are never cached: a retry would get the same bad answer back.
+    llm_cache = cache.get_llm_cache()
+    if llm_cache is not None:
+        await llm_cache.set(cache.make_cache_key(model, config.TEMPERATURE, prompt), output)
+
+async def _calculate_experience_years(experience_list: list):
+    # Calculates total experience locally; the LLM only handles date formats the parser doesn't know.
+    # Returns the years, or {"error": ...} when the LLM fallback fails.
     if not experience_list:
         return 0.0
-    
-    prompt = prompts.EXPERIENCE_CALCULATION_PROMPT.format(
-        experience_json=json.dumps(experience_list)
-    )
-    response = await _call_llm(prompt, model=config.STRUCTURING_MODEL)
-    return response.get("total_experience_years", 0.0)
 
-def _calculate_weighted_score(analysis: dict, requirements: dict, resume: dict, candidate_exp: float) -> int:
-    # Calculates a final score based on the LLM's analysis and defined weights.
-    seniority = requirements.get("seniority_level", "mid-level").lower()
-    
-    if "senior" in seniority:
-        MUST_HAVE_WEIGHT = 5  
-        NICE_TO_HAVE_WEIGHT = 2  
-        EXPERIENCE_WEIGHT = 20  
-        CERTIFICATION_BONUS = 1  
-        LEADERSHIP_BONUS = 3  
-    elif "entry" in seniority or "junior" in seniority:
-        MUST_HAVE_WEIGHT = 3
-        NICE_TO_HAVE_WEIGHT = 4  
-        EXPERIENCE_WEIGHT = 5
-        CERTIFICATION_BONUS = 5  
-        LEADERSHIP_BONUS = 5
-    else: 
-        MUST_HAVE_WEIGHT = 4  
-        NICE_TO_HAVE_WEIGHT = 3  
-        EXPERIENCE_WEIGHT = 8 
-        CERTIFICATION_BONUS = 3  
-        LEADERSHIP_BONUS = 2 
-    
-    MAX_PROFICIENCY_LEVEL = 3
-    
-    score = 0
-    max_score = 0
-    
-    def get_safe_level(level_value) -> int:
-        """Safely converts proficiency level to an integer, defaulting to 0."""
-        try:
-            return int(level_value)
-        except (ValueError, TypeError):
-            return 0
-
-    # Must-have skills
-    must_haves = analysis.get("skill_match_analysis", {}).get("must_have_matches", [])
-    max_score += len(requirements.get("must_have_skills", [])) * MUST_HAVE_WEIGHT * MAX_PROFICIENCY_LEVEL
-    for skill in must_haves:
-        # Use the safe getter to prevent type errors
-        level = get_safe_level(skill.get("proficiency_level"))
-        score += MUST_HAVE_WEIGHT * level
-    
-    # Nice-to-have skills
-    nice_to_haves = analysis.get("skill_match_analysis", {}).get("nice_to_have_matches", [])
-    max_score += len(requirements.get("nice_to_have_skills", [])) * NICE_TO_HAVE_WEIGHT * MAX_PROFICIENCY_LEVEL
-    for skill in nice_to_haves:
-        # Use the safe getter here too
-        level = get_safe_level(skill.get("proficiency_level"))
-        score += NICE_TO_HAVE_WEIGHT * level
-    
-    # Experience matching
-    required_exp = requirements.get("required_experience_years", 0)
-    max_score += EXPERIENCE_WEIGHT
-    if required_exp > 0:
-        experience_ratio = min(candidate_exp / required_exp, 1.2)
-        score += EXPERIENCE_WEIGHT * experience_ratio
-    else:
-        score += EXPERIENCE_WEIGHT
-    
-    # Certifications
-    certifications = resume.get("certifications_and_awards", [])
-    max_score += len(certifications) * CERTIFICATION_BONUS
-    score += len(certifications) * CERTIFICATION_BONUS
-    
-    # Leadership
-    leadership_roles = resume.get("leadership_and_extracurriculars", [])
-    max_score += len(leadership_roles) * LEADERSHIP_BONUS
-    score += len(leadership_roles) * LEADERSHIP_BONUS
-    
-    if max_score == 0:
-        return 0
-
-    normalized_score = int((score / max_score) * 90) + 10 # ! Try to add base bonus points later
-    return min(normalized_score, 100)
+    local_years = experience.calculate_experience_years(experience_list)
+    if local_years is not None:
+        experience.EXPERIENCE_STATS["local"] += 1
+        return local_years
 
+    experience.EXPERIENCE_STATS["llm_fallback"] += 1
+    print(f"Falling back to the LLM for experience durations: {[e.get('duration') for e in experience_list if isinstance(e, dict)]}")
+    prompt = _format_prompt(
+        prompts.EXPERIENCE_CALCULATION_PROMPT,
+        experience_json=json.dumps(experience_list),
+        current_date=date.today().strftime("%b %Y")
+    )
+    response = await _call_validated(prompt, model=config.STRUCTURING_MODEL, output_model=stage_outputs.ExperienceTotal, stage="experience")
+    if "error" in response:
+        return response
+    return response.get("total_experience_years", 0.0)
 
 async def deconstruct_jd(job_description_text: str) -> dict:
     # Analyzes the Job Description asynchronously.
     print("--- Stage 1: Deconstructing Job Description (Once) ---")
-    jd_prompt = prompts.JD_DECONSTRUCTION_PROMPT.format(job_description=job_description_text)
-    structured_jd = await _call_llm(jd_prompt, model=config.STRUCTURING_MODEL)
+    jd_prompt = _format_prompt(prompts.JD_DECONSTRUCTION_PROMPT, job_description=job_description_text)
+    structured_jd = await _call_validated(
+        jd_prompt, model=config.STRUCTURING_MODEL, output_model=stage_outputs.StructuredJD, priority=scheduler.PRIORITY_JD, stage="jd"
+    )
     if "error" in structured_jd:
         return {"error": "Failed to parse Job Description.", "details": structured_jd["error"]}
     print("✅ JD Deconstruction Complete.")
@@ -136,68 +155,221 @@ def _clean_resume_text(text: str) -> str:
     cleaned_lines = [line.strip() for line in lines if not line.strip().startswith('#')]
     return '\n'.join(cleaned_lines)
 
-async def analyze_single_resume(structured_jd: dict, resume_file_content: bytes, resume_filename: str) -> dict:
-    print(f"\n--- [{resume_filename}] Starting Analysis ---")
-    raw_resume_text = parsers.extract_text_from_pdf(resume_file_content)
-    if not raw_resume_text:
-        return {"error": "Failed to extract text from resume PDF."}
-    
-    resume_text = _clean_resume_text(raw_resume_text)
-    
-    print(f"--- [{resume_filename}] Analyzing Skills ---")
+def _prompt_resume_text(raw_resume_text: str) -> str:
+    if config.PROMPT_COMPACTION:
+        return compaction.compact_resume_text(raw_resume_text, token_budget=config.RESUME_TOKEN_BUDGET)
+    return _clean_resume_text(raw_resume_text)
+
+def _jd_skills_json(structured_jd: dict) -> str:
     jd_skills = {
         "must_have_skills": structured_jd.get("must_have_skills", []),
         "nice_to_have_skills": structured_jd.get("nice_to_have_skills", [])
     }
-    analysis_prompt = prompts.COMBINED_ANALYSIS_PROMPT.format(
-        jd_skills_json=json.dumps(jd_skills, indent=2), 
-        resume_text=resume_text
+    return json.dumps(jd_skills, indent=None if config.PROMPT_COMPACTION else 2)
+
+def build_resume_prompts(structured_jd: dict, raw_resume_text: str) -> dict:
+    """The prompts of the per-resume LLM stages, by stage name."""
+    resume_text = _prompt_resume_text(raw_resume_text)
+    return {
+        "skill_analysis": _format_prompt(
+            prompts.COMBINED_ANALYSIS_PROMPT,
+            jd_skills_json=_jd_skills_json(structured_jd),
+            resume_text=resume_text
+        ),
+        "holistic": _format_prompt(prompts.HOLISTIC_DATA_PARSER_PROMPT, resume_text=resume_text),
+        "quality": _format_prompt(prompts.RESUME_QUALITY_PROMPT, resume_text=resume_text),
+    }
+
+def build_single_pass_prompt(structured_jd: dict, raw_resume_text: str, include_resume: bool = True) -> str:
+    """The combined prompt of the single-pass pipeline; without `include_resume` it skips the holistic parse."""
+    return _format_prompt(
+        prompts.SINGLE_PASS_ANALYSIS_PROMPT,
+        resume_section_instructions=prompts.SINGLE_PASS_RESUME_INSTRUCTIONS if include_resume else "",
+        resume_section_schema=prompts.SINGLE_PASS_RESUME_SCHEMA if include_resume else "",
+        jd_skills_json=_jd_skills_json(structured_jd),
+        resume_text=_prompt_resume_text(raw_resume_text)
     )
-    skill_analysis = await _call_llm(analysis_prompt, model=config.ANALYSIS_MODEL)
+
+def split_single_pass_response(response: dict, include_resume: bool = True) -> dict:
+    """
+    Splits a single-pass response into the sections the multi-call stages return, by stage
+    name, each normalized by its analyzer.stage_outputs model. A section that fails validation is None.
+    """
+    sections = {
+        "skill_analysis": {
+            "skill_match_analysis": response.get("skill_match_analysis"),
+            "executive_summary": response.get("executive_summary"),
+        },
+        "quality": response.get("quality"),
+    }
+    if include_resume:
+        sections["holistic"] = response.get("resume")
+    valid = {}
+    for stage, section in sections.items():
+        output, _, problems = stage_outputs.validate(stage_outputs.SECTION_MODELS[stage], section)
+        if "error" in response:
+            output, problems = None, ["request failed"]
+        if output is None:
+            print(f"Single-pass {stage} section rejected: {'; '.join(problems[:3])}")
+        valid[stage] = output
+    return valid
+
+def stage_settings(pipeline_mode: Optional[str] = None) -> str:
+    """
+    Everything besides the resume and JD that shapes the stage outputs: prompt version, pipeline
+    mode, models, temperature and prompt compaction. Stored stage results are only reused under
+    the same settings (see pipeline.StageCheckpoint).
+    """
+    compaction_setting = f"{config.RESUME_TOKEN_BUDGET}" if config.PROMPT_COMPACTION else "off"
+    return (
+        f"prompts={prompts.PROMPT_VERSION};mode={pipeline_mode or config.PIPELINE_MODE};"
+        f"analysis={config.ANALYSIS_MODEL};structuring={config.STRUCTURING_MODEL};"
+        f"temperature={config.TEMPERATURE};compaction={compaction_setting}"
+    )
+
+@tracing.traced("analysis", resume="resume_filename")
+async def analyze_single_resume(
+    structured_jd: dict,
+    resume_document: dict,
+    resume_filename: str,
+    known_resume: Optional[dict] = None,
+    on_event: Optional[Callable[[dict], None]] = None,
+    pipeline_mode: Optional[str] = None,
+    checkpoint: Optional[pipeline.StageCheckpoint] = None,
+) -> dict:
+    """
+    Runs the per-resume stages against a deconstructed JD.
+    `resume_document` is the output of `parsers.extract_pdf_document`, extracted once by the caller.
+    `known_resume` ({"structured_resume": ..., "experience_years": ...}) comes from a previously
+    stored copy of the same resume; when given, the holistic parse and experience stages are skipped.
+    `on_event` receives a progress event as each stage starts and finishes.
+    `pipeline_mode` is one of config.PIPELINE_MODES, PIPELINE_MODE by default. In "single_pass"
+    mode one combined call comes first, and the other stages only call the LLM for the sections
+    of its response that failed validation.
+    `checkpoint` holds the stage results of an earlier failed attempt, which are reused, and
+    receives this attempt's (see pipeline.StageCheckpoint). A failed holistic parse, experience
+    calculation or quality assessment is recorded as failed there and listed in the result's
+    `incomplete_stages`; the score then uses a neutral fallback for it, which callers that store
+    results should not save as final.
+    """
+    mode = pipeline_mode or config.PIPELINE_MODE
+    if mode not in config.PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}'. Known modes: {list(config.PIPELINE_MODES)}")
+    print(f"\n--- [{resume_filename}] Starting Analysis ---")
+    raw_resume_text = resume_document.get("text", "")
+    if not raw_resume_text:
+        return {"error": "Failed to extract text from resume PDF."}
+    
+    resume_prompts = build_resume_prompts(structured_jd, raw_resume_text)
+
+    async def single_pass_stage():
+        print(f"--- [{resume_filename}] Analyzing Resume in a Single Pass ---")
+        include_resume = known_resume is None
+        prompt = build_single_pass_prompt(structured_jd, raw_resume_text, include_resume=include_resume)
+        response, cached = await _call_llm(prompt, model=config.ANALYSIS_MODEL, stage="single_pass")
+        sections = split_single_pass_response(response, include_resume=include_resume)
+        if not cached and all(section is not None for section in sections.values()):
+            await _cache_response(prompt, config.ANALYSIS_MODEL, response)
+        return sections
+
+    async def skill_analysis_stage(single_pass: Optional[dict] = None):
+        if single_pass and single_pass["skill_analysis"] is not None:
+            return single_pass["skill_analysis"]
+        print(f"--- [{resume_filename}] Analyzing Skills ---")
+        return await _call_validated(
+            resume_prompts["skill_analysis"], model=config.ANALYSIS_MODEL, output_model=stage_outputs.SkillAnalysis, stage="skill_analysis"
+        )
+
+    async def holistic_stage(single_pass: Optional[dict] = None):
+        if known_resume is not None:
+            return known_resume["structured_resume"]
+        if single_pass and single_pass["holistic"] is not None:
+            return single_pass["holistic"]
+        print(f"--- [{resume_filename}] Parsing Holistic Data ---")
+        return await _call_validated(
+            resume_prompts["holistic"], model=config.STRUCTURING_MODEL, output_model=stage_outputs.HolisticResume, stage="holistic"
+        )
+
+    async def experience_stage(holistic: dict):
+        if known_resume is not None:
+            return known_resume["experience_years"]
+        if "error" in holistic:
+            return {"error": "No parsed resume to calculate experience from."}
+        print(f"--- [{resume_filename}] Calculating Experience ---")
+        return await _calculate_experience_years(holistic.get("experience_and_projects", []))
+
+    async def quality_stage(single_pass: Optional[dict] = None):
+        if single_pass and single_pass["quality"] is not None:
+            return single_pass["quality"]
+        print(f"--- [{resume_filename}] Assessing Quality ---")
+        return await _call_validated(
+            resume_prompts["quality"], model=config.STRUCTURING_MODEL, output_model=stage_outputs.QualityAssessment, stage="quality"
+        )
+
+    # Only the experience calculation needs another stage's output; everything else runs together.
+    # In single-pass mode the section stages wait for the combined call and fill in its gaps.
+    section_deps = ["single_pass"] if mode == "single_pass" else []
+    stages = [pipeline.Stage("single_pass", single_pass_stage)] if mode == "single_pass" else []
+    results, stage_timings = await pipeline.run_stages(stages + [
+        pipeline.Stage("skill_analysis", skill_analysis_stage, depends_on=section_deps),
+        pipeline.Stage("holistic", holistic_stage, depends_on=section_deps),
+        pipeline.Stage("quality", quality_stage, depends_on=section_deps),
+        pipeline.Stage("experience", experience_stage, depends_on=["holistic"]),
+    ], on_event=on_event, checkpoint=checkpoint)
+    print(f"--- [{resume_filename}] Stage timings: {stage_timings} ---")
+
+    skill_analysis = results["skill_analysis"]
     if "error" in skill_analysis:
         return {"error": "Failed during combined analysis.", "details": skill_analysis["error"]}
+    incomplete_stages = [
+        name for name in ("holistic", "experience", "quality") if isinstance(results[name], dict) and "error" in results[name]
+    ]
 
     executive_summary = skill_analysis.get("executive_summary", "No summary available")
-
-    print(f"--- [{resume_filename}] Parsing Holistic Data ---")
-    holistic_prompt = prompts.HOLISTIC_DATA_PARSER_PROMPT.format(resume_text=resume_text)
-    structured_resume_holistic = await _call_llm(holistic_prompt, model=config.STRUCTURING_MODEL)
+    structured_resume_holistic = results["holistic"]
     if "error" in structured_resume_holistic:
         print(f"Warning: Failed to parse holistic data for {resume_filename}.")
         structured_resume_holistic = {}
+    candidate_experience_years = results["experience"]
+    if isinstance(candidate_experience_years, dict):
+        print(f"Warning: Failed to calculate experience for {resume_filename}; counting 0 years.")
+        candidate_experience_years = 0.0
 
-    print(f"--- [{resume_filename}] Calculating Experience ---")
-    candidate_experience_years = await _calculate_experience_years(
-        structured_resume_holistic.get("experience_and_projects", [])
-    )
-
-    final_analysis = skill_analysis
+    # A copy, so the skill analysis kept in `checkpoint` is not changed by what is added here.
+    final_analysis = dict(skill_analysis)
     final_analysis["experience_match_analysis"] = {
         "required_years": structured_jd.get("required_experience_years", 0),
         "calculated_candidate_years": candidate_experience_years,
         "is_sufficient": candidate_experience_years >= structured_jd.get("required_experience_years", 0)
     }
 
-    print(f"--- [{resume_filename}] Assessing Quality ---")
-    quality_prompt = prompts.RESUME_QUALITY_PROMPT.format(resume_text=resume_text)
-    quality_assessment = await _call_llm(quality_prompt, model=config.STRUCTURING_MODEL)
+    quality_assessment = results["quality"]
+    if "error" in quality_assessment:
+        # The score can do without the quality multiplier; a neutral one keeps the resume.
+        print(f"Warning: Failed to assess quality for {resume_filename}; using a neutral multiplier.")
+        quality_assessment = {"quality_score": 1.0, "red_flags": [], "assessed": False}
     quality_multiplier = quality_assessment.get("quality_score", 1.0)
     
     print(f"--- [{resume_filename}] Calculating Final Score ---")
-    unadjusted_score = _calculate_weighted_score(
+    unadjusted_score = scoring.weighted_score(
         final_analysis, 
         structured_jd, 
         structured_resume_holistic, 
-        candidate_experience_years
+        candidate_experience_years,
+        profile=config.SCORING_PROFILE
     )
-    final_score = int(unadjusted_score * quality_multiplier)
+    final_score = scoring.final_score(unadjusted_score, quality_multiplier)
 
     return {
         "final_score": final_score,
         "unadjusted_score": unadjusted_score,
+        "scoring_profile": config.SCORING_PROFILE,
+        "pipeline_mode": mode,
         "quality_assessment": quality_assessment,
         "llm_analysis": final_analysis,
         "structured_jd": structured_jd,
         "structured_resume": structured_resume_holistic,
         "executive_summary": executive_summary,
-    }
\ No newline at end of file
+        "stage_timings": stage_timings,
+        "incomplete_stages": incomplete_stages,
+    }
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Process-wide counters and histograms, rendered in the Prometheus text format by `render()`
+# (GET /metrics on the API, `--metrics-port` on a worker). Spans (analyzer.tracing) feed the
+# duration histograms; the LLM call path, scheduler and screening code feed the counters.
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def lines(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = SECONDS_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last one is +Inf), sum].
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            counts[0][index] += 1
+            counts[1] += value
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value read from `callback` whenever the metrics are rendered."""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float]):
+        super().__init__(name, description)
+        self.callback = callback
+
+    def lines(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.callback())}"]
+
+
+def resident_memory_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def peak_resident_memory_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB.
+
+
+REGISTRY: List[_Metric] = []
+
+SPAN_SECONDS = Histogram(
+    "resume_screener_span_seconds",
+    "Duration of traced operations: pipeline stages, LLM calls, PDF extraction and database queries and writes.",
+    ["span", "status"],
+)
+LLM_CALLS = Counter(
+    "resume_screener_llm_calls_total",
+    "LLM calls by model, pipeline stage and outcome (ok, cached, incomplete, error).",
+    ["model", "stage", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "resume_screener_llm_tokens_total",
+    "Tokens reported by the LLM provider, by model, pipeline stage and kind (prompt, completion).",
+    ["model", "stage", "kind"],
+)
+LLM_RETRIES = Counter(
+    "resume_screener_llm_retries_total",
+    "LLM calls retried after a throttled or failed attempt, by model and reason.",
+    ["model", "reason"],
+)
+LLM_WAIT_SECONDS = Histogram(
+    "resume_screener_llm_wait_seconds",
+    "Time an LLM call waited for its model's concurrency slot and rate limits before being sent.",
+    ["model"],
+)
+RESUME_EVENTS = Counter(
+    "resume_screener_resume_events_total",
+    "Per-resume screening events (resume_extracted, resume_saved, resume_skipped, resume_failed, ...).",
+    ["event"],
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "resume_screener_event_loop_lag_seconds",
+    "How late the event loop woke a sampling task that slept a fixed interval.",
+    buckets=LAG_BUCKETS,
+)
+Gauge("resume_screener_resident_memory_bytes", "Resident memory of this process.", resident_memory_bytes)
+Gauge("resume_screener_peak_resident_memory_bytes", "Peak resident memory of this process since it started.", peak_resident_memory_bytes)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines())
+    return "\n".join(lines) + "\n"
+
+
+async def serve(port: int, host: str = "0.0.0.0") -> asyncio.AbstractServer:
+    """A minimal HTTP endpoint answering every request with `render()`, for processes without an API."""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host=host, port=port)
@@ -1,23 +1,64 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 import fitz
 
+from . import config, tracing
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
 def extract_text_from_pdf(file_content: bytes) -> str:
     """
     Extracts text from the binary content of a PDF file.
     """
+    return extract_pdf_document(file_content)["text"]
+
+def extract_pdf_document(file_content: bytes) -> dict:
+    """
+    Extracts text and page metadata from the binary content of a PDF file.
+    Returns {"text": str, "page_count": int, "page_char_counts": [int, ...]}; text is empty on failure.
+    """
     doc = None
     try:
         doc = fitz.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        pages = [page.get_text() for page in doc]
+        return {
+            "text": "".join(pages),
+            "page_count": len(pages),
+            "page_char_counts": [len(page) for page in pages],
+        }
     except Exception as e:
         print(f"Error reading PDF file: {e}")
-        return ""
+        return {"text": "", "page_count": 0, "page_char_counts": []}
     finally:
         if doc:
             doc.close()
 
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(max_workers=config.PDF_EXTRACTION_WORKERS)
+    return _extraction_pool
+
+async def extract_pdf_document_async(file_content: bytes) -> dict:
+    """
+    Runs `extract_pdf_document` in the shared process pool so PyMuPDF never blocks the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    with tracing.span("pdf_extraction", bytes=len(file_content)) as extraction_span:
+        document = await loop.run_in_executor(_get_extraction_pool(), extract_pdf_document, file_content)
+        extraction_span.set(pages=document["page_count"])
+        if not document["text"]:
+            extraction_span.fail("no text extracted")
+        return document
+
+def shutdown_extraction_pool():
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
 def extract_text_from_txt(file_content: bytes) -> str:
     """
     Decodes the binary content of a TXT file into a string, ignoring errors.
@@ -0,0 +1,98 @@
+import json
+from typing import List, Optional, Tuple
+
+# Tolerant parsing of LLM JSON output. The model may wrap the object in prose or code fences,
+# follow it with more text, or stop mid-object when it runs out of tokens. A single pass over
+# the text tracks the open objects/arrays and the last point at which a top-level field was
+# complete; a truncated object is cut there and closed. Fields cut short are left out rather
+# than kept half-written (a shortened email or skill list would look valid), so the caller can
+# ask for just those again.
+
+_DELIMITERS = set(",}] \t\r\n")
+
+
+def _load(text: str) -> Optional[dict]:
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_json_object(text: str) -> Tuple[Optional[dict], bool]:
+    """
+    The first JSON object in `text`, and whether it was complete. A truncated object is
+    recovered with its top-level fields finished before the cut; (None, False) if no object starts.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None, False
+
+    # Each open container is [kind, state]; an object expects a "key", then a "colon", then a
+    # "value", then a "comma" (or its end); an array alternates "value" and "comma".
+    stack: List[list] = []
+    last_cut: Optional[str] = None
+    i, n = start, len(text)
+
+    def value_ended(end: int):
+        nonlocal last_cut
+        if stack:
+            stack[-1][1] = "comma"
+            if len(stack) == 1:
+                last_cut = text[start:end] + "}"
+
+    while i < n:
+        char = text[i]
+        if char == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == "\\" else 1
+            if j >= n:
+                break
+            i = j + 1
+            if stack and stack[-1][0] == "{" and stack[-1][1] == "key":
+                stack[-1][1] = "colon"
+            else:
+                value_ended(i)
+            continue
+        if char in "{[":
+            if stack and stack[-1][1] != "value":
+                break
+            stack.append([char, "key" if char == "{" else "value"])
+            i += 1
+            if len(stack) == 1:
+                last_cut = text[start:i] + "}"
+            continue
+        if char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            i += 1
+            if not stack:
+                complete = _load(text[start:i])
+                if complete is not None:
+                    return complete, True
+                break
+            value_ended(i)
+            continue
+        if char == ":":
+            if stack and stack[-1][1] == "colon":
+                stack[-1][1] = "value"
+        elif char == ",":
+            if stack:
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+        elif not char.isspace():
+            # A number or literal counts only once a delimiter shows it was not cut short.
+            j = i
+            while j < n and text[j] not in _DELIMITERS:
+                j += 1
+            if j >= n:
+                break
+            i = j
+            value_ended(i)
+            continue
+        i += 1
+
+    if last_cut is not None:
+        return _load(last_cut), False
+    return None, False
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import tracing
+
+
+class Stage:
+    """
+    A single named step of the per-resume pipeline.
+    `func` is an async callable that receives the results of `depends_on` as keyword arguments.
+    """
+    def __init__(self, name: str, func: Callable[..., Awaitable[Any]], depends_on: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class StageCheckpoint:
+    """
+    Stage results carried over from an earlier run of the same pipeline on the same input.
+    `run_stages` reuses a stage found in `finished` unless one of its dependencies ran again,
+    and records each stage it runs: its result in `finished` or its error in `failed`. A caller
+    persists both after a failed run, so the next attempt only repeats the missing or failed stages.
+    """
+    def __init__(self, finished: Optional[Dict[str, Any]] = None):
+        self.finished: Dict[str, Any] = dict(finished or {})
+        self.failed: Dict[str, str] = {}
+        self.reused: Set[str] = set()
+
+
+async def run_stages(
+    stages: List[Stage],
+    on_event: Optional[Callable[[dict], None]] = None,
+    checkpoint: Optional[StageCheckpoint] = None,
+) -> Tuple[Dict[str, Any], Dict[str, dict]]:
+    """
+    Runs a list of stages as a dependency graph: every stage starts as soon as the stages
+    it depends on have finished, so independent stages overlap.
+    Returns (results by stage name, timings by stage name). Timings hold the offset at which
+    the stage started and its duration, both in seconds relative to the start of the run.
+    `on_event`, if given, is called with {"stage", "status", ...} as each stage starts and ends,
+    or once with status "reused" for a stage taken from `checkpoint` (see StageCheckpoint).
+    """
+    known = set()
+    for stage in stages:
+        # Dependencies must be declared before the stage, which also rules out cycles.
+        for dep in stage.depends_on:
+            if dep not in known:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown or later stage '{dep}'.")
+        if stage.name in known:
+            raise ValueError(f"Duplicate stage name '{stage.name}'.")
+        known.add(stage.name)
+
+    run_start = time.perf_counter()
+    tasks: Dict[str, asyncio.Task] = {}
+    timings: Dict[str, dict] = {}
+
+    async def _run(stage: Stage):
+        inputs = {dep: await tasks[dep] for dep in stage.depends_on}
+        started = time.perf_counter()
+        if (
+            checkpoint is not None
+            and stage.name in checkpoint.finished
+            and all(dep in checkpoint.reused for dep in stage.depends_on)
+        ):
+            checkpoint.reused.add(stage.name)
+            timings[stage.name] = {"started_at": round(started - run_start, 4), "duration": 0.0}
+            if on_event:
+                on_event({"stage": stage.name, "status": "reused"})
+            return checkpoint.finished[stage.name]
+        status = "failed"
+        if on_event:
+            on_event({"stage": stage.name, "status": "started"})
+        try:
+            with tracing.span(f"stage.{stage.name}") as stage_span:
+                result = await stage.func(**inputs)
+                # Stages report failures as {"error": ...} rather than raising.
+                if isinstance(result, dict) and "error" in result:
+                    stage_span.fail(str(result["error"]))
+            if checkpoint is not None:
+                if isinstance(result, dict) and "error" in result:
+                    checkpoint.finished.pop(stage.name, None)
+                    checkpoint.failed[stage.name] = str(result["error"])
+                else:
+                    checkpoint.finished[stage.name] = result
+                    checkpoint.failed.pop(stage.name, None)
+            status = "finished"
+            return result
+        finally:
+            finished = time.perf_counter()
+            timings[stage.name] = {
+                "started_at": round(started - run_start, 4),
+                "duration": round(finished - started, 4),
+            }
+            if on_event:
+                on_event({"stage": stage.name, "status": status, "duration": timings[stage.name]["duration"]})
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(_run(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    results = {name: task.result() for name, task in tasks.items()}
+    timings["total"] = {"started_at": 0.0, "duration": round(time.perf_counter() - run_start, 4)}
+    return results, timings
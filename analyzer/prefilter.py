@@ -0,0 +1,242 @@
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import config, experience, scoring
+
+# Lexical skill matching used to shortlist resumes before any LLM call. Each JD skill is
+# matched by its name and known aliases; the implication rules mirror the MANDATORY INFERENCE
+# RULES of prompts.COMBINED_ANALYSIS_PROMPT, so a resume gets the same credit for implied
+# skills as the LLM would give it.
+
+# Spellings of the same skill. Lookups are by any member of a group.
+SKILL_ALIASES = [
+    ["javascript", "js", "ecmascript", "es6"],
+    ["typescript"],
+    ["postgresql", "postgres"],
+    ["kubernetes", "k8s"],
+    ["aws", "amazon web services"],
+    ["gcp", "google cloud", "google cloud platform"],
+    ["azure", "microsoft azure"],
+    ["rest apis", "rest api", "restful apis", "restful api", "restful"],
+    ["node.js", "nodejs", "node"],
+    ["react", "react.js", "reactjs"],
+    ["vue", "vue.js", "vuejs"],
+    ["angular", "angularjs"],
+    ["machine learning", "ml"],
+    ["ci/cd", "continuous integration", "continuous delivery"],
+    ["hibernate/jpa", "hibernate", "jpa"],
+    ["maven or gradle", "maven", "gradle"],
+    ["sql", "structured query language"],
+    ["git", "version control"],
+    ["http", "http/rest"],
+    ["c++", "cpp"],
+    ["c#", "csharp"],
+    ["golang", "go"],
+]
+
+# (terms found in the resume, skills they imply, proficiency level implied).
+SKILL_IMPLICATIONS = [
+    (["spring boot", "springboot"], ["rest apis", "hibernate/jpa", "maven or gradle"], 2),
+    (["mysql", "postgresql", "postgres", "sqlite", "oracle", "sql server", "mariadb", "database"], ["sql", "database management", "databases"], 2),
+    (["git", "github", "gitlab"], ["git"], 2),
+    (["web development", "web application", "web app", "website"], ["http", "rest apis"], 2),
+    (["flask", "django"], ["fastapi"], 2),
+    (["vue", "vue.js", "angular"], ["react"], 2),
+    (["azure", "gcp", "google cloud"], ["aws"], 2),
+]
+
+_ALIAS_GROUPS: Dict[str, List[str]] = {alias: group for group in SKILL_ALIASES for alias in group}
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|\d{1,2}/)?(?:19|20)\d{2}"
+_DATE_RANGE = re.compile(rf"\b{_DATE}\s*(?:-|–|—|\bto\b)\s*(?:{_DATE}|present|current|now)\b", re.IGNORECASE)
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: finds every occurrence of any pattern in one pass over the text,
+    however many patterns there are. Only whole-word occurrences are reported.
+    """
+    def __init__(self, patterns: Dict[str, list]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, list]]] = [[]]
+        for pattern, payloads in patterns.items():
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].append((pattern, payloads))
+
+        # Breadth-first failure links: the longest proper suffix that is also a trie path.
+        # Depth-1 nodes fail to the root, which they already do.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str):
+        """Yields (start, end, pattern, payloads) for each whole-word match in `text`."""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for pattern, payloads in self._output[node]:
+                start = index - len(pattern) + 1
+                end = index + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    yield start, end, pattern, payloads
+
+
+def _skill_forms(skill: str) -> set:
+    """Lowercase spellings that count as a mention of a JD skill, e.g. "REST APIs (JSON)" -> rest, restful, ..."""
+    skill = skill.lower().strip()
+    parts = {skill}
+    parts.update(part.strip() for part in re.split(r"[()/,]|\bor\b|\band\b", skill))
+    forms = set()
+    for part in parts:
+        if len(part) < 2:
+            continue
+        forms.add(part)
+        forms.update(_ALIAS_GROUPS.get(part, []))
+    return forms
+
+
+class SkillMatch:
+    """Lexical proficiency evidence for each JD skill in one resume."""
+    def __init__(self, levels: Dict[str, int], evidence: Dict[str, str]):
+        self.levels = levels
+        self.evidence = evidence
+
+
+class SkillMatcher:
+    """
+    Built once per job from its structured JD; `match` then scans a resume in a single pass.
+    Direct mentions give level 1 (2 with two or more mentions, 3 with four or more), and a
+    term from SKILL_IMPLICATIONS gives at least the implied level.
+    """
+    def __init__(self, structured_jd: dict):
+        self.must_have_skills = list(structured_jd.get("must_have_skills", []))
+        self.nice_to_have_skills = list(structured_jd.get("nice_to_have_skills", []))
+        patterns: Dict[str, list] = {}
+        for skill in self.must_have_skills + self.nice_to_have_skills:
+            forms = _skill_forms(skill)
+            for form in forms:
+                patterns.setdefault(form, []).append(("mention", skill, 0))
+            for triggers, implied, level in SKILL_IMPLICATIONS:
+                if forms & {form for target in implied for form in _skill_forms(target)}:
+                    for trigger in triggers:
+                        patterns.setdefault(trigger, []).append(("implied", skill, level))
+        self._automaton = AhoCorasick(patterns)
+
+    def match(self, resume_text: str) -> SkillMatch:
+        text = resume_text.lower()
+        mentions: Dict[str, int] = {}
+        implied: Dict[str, int] = {}
+        evidence: Dict[str, str] = {}
+        for start, end, _, payloads in self._automaton.find(text):
+            for kind, skill, level in payloads:
+                if kind == "mention":
+                    mentions[skill] = mentions.get(skill, 0) + 1
+                else:
+                    implied[skill] = max(implied.get(skill, 0), level)
+                evidence.setdefault(skill, resume_text[max(0, start - 40):end + 40].replace("\n", " ").strip())
+
+        levels = {}
+        for skill in self.must_have_skills + self.nice_to_have_skills:
+            count = mentions.get(skill, 0)
+            mention_level = 3 if count >= 4 else 2 if count >= 2 else 1 if count else 0
+            levels[skill] = max(mention_level, implied.get(skill, 0))
+        return SkillMatch(levels, evidence)
+
+
+def estimate_experience_years(resume_text: str) -> float:
+    """
+    Years covered by the date ranges found anywhere in the resume, overlaps merged. Unlike the
+    parsed experience list this also counts education ranges, so it is only a rough estimate.
+    """
+    durations = [{"duration": match.group(0)} for match in _DATE_RANGE.finditer(resume_text)]
+    return experience.calculate_experience_years(
+        [entry for entry in durations if experience.parse_duration(entry["duration"]) is not None]
+    )
+
+
+def _guess_identity(resume_text: str, resume_filename: str) -> Tuple[str, Optional[str]]:
+    """Name and email without the holistic LLM parse: the first short line, and the first email address."""
+    email = _EMAIL.search(resume_text)
+    name = None
+    for line in resume_text.splitlines():
+        line = line.strip()
+        if line:
+            if len(line) <= 60 and not any(char.isdigit() or char == "@" for char in line):
+                name = line.title() if line.isupper() else line
+            break
+    return name or Path(resume_filename).stem, email.group(0) if email else None
+
+
+def provisional_analysis(structured_jd: dict, resume_document: dict, resume_filename: str, skill_match: SkillMatch) -> dict:
+    """
+    A stand-in for `analyze_single_resume` built from the lexical match alone, for resumes that
+    are not shortlisted. Same shape, so it is stored and re-scored like a full analysis; the
+    experience comes from `estimate_experience_years` and the quality stage is not run (1.0).
+    """
+    def matches(skills: List[str]) -> list:
+        return [
+            {"skill": skill, "proficiency_level": skill_match.levels[skill], "evidence_from_resume": skill_match.evidence.get(skill, "")}
+            for skill in skills
+        ]
+
+    required_years = structured_jd.get("required_experience_years", 0)
+    candidate_years = estimate_experience_years(resume_document.get("text", ""))
+    llm_analysis = {
+        "skill_match_analysis": {
+            "must_have_matches": matches(structured_jd.get("must_have_skills", [])),
+            "nice_to_have_matches": matches(structured_jd.get("nice_to_have_skills", [])),
+        },
+        "executive_summary": "Provisional keyword-based score: this resume was not shortlisted for the full AI analysis.",
+        "experience_match_analysis": {
+            "required_years": required_years,
+            "calculated_candidate_years": candidate_years,
+            "is_sufficient": candidate_years >= required_years,
+        },
+    }
+    full_name, contact_info = _guess_identity(resume_document.get("text", ""), resume_filename)
+    structured_resume = {"full_name": full_name}
+    if contact_info:
+        structured_resume["contact_info"] = contact_info
+    unadjusted_score = scoring.weighted_score(llm_analysis, structured_jd, {}, candidate_years, profile=config.SCORING_PROFILE)
+    return {
+        "final_score": unadjusted_score,
+        "unadjusted_score": unadjusted_score,
+        "scoring_profile": config.SCORING_PROFILE,
+        "quality_assessment": {"quality_score": 1.0, "red_flags": []},
+        "llm_analysis": llm_analysis,
+        "structured_resume": structured_resume,
+        "executive_summary": llm_analysis["executive_summary"],
+        "provisional": True,
+    }
+
+
+def select_shortlist(scores: List[float], top_k: Optional[int] = None, min_score: Optional[float] = None) -> set:
+    """
+    Indexes of the resumes that go to the full pipeline: those scoring at least `min_score`,
+    capped at the `top_k` best. With neither limit every resume is shortlisted.
+    """
+    ranked = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+    if min_score is not None:
+        ranked = [index for index in ranked if scores[index] >= min_score]
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return set(ranked)
@@ -1,3 +1,7 @@
+# Bump whenever any prompt below changes so cached LLM responses and stored stage results
+# (analyzer.main.stage_settings) for the old wording are not reused.
+PROMPT_VERSION = "4"
+
 # --- Prompt to deconstruct the Job Description ---
 JD_DECONSTRUCTION_PROMPT = """
 
@@ -181,7 +185,7 @@ Strictly adhere to the following rules:
 # --- Prompt to calculate total years of experience from a list of durations ---
 EXPERIENCE_CALCULATION_PROMPT = """
 
-You are a specialized calculator. Based on the provided list of job/project durations, calculate the total years of experience as a single floating-point number. Assume 'Present' or ongoing dates mean the current date (Oct 2025). Sum up all durations. Return only a single raw JSON object with one key: "total_experience_years".
+You are a specialized calculator. Based on the provided list of job/project durations, calculate the total years of experience as a single floating-point number. Assume 'Present' or ongoing dates mean the current date ({current_date}). Sum up all durations. Return only a single raw JSON object with one key: "total_experience_years".
 
 ### EXPERIENCE LIST ###
 
@@ -237,3 +241,92 @@ Return a single JSON object:
 
 ### END OF RESUME TEXT ###
 """
+
+# --- Single-pass prompt: skill analysis, quality assessment and (optionally) holistic parse in one call ---
+SINGLE_PASS_ANALYSIS_PROMPT = """
+
+You are an expert recruitment analyst. Read the resume once and fill in every section of the JSON output below. The output MUST be a single, raw JSON object.
+
+### SECTION: skill_match_analysis and executive_summary ###
+
+Be optimistic: identify candidate potential and give credit for implied skills. If a candidate uses a framework/technology, automatically credit them for ALL skills that framework requires.
+
+Mandatory inference rules:
+- Spring Boot → level 2-3 for RESTful APIs, Hibernate/JPA, and Maven or Gradle
+- MySQL/PostgreSQL/database work → level 2 for SQL and database management
+- ANY mention of Git, GitHub, GitLab → level 2 for Git
+- Web development projects → level 2 for HTTP/REST concepts
+- ANY similar framework (Flask/Django for FastAPI, Vue/Angular for React, Azure for AWS) → level 2 for the required skill
+
+Proficiency levels:
+- 3: Multiple substantial projects using this skill OR it's their primary tech stack
+- 2: Used in at least one project OR heavily implied by their tech stack OR similar technology demonstrated
+- 1: Mentioned anywhere in resume OR adjacent technology present
+- 0: ONLY if absolutely zero evidence AND no related technologies whatsoever
+
+For Entry-level and Intern roles, be especially generous. Give one match per required skill, with the actual quote from the resume as `evidence_from_resume`. Then write a 2-3 sentence `executive_summary` focusing on strengths, ending with an optimistic note on what the candidate is missing.
+
+### SECTION: quality ###
+
+Assess the resume CONTENT, not formatting: clarity, quantified impact, technical depth, professional language and completeness.
+- 0.95-1.00: Exceptional - multiple quantified achievements, deep technical details, clear business impact
+- 0.88-0.94: Strong - several quantified results, good technical depth
+- 0.80-0.87: Good - some quantification, adequate technical details
+- 0.72-0.79: Average - basic descriptions, minimal metrics
+- 0.65-0.71: Below average - vague descriptions, no quantification, missing key sections
+- 0.50-0.64: Poor - very minimal information, unclear narrative
+
+Red flags: missing work experience, no technical skills at all, unexplained employment gaps over 1 year, contradictory information, unprofessional language. Do NOT flag minor typos, formatting or style.
+{resume_section_instructions}
+### JSON OUTPUT SCHEMA ###
+
+{{
+"skill_match_analysis": {{
+"must_have_matches": [{{"skill": "string", "proficiency_level": "integer (0-3)", "evidence_from_resume": "string"}}, ... ],
+"nice_to_have_matches": [{{"skill": "string", "proficiency_level": "integer (0-3)", "evidence_from_resume": "string"}}, ... ]
+}},
+"executive_summary": "string",
+"quality": {{"quality_score": 0.xx, "red_flags": ["string", ...]}}{resume_section_schema}
+}}
+
+### REQUIRED SKILLS (JSON from Job Description) ###
+
+{jd_skills_json}
+
+### END OF REQUIRED SKILLS ###
+
+### RESUME TEXT ###
+
+{resume_text}
+
+### END OF RESUME TEXT ###
+
+"""
+
+# Filled into SINGLE_PASS_ANALYSIS_PROMPT unless the candidate's resume is already parsed.
+SINGLE_PASS_RESUME_INSTRUCTIONS = """
+### SECTION: resume ###
+
+Extract the candidate's details. Combine "Work Experience" and "Projects" into a single `experience_and_projects` list. `contact_info` is the primary email address, else the phone number, else 'Not Found'. Use an empty list for any section that is not found.
+"""
+
+SINGLE_PASS_RESUME_SCHEMA = """,
+"resume": {
+"full_name": "string",
+"contact_info": "string",
+"experience_and_projects": [{"title": "string", "duration": "string"}, ... ],
+"certifications_and_awards": ["string", ...],
+"leadership_and_extracurriculars": ["string", ...]
+}"""
+
+# --- Prompt to re-ask for the fields of a response that were missing or invalid ---
+REPAIR_PROMPT = """
+{original_prompt}
+
+### CORRECTION ###
+
+Your previous answer to the task above was incomplete or invalid:
+{problems}
+
+Return a single raw JSON object with ONLY these keys, their values complete and following the schema above: {fields}
+"""
@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from . import config, metrics, tracing
+
+# Lower numbers run first. JD deconstruction gates a whole batch, so it jumps the resume queue.
+PRIORITY_JD = 0
+PRIORITY_RESUME = 10
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class TokenBucket:
+    """
+    Refills `rate_per_minute` units per minute up to `capacity`.
+    `acquire` waits until the requested amount is available, then takes it. Waiters are served
+    in (priority, arrival) order: only the first may take tokens, and a higher-priority arrival
+    takes its place, so a large low-priority request does not hold up urgent ones behind it.
+    """
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        # Set (and replaced) whenever the waiters or the balance change, so waiters check again.
+        self._changed = asyncio.Event()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def acquire(self, amount: float = 1.0, priority: int = PRIORITY_RESUME):
+        # A single request larger than the bucket would otherwise wait forever.
+        amount = min(amount, self.capacity)
+        self._refill()
+        if not self._waiters and self.tokens >= amount:
+            self.tokens -= amount
+            return
+        entry = (priority, next(self._counter))
+        heapq.heappush(self._waiters, entry)
+        self._notify()
+        try:
+            while True:
+                self._refill()
+                timeout = None
+                if self._waiters[0] == entry:
+                    if self.tokens >= amount:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= amount
+                        return
+                    timeout = (amount - self.tokens) / self.rate_per_second
+                # Nothing is held while waiting: a new first waiter or a refund wakes this one early.
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if entry in self._waiters:  # Cancelled while waiting.
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            self._notify()
+
+    def adjust(self, delta: float):
+        """Corrects an earlier estimate once the real usage is known. The balance may go negative."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+        if delta < 0:
+            self._notify()
+
+
+class PriorityGate:
+    """A counting semaphore that admits waiters in (priority, arrival) order."""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._counter), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on.
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class _ModelLane:
+    def __init__(self, limits: dict):
+        self.gate = PriorityGate(limits["max_concurrency"])
+        self.requests = TokenBucket(limits["requests_per_minute"])
+        self.tokens = TokenBucket(limits["tokens_per_minute"])
+
+
+def _is_retryable(error: Exception) -> bool:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        # Connection errors and timeouts carry no status code but are worth another try.
+        return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """
+    Central admission control for LLM calls. Every model gets its own concurrency limit and
+    request/token buckets (see `config.MODEL_LIMITS`); throttled and 5xx responses are retried
+    with jittered exponential backoff instead of being surfaced as failures.
+    """
+    def __init__(self, model_limits: Dict[str, dict], max_retries: int = config.LLM_MAX_RETRIES):
+        self.model_limits = model_limits
+        self.max_retries = max_retries
+        self._lanes: Dict[str, _ModelLane] = {}
+
+    def _lane(self, model: str) -> _ModelLane:
+        if model not in self._lanes:
+            limits = self.model_limits.get(model, config.DEFAULT_MODEL_LIMITS)
+            self._lanes[model] = _ModelLane(limits)
+        return self._lanes[model]
+
+    async def submit(
+        self,
+        model: str,
+        call: Callable[[], Awaitable[Any]],
+        estimated_tokens: int,
+        priority: int = PRIORITY_RESUME,
+    ) -> Any:
+        lane = self._lane(model)
+        span = tracing.current_span()
+        attempt = 0
+        while True:
+            waiting_since = time.perf_counter()
+            # Rate limits first, then a concurrency slot, each in priority order; a slot is not held
+            # while waiting for the buckets, so urgent calls are not stuck behind throttled ones.
+            await lane.requests.acquire(1, priority)
+            await lane.tokens.acquire(estimated_tokens, priority)
+            await lane.gate.acquire(priority)
+            try:
+                waited = time.perf_counter() - waiting_since
+                metrics.LLM_WAIT_SECONDS.observe(waited, model=model)
+                if span is not None:
+                    span.add("wait_seconds", round(waited, 4))
+                result = await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_after_seconds(e)
+                if delay is None:
+                    delay = min(config.LLM_RETRY_MAX_DELAY, config.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+                delay *= random.uniform(1.0, 1.5)
+                attempt += 1
+                metrics.LLM_RETRIES.inc(model=model, reason=str(getattr(e, "status_code", None) or type(e).__name__))
+                if span is not None:
+                    span.add("retries")
+                print(f"LLM call to {model} throttled or failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            else:
+                usage = getattr(result, "usage", None)
+                total_tokens = getattr(usage, "total_tokens", None)
+                if total_tokens is not None:
+                    lane.tokens.adjust(total_tokens - estimated_tokens)
+                return result
+            finally:
+                lane.gate.release()
+            await asyncio.sleep(delay)
+
+
+def estimate_tokens(prompt: str) -> int:
+    # Roughly four characters per token, plus room for the completion.
+    return len(prompt) // 4 + config.ESTIMATED_COMPLETION_TOKENS
+
+
+llm_scheduler = LLMScheduler(config.MODEL_LIMITS)
@@ -0,0 +1,104 @@
+from typing import Optional
+
+from . import config
+
+# Versioned scoring weights by seniority band. A profile is never edited once screenings have
+# been scored with it: add a new version instead, then re-score stored screenings with it
+# (`python -m backend.rescore --profile <version>`), which needs no LLM calls.
+WEIGHT_PROFILES = {
+    "v1": {
+        "senior": {"must_have": 5, "nice_to_have": 2, "experience": 20, "certification": 1, "leadership": 3},
+        "entry": {"must_have": 3, "nice_to_have": 4, "experience": 5, "certification": 5, "leadership": 5},
+        "mid": {"must_have": 4, "nice_to_have": 3, "experience": 8, "certification": 3, "leadership": 2},
+    },
+}
+
+MAX_PROFICIENCY_LEVEL = 3
+
+
+def seniority_band(seniority_level: Optional[str]) -> str:
+    seniority = (seniority_level or "mid-level").lower()
+    if "senior" in seniority:
+        return "senior"
+    if "entry" in seniority or "junior" in seniority:
+        return "entry"
+    return "mid"
+
+
+def get_weights(requirements: dict, profile: Optional[str] = None) -> dict:
+    profile = profile or config.SCORING_PROFILE
+    if profile not in WEIGHT_PROFILES:
+        raise ValueError(f"Unknown scoring profile '{profile}'. Known profiles: {sorted(WEIGHT_PROFILES)}")
+    return WEIGHT_PROFILES[profile][seniority_band(requirements.get("seniority_level", "mid-level"))]
+
+
+def safe_level(level_value) -> int:
+    """Safely converts proficiency level to an integer, defaulting to 0."""
+    try:
+        return int(level_value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def level_sum(levels) -> int:
+    return sum(safe_level(level) for level in levels)
+
+
+def requirement_features(requirements: dict) -> dict:
+    """The part of the features that comes from the job's structured JD."""
+    return {
+        "must_have_required": len(requirements.get("must_have_skills", [])),
+        "nice_to_have_required": len(requirements.get("nice_to_have_skills", [])),
+        "required_exp": requirements.get("required_experience_years", 0),
+    }
+
+
+def extract_features(analysis: dict, requirements: dict, resume: dict, candidate_exp: float) -> dict:
+    """
+    Reduces the stored analysis of one screening to the counts and sums the score depends on.
+    `analysis` is the screening's `skill_match_analysis`, `resume` the candidate's `structured_resume`.
+    """
+    matches = analysis.get("skill_match_analysis", {})
+    return {
+        "must_have_level_sum": level_sum(skill.get("proficiency_level") for skill in matches.get("must_have_matches", [])),
+        "nice_to_have_level_sum": level_sum(skill.get("proficiency_level") for skill in matches.get("nice_to_have_matches", [])),
+        **requirement_features(requirements),
+        "candidate_exp": candidate_exp,
+        "certifications": len(resume.get("certifications_and_awards", [])),
+        "leadership": len(resume.get("leadership_and_extracurriculars", [])),
+    }
+
+
+def score_features(features: dict, weights: dict) -> int:
+    """The weighted score (10-100) of one screening's features, before the quality multiplier."""
+    score = features["must_have_level_sum"] * weights["must_have"] + features["nice_to_have_level_sum"] * weights["nice_to_have"]
+    max_score = (features["must_have_required"] * weights["must_have"] + features["nice_to_have_required"] * weights["nice_to_have"]) * MAX_PROFICIENCY_LEVEL
+
+    # Experience matching
+    max_score += weights["experience"]
+    if features["required_exp"] > 0:
+        experience_ratio = min(features["candidate_exp"] / features["required_exp"], 1.2)
+        score += weights["experience"] * experience_ratio
+    else:
+        score += weights["experience"]
+
+    # Certifications and leadership count fully towards both the score and the maximum.
+    max_score += features["certifications"] * weights["certification"]
+    score += features["certifications"] * weights["certification"]
+    max_score += features["leadership"] * weights["leadership"]
+    score += features["leadership"] * weights["leadership"]
+
+    if max_score == 0:
+        return 0
+
+    normalized_score = int((score / max_score) * 90) + 10 # ! Try to add base bonus points later
+    return min(normalized_score, 100)
+
+
+def weighted_score(analysis: dict, requirements: dict, resume: dict, candidate_exp: float, profile: Optional[str] = None) -> int:
+    """Calculates the score from the LLM's analysis and the weights of a scoring profile."""
+    return score_features(extract_features(analysis, requirements, resume, candidate_exp), get_weights(requirements, profile))
+
+
+def final_score(unadjusted_score: int, quality_multiplier: float) -> int:
+    return int(unadjusted_score * quality_multiplier)
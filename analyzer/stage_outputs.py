@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+# The JSON each LLM stage must return. Responses are validated against these models; the
+# top-level fields that are missing or invalid are asked for again on their own (see
+# analyzer.main), instead of the whole resume failing. Extra keys the model adds are kept.
+
+
+class _StageOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class StructuredJD(_StageOutput):
+    job_title: str = ""
+    seniority_level: str = "Mid-level"
+    required_experience_years: float = Field(default=0, ge=0)
+    must_have_skills: List[str]
+    nice_to_have_skills: List[str] = []
+
+
+class SkillMatch(_StageOutput):
+    skill: str
+    proficiency_level: int = Field(ge=0, le=3)
+    evidence_from_resume: str = ""
+
+
+class SkillMatchAnalysis(_StageOutput):
+    must_have_matches: List[SkillMatch]
+    nice_to_have_matches: List[SkillMatch] = []
+
+
+class SkillAnalysis(_StageOutput):
+    skill_match_analysis: SkillMatchAnalysis
+    executive_summary: str = Field(min_length=1)
+
+
+class ExperienceEntry(_StageOutput):
+    title: str = ""
+    duration: str = ""
+
+
+class HolisticResume(_StageOutput):
+    full_name: str = Field(min_length=1)
+    contact_info: str = Field(min_length=1)
+    experience_and_projects: List[ExperienceEntry] = []
+    certifications_and_awards: List[str] = []
+    leadership_and_extracurriculars: List[str] = []
+
+
+class ExperienceTotal(_StageOutput):
+    total_experience_years: float = Field(ge=0)
+
+
+class QualityAssessment(_StageOutput):
+    quality_score: float = Field(ge=0, le=1)
+    red_flags: List[str] = []
+
+
+# Models of the sections the per-resume stages return, by stage name.
+SECTION_MODELS: Dict[str, Type[_StageOutput]] = {
+    "skill_analysis": SkillAnalysis,
+    "holistic": HolisticResume,
+    "quality": QualityAssessment,
+}
+
+# Outcome of LLM outputs that failed validation: repaired by a targeted re-ask, or not.
+REPAIR_STATS = {"valid": 0, "repaired": 0, "unrepaired": 0, "incomplete_json": 0}
+
+
+def validate(model: Type[_StageOutput], data) -> Tuple[Optional[dict], List[str], List[str]]:
+    """
+    (normalized output, [], []) if `data` is valid, else (None, invalid top-level fields,
+    problems). An output that is not an object at all lists every required field.
+    """
+    try:
+        return model.model_validate(data).model_dump(), [], []
+    except ValidationError as e:
+        fields, problems = [], []
+        for error in e.errors():
+            location = ".".join(str(part) for part in error["loc"])
+            problems.append(f"{location or 'output'}: {error['msg']}")
+            field = error["loc"][0] if error["loc"] else None
+            for name in [field] if field else [name for name, info in model.model_fields.items() if info.is_required()]:
+                if name not in fields:
+                    fields.append(name)
+        return None, fields, problems
+
+
+def output_repair_stats() -> dict:
+    return dict(REPAIR_STATS)
@@ -0,0 +1,39 @@
+from typing import Dict
+
+from . import config
+
+# Prompt and completion tokens of the LLM calls made by this process, per pipeline stage, as
+# reported by the provider. Responses served from the LLM cache cost nothing and are counted apart.
+TOKEN_USAGE: Dict[str, dict] = {}
+
+
+def record(stage: str, prompt_tokens: int = 0, completion_tokens: int = 0, cached: bool = False):
+    usage = TOKEN_USAGE.setdefault(stage, {"calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+    if cached:
+        usage["cached_calls"] += 1
+        return
+    usage["calls"] += 1
+    usage["prompt_tokens"] += prompt_tokens
+    usage["completion_tokens"] += completion_tokens
+
+
+def token_usage_report() -> dict:
+    stages = {}
+    for stage, usage in sorted(TOKEN_USAGE.items()):
+        calls = usage["calls"]
+        stages[stage] = {
+            **usage,
+            "avg_prompt_tokens": round(usage["prompt_tokens"] / calls, 1) if calls else None,
+            "avg_completion_tokens": round(usage["completion_tokens"] / calls, 1) if calls else None,
+        }
+    return {
+        "prompt_compaction": config.PROMPT_COMPACTION,
+        "resume_token_budget": config.RESUME_TOKEN_BUDGET,
+        "prompt_tokens": sum(usage["prompt_tokens"] for usage in TOKEN_USAGE.values()),
+        "completion_tokens": sum(usage["completion_tokens"] for usage in TOKEN_USAGE.values()),
+        "stages": stages,
+    }
+
+
+def reset():
+    TOKEN_USAGE.clear()
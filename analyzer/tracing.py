@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from . import config, metrics
+
+# Spans around the parts of a screening that take time: each pipeline stage, LLM call, PDF
+# extraction and database query or write. Every span is timed into
+# metrics.SPAN_SECONDS; with OTEL_TRACING=true it is also exported through OpenTelemetry
+# (optional packages), and with TRACE_LOG=true printed as one JSON line, so the output of
+# concurrent resumes can be told apart. Spans inherit the resume and job of their parent,
+# including across the tasks a pipeline run creates.
+
+INHERITED_ATTRIBUTES = ("resume", "job_id")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_tracer = None
+
+
+class Span:
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+        self.status = "ok"
+        self.started_at = time.perf_counter()
+        self._otel_span = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float = 1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def fail(self, reason: str):
+        self.status = "error"
+        self.attributes["error"] = reason[:200]
+
+
+def _get_tracer():
+    global _tracer
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                "OTEL_TRACING=true needs `pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http`."
+            ) from e
+        # The exporter reads OTEL_EXPORTER_OTLP_ENDPOINT and the other standard OTEL_* variables.
+        provider = TracerProvider(resource=Resource.create({"service.name": config.OTEL_SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer("resume-screener")
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Times the block as a span named `name`; yields the Span, whose attributes can be added to."""
+    parent = _current_span.get()
+    if parent is not None:
+        for key in INHERITED_ATTRIBUTES:
+            if key in parent.attributes:
+                attributes.setdefault(key, parent.attributes[key])
+    current = Span(name, attributes)
+    token = _current_span.set(current)
+    with contextlib.ExitStack() as stack:
+        if config.OTEL_TRACING:
+            current._otel_span = stack.enter_context(_get_tracer().start_as_current_span(name))
+        try:
+            yield current
+        except BaseException as e:
+            current.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            duration = time.perf_counter() - current.started_at
+            _current_span.reset(token)
+            metrics.SPAN_SECONDS.observe(duration, span=name, status=current.status)
+            if current._otel_span is not None:
+                _finish_otel_span(current)
+            if config.TRACE_LOG:
+                print(json.dumps({
+                    "span": name, "status": current.status, "duration": round(duration, 4), **current.attributes
+                }, default=str))
+
+
+def _finish_otel_span(current: Span):
+    from opentelemetry.trace import Status, StatusCode
+
+    for key, value in current.attributes.items():
+        if value is not None:
+            current._otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+    if current.status == "error":
+        current._otel_span.set_status(Status(StatusCode.ERROR, current.attributes.get("error")))
+
+
+def traced(name: str, **attribute_params):
+    """
+    Decorates a coroutine function to run as a span. `attribute_params` maps span attributes
+    to the names of the arguments they are taken from, e.g. @traced("resume", resume="resume_filename").
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            attributes = {key: arguments.get(param) for key, param in attribute_params.items()}
+            # Only the coroutine keeps the arguments, so it can release large ones (resume bytes) early.
+            coroutine = func(*args, **kwargs)
+            del args, kwargs, arguments
+            with span(name, **attributes):
+                return await coroutine
+        return wrapper
+    return decorator
+
+
+async def sample_event_loop_lag(interval: float = None):
+    """Runs until cancelled, recording how late each wakeup after `interval` seconds is."""
+    interval = interval or config.EVENT_LOOP_LAG_INTERVAL_SECONDS
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        metrics.EVENT_LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - expected))
@@ -0,0 +1,228 @@
+import contextlib
+import json
+import os
+import threading
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from . import config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# On-disk approximate nearest-neighbour index over unit vectors (analyzer.embeddings).
+# Vectors live in a float32 memory-mapped matrix that grows by doubling, so adding a vector
+# never rewrites the existing ones and the OS pages in only what a search touches. Once the
+# index is large enough it is partitioned IVF-style: k-means centroids split the vectors into
+# lists, and a search scores only the vectors of the lists nearest to the query.
+# Several processes may share an index directory: `locked()` serializes them with a file lock
+# and picks up what the others wrote. Searches share the lock and only read; files are only
+# created, grown or rewritten under the exclusive lock. Every method is blocking and meant for
+# a worker thread.
+
+_INITIAL_CAPACITY = 1024
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE = 50000
+
+
+class VectorIndex:
+    """
+    Files in `path`: meta.json, vectors.f32 (capacity x dim), ids.i64 and lists.i32 (the IVF
+    list of each row), and centroids.npy once trained. Rows are keyed by an integer id; adding
+    an id that is already present replaces its vector. Use it inside `locked()`.
+    """
+    def __init__(self, path: str, dim: int, model: str):
+        self.path = path
+        self.dim = dim
+        self.model = model
+        self.count = 0
+        self._meta: Optional[dict] = None
+        self._writable = False
+        # Threads of one process holding the shared file lock take turns reloading this instance.
+        self._reload_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        with self.locked():
+            pass
+
+    @contextlib.contextmanager
+    def locked(self, exclusive: bool = True):
+        """
+        Holds the lock of the index directory, shared for searches, and reloads the index if another
+        process changed it. Under the shared lock the files are opened read-only and never written.
+        """
+        with open(self._file("lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            with self._reload_lock:
+                meta = self._read_meta()
+                if meta != self._meta or (exclusive and not self._writable):
+                    self._open(meta, writable=exclusive)
+            yield self
+
+    def _open(self, meta: Optional[dict], writable: bool):
+        self._meta = meta
+        if meta and (meta["model"] != self.model or meta["dim"] != self.dim):
+            if writable:
+                print(f"Embedding index at {self.path} was built with {meta['model']}; starting a new one for {self.model}.")
+            meta = None
+        if meta is None and not writable:
+            # Nothing usable on disk, and only the exclusive lock may create it: search an empty index.
+            self.count = self.capacity = self.trained_count = 0
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._lists = np.zeros(0, dtype=np.int32)
+            self.centroids = None
+            self._rows = {}
+            self._writable = False
+            return
+        self.count = meta["count"] if meta else 0
+        self.capacity = meta["capacity"] if meta else _INITIAL_CAPACITY
+        self.trained_count = meta["trained_count"] if meta else 0
+        mode = ("r+" if writable else "r") if meta else "w+"
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode=mode, shape=(self.capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode=mode, shape=(self.capacity,))
+        self._lists = np.memmap(self._file("lists.i32"), dtype=np.int32, mode=mode, shape=(self.capacity,))
+        self.centroids = np.load(self._file("centroids.npy")) if meta and self.trained_count else None
+        self._rows = {int(item_id): row for row, item_id in enumerate(self._ids[:self.count])}
+        self._writable = writable
+        if not meta:
+            self._write_meta()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item_id: int):
+        return item_id in self._rows
+
+    def ids(self) -> set:
+        return set(self._rows)
+
+    def max_id(self) -> int:
+        return int(self._ids[:self.count].max(initial=0))
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self):
+        meta = {"model": self.model, "dim": self.dim, "count": self.count, "capacity": self.capacity, "trained_count": self.trained_count}
+        with open(self._file("meta.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(self._file("meta.json.tmp"), self._file("meta.json"))
+        self._meta = meta
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        for attribute, name, dtype, shape in (
+            ("_vectors", "vectors.f32", np.float32, (capacity, self.dim)),
+            ("_ids", "ids.i64", np.int64, (capacity,)),
+            ("_lists", "lists.i32", np.int32, (capacity,)),
+        ):
+            getattr(self, attribute).flush()
+            # Extending the file keeps the existing rows in place; the map is then reopened at the new size.
+            with open(self._file(name), "r+b") as f:
+                f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            setattr(self, attribute, np.memmap(self._file(name), dtype=dtype, mode="r+", shape=shape))
+        self.capacity = capacity
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        """Adds or replaces vectors; assigns them to their nearest IVF list, and retrains as the index doubles."""
+        ids = [int(item_id) for item_id in ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        new_ids = [item_id for item_id in dict.fromkeys(ids) if item_id not in self._rows]
+        self._grow(self.count + len(new_ids))
+        for item_id in new_ids:
+            self._rows[item_id] = self.count
+            self._ids[self.count] = item_id
+            self.count += 1
+        rows = np.array([self._rows[item_id] for item_id in ids], dtype=np.int64)
+        self._vectors[rows] = vectors
+        if self.centroids is not None:
+            self._lists[rows] = np.argmax(vectors @ self.centroids.T, axis=1)
+
+        if self.count >= config.EMBEDDING_IVF_MIN_VECTORS and self.count >= 2 * self.trained_count:
+            self.train()
+        self.flush()
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Drops the vectors of these ids (e.g. deleted candidates); each gap is filled with the last row. Returns how many."""
+        removed = 0
+        for item_id in {int(item_id) for item_id in ids}:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            last = self.count - 1
+            if row != last:
+                moved_id = int(self._ids[last])
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved_id
+                self._lists[row] = self._lists[last]
+                self._rows[moved_id] = row
+            self.count -= 1
+            removed += 1
+        if removed:
+            self.flush()
+        return removed
+
+    def train(self):
+        """Spherical k-means over (a sample of) the vectors; about sqrt(count) lists."""
+        vectors = self._vectors[:self.count]
+        rng = np.random.default_rng(0)
+        sample = vectors[np.sort(rng.choice(self.count, size=min(self.count, _KMEANS_SAMPLE), replace=False))]
+        n_lists = max(1, int(np.sqrt(self.count)))
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # An empty list keeps its previous centroid.
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self.centroids = centroids.astype(np.float32)
+        np.save(self._file("centroids.npy"), self.centroids)
+        for start in range(0, self.count, _KMEANS_SAMPLE):
+            block = vectors[start:start + _KMEANS_SAMPLE]
+            self._lists[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        self.trained_count = self.count
+        print(f"Trained embedding index: {self.count} vectors in {n_lists} lists.")
+
+    def flush(self):
+        self._vectors.flush()
+        self._ids.flush()
+        self._lists.flush()
+        self._write_meta()
+
+    def search(self, query: np.ndarray, k: int, exclude: Iterable[int] = (), probes: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids and cosine similarities of the `k` nearest vectors, best first. With IVF lists only
+        the `probes` lists closest to the query are scanned; otherwise every vector is.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        if self.centroids is not None:
+            nearest_lists = np.argsort(self.centroids @ query)[::-1][:probes or config.EMBEDDING_IVF_PROBES]
+            rows = np.flatnonzero(np.isin(self._lists[:self.count], nearest_lists))
+        else:
+            rows = np.arange(self.count)
+        exclude = set(exclude)
+        if exclude:
+            rows = rows[~np.isin(self._ids[rows], list(exclude))]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self._vectors[rows] @ query
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return np.asarray(self._ids[rows[top]]), scores[top]
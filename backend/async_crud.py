@@ -0,0 +1,283 @@
+# Database access for the API endpoints, workers and screening pipeline, on async sessions so
+# database round-trips never block the event loop. Screenings and new candidates are written
+# in batches by backend.writer.
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from . import models, schemas
+
+# --- Candidate CRUD Functions ---
+
+async def get_candidate_by_file_hash(db: AsyncSession, file_hash: str):
+    """
+    Retrieve a candidate whose stored resume has exactly these PDF bytes.
+    """
+    result = await db.execute(select(models.Candidate).filter(models.Candidate.file_hash == file_hash))
+    return result.scalars().first()
+
+async def get_candidate_by_text_hash(db: AsyncSession, text_hash: str):
+    """
+    Retrieve a candidate whose stored resume has the same normalized text.
+    """
+    result = await db.execute(select(models.Candidate).filter(models.Candidate.text_hash == text_hash))
+    return result.scalars().first()
+
+# --- Job CRUD Functions ---
+
+async def get_job(db: AsyncSession, job_id: int):
+    """
+    Retrieve a single job by its id.
+    """
+    return await db.get(models.Job, job_id)
+
+async def get_job_by_title(db: AsyncSession, title: str):
+    """
+    Retrieve a single job from the database by its title.
+    """
+    result = await db.execute(select(models.Job).filter(models.Job.title == title))
+    return result.scalars().first()
+
+async def get_job_by_text_hash(db: AsyncSession, text_hash: str):
+    """
+    Retrieve the oldest job whose description has this normalized-text hash.
+    """
+    result = await db.execute(
+        select(models.Job).filter(models.Job.text_hash == text_hash).order_by(models.Job.id).limit(1)
+    )
+    return result.scalars().first()
+
+async def get_jobs_sharing_minhash_bands(db: AsyncSession, bands: List[str]):
+    """
+    Retrieve (id, title, minhash) of jobs sharing at least one MinHash LSH band key.
+    """
+    result = await db.execute(
+        select(models.Job.id, models.Job.title, models.Job.minhash)
+        .filter(models.Job.minhash_bands.overlap(bands))
+    )
+    return result.mappings().all()
+
+async def get_jobs_with_candidate_counts(
+    db: AsyncSession,
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+):
+    """
+    Retrieve a page of jobs, oldest first, each with its number of screenings, in a single query.
+    Pages are keyed on (created_at, id): pass the last row of the previous page as the cursor.
+    """
+    page = select(models.Job.id, models.Job.title, models.Job.created_at, models.Job.pipeline_mode)
+    if after_created_at is not None and after_id is not None:
+        page = page.filter(tuple_(models.Job.created_at, models.Job.id) > tuple_(after_created_at, after_id))
+    page = page.order_by(models.Job.created_at, models.Job.id).limit(limit).subquery()
+
+    result = await db.execute(
+        select(page.c.id, page.c.title, page.c.created_at, page.c.pipeline_mode, func.count(models.Screening.id).label("candidate_count"))
+        .outerjoin(models.Screening, models.Screening.job_id == page.c.id)
+        .group_by(page.c.id, page.c.title, page.c.created_at, page.c.pipeline_mode)
+        .order_by(page.c.created_at, page.c.id)
+    )
+    return result.mappings().all()
+
+async def create_job(db: AsyncSession, job: schemas.JobCreate):
+    """
+    Create a new job record in the database.
+    """
+    db_job = models.Job(**job.model_dump())
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def update_job_pipeline_mode(db: AsyncSession, job_id: int, pipeline_mode: Optional[str]):
+    """
+    Set the per-resume pipeline used for a job's future screenings; None restores the default.
+    """
+    db_job = await db.get(models.Job, job_id)
+    if not db_job:
+        return None
+    db_job.pipeline_mode = pipeline_mode
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+async def delete_job(db: AsyncSession, job_id: int):
+    """
+    Delete a job and all associated screenings.
+    """
+    job = await db.get(models.Job, job_id)
+    if job:
+        # Delete all screenings associated with this job first
+        await db.execute(delete(models.Screening).where(models.Screening.job_id == job_id))
+        # Delete the job
+        await db.delete(job)
+        await db.commit()
+        return True
+    return False
+
+# --- Screening CRUD Functions ---
+
+async def get_screening_by_id(db: AsyncSession, screening_id: int):
+    """
+    Retrieve a screening with its job and candidate eager-loaded.
+    """
+    result = await db.execute(
+        select(models.Screening)
+        .options(selectinload(models.Screening.job), selectinload(models.Screening.candidate))
+        .filter(models.Screening.id == screening_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def update_screening_analysis(
+    db: AsyncSession,
+    screening_id: int,
+    screening: schemas.ScreeningCreate,
+    structured_resume: Optional[dict] = None,
+    total_experience: Optional[Decimal] = None,
+):
+    """
+    Replace a screening's analysis and score, e.g. when a provisional screening gets the full
+    analysis. The candidate's parsed resume is filled in as well if it was missing.
+    """
+    db_screening = await get_screening_by_id(db, screening_id)
+    if not db_screening:
+        return None
+    for field, value in screening.model_dump().items():
+        setattr(db_screening, field, value)
+    candidate = db_screening.candidate
+    if candidate.structured_resume is None and structured_resume is not None:
+        candidate.structured_resume = structured_resume
+        candidate.total_experience = total_experience
+        candidate.full_name = structured_resume.get("full_name", candidate.full_name)
+    await db.commit()
+    return await get_screening_by_id(db, screening_id)
+
+async def get_screening(db: AsyncSession, job_id: int, candidate_id: int):
+    """
+    Retrieve the screening of a candidate for a job, if one exists.
+    """
+    result = await db.execute(
+        select(models.Screening)
+        .filter(models.Screening.job_id == job_id)
+        .filter(models.Screening.candidate_id == candidate_id)
+    )
+    return result.scalars().first()
+
+async def get_screenings_for_job(db: AsyncSession, job_id: int, skip: int = 0, limit: Optional[int] = None):
+    """
+    Retrieve the screening records for a specific job, ranked by score, with job and candidate eager-loaded.
+    """
+    query = select(models.Screening)\
+        .options(selectinload(models.Screening.job), selectinload(models.Screening.candidate))\
+        .filter(models.Screening.job_id == job_id)\
+        .order_by(models.Screening.final_score.desc())\
+        .offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_ranked_screening_summaries(
+    db: AsyncSession,
+    job_id: int,
+    limit: int = 50,
+    after_score: Optional[Decimal] = None,
+    after_id: Optional[int] = None,
+):
+    """
+    Retrieve a page of a job's screenings ranked by score, projected to the summary fields.
+    The executive summary and red-flag count are computed in SQL so the analysis JSONB never
+    leaves the database. Pages are keyed on (final_score, id), both descending.
+    """
+    query = select(
+        models.Screening.id,
+        models.Screening.candidate_id,
+        models.Candidate.full_name,
+        models.Screening.final_score,
+        models.Screening.skill_match_analysis["executive_summary"].astext.label("executive_summary"),
+        func.coalesce(func.cardinality(models.Screening.red_flags), 0).label("red_flag_count"),
+        models.Screening.provisional,
+        models.Screening.screened_at,
+    ).join(models.Candidate, models.Candidate.id == models.Screening.candidate_id)\
+        .filter(models.Screening.job_id == job_id)
+    if after_score is not None and after_id is not None:
+        query = query.filter(tuple_(models.Screening.final_score, models.Screening.id) < tuple_(after_score, after_id))
+    query = query.order_by(models.Screening.final_score.desc(), models.Screening.id.desc()).limit(limit)
+    result = await db.execute(query)
+    return result.mappings().all()
+
+async def count_screenings_for_job(db: AsyncSession, job_id: int) -> int:
+    """
+    Count the screenings recorded for a job.
+    """
+    result = await db.execute(
+        select(func.count(models.Screening.id)).filter(models.Screening.job_id == job_id)
+    )
+    return result.scalar_one()
+
+async def delete_screening(db: AsyncSession, screening_id: int):
+    """
+    Delete a specific screening record.
+    """
+    screening = await db.get(models.Screening, screening_id)
+    if screening:
+        await db.delete(screening)
+        await db.commit()
+        return True
+    return False
+
+# --- Stage Result Functions ---
+
+async def get_stage_results(db: AsyncSession, resume_hash: str, job_id: int, settings: str):
+    """
+    Retrieve the stage results kept from failed attempts at screening a resume for a job under `settings`.
+    """
+    result = await db.execute(
+        select(models.StageResult)
+        .filter(models.StageResult.resume_hash == resume_hash)
+        .filter(models.StageResult.job_id == job_id)
+        .filter(models.StageResult.settings == settings)
+    )
+    return result.scalars().all()
+
+async def save_stage_results(
+    db: AsyncSession, resume_hash: str, job_id: int, settings: str, finished: dict, failed: dict
+):
+    """
+    Upsert the finished and failed stages of an attempt in one statement.
+    """
+    key = {"resume_hash": resume_hash, "job_id": job_id, "settings": settings}
+    rows = [{**key, "stage": stage, "status": "finished", "output": output, "error": None} for stage, output in finished.items()]
+    rows += [{**key, "stage": stage, "status": "failed", "output": None, "error": error} for stage, error in failed.items()]
+    if not rows:
+        return
+    stmt = pg_insert(models.StageResult).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_stage_results_key",
+        set_={
+            "status": stmt.excluded.status,
+            "output": stmt.excluded.output,
+            "error": stmt.excluded.error,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+async def delete_stage_results(db: AsyncSession, resume_hash: str, job_id: int):
+    """
+    Delete the stage results of a resume for a job, once it has been screened.
+    """
+    await db.execute(
+        delete(models.StageResult)
+        .where(models.StageResult.resume_hash == resume_hash)
+        .where(models.StageResult.job_id == job_id)
+    )
+    await db.commit()
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+# Finished batches are kept this long so late subscribers can still replay their events.
+FINISHED_BATCH_TTL_SECONDS = 3600
+
+
+class Batch:
+    """
+    In-memory record of one asynchronous screening batch. Every progress event is appended
+    to `events` with a sequence number, so any number of subscribers can replay the history
+    and then follow new events live.
+    """
+    def __init__(self, resume_count: int, job_id: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.job_id = job_id
+        self.resume_count = resume_count
+        self.status = "running"
+        self.saved = 0
+        self.skipped = 0
+        self.failed = 0
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[dict] = []
+        self.task: Optional[asyncio.Task] = None
+        # Set (and replaced) on every event, so subscribers are woken synchronously by `publish`.
+        self._changed = asyncio.Event()
+
+    def publish(self, event_type: str, **fields):
+        event = {"seq": len(self.events) + 1, "type": event_type, "batch_id": self.id, "time": time.time(), **fields}
+        self.events.append(event)
+        if event_type == "resume_saved":
+            self.saved += 1
+        elif event_type == "resume_skipped":
+            self.skipped += 1
+        elif event_type == "resume_failed":
+            self.failed += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def finish(self, status: str, **fields):
+        self.status = status
+        self.finished_at = time.time()
+        self.publish(f"batch_{status}", **self.summary(), **fields)
+
+    def summary(self) -> dict:
+        return {
+            "batch_id": self.id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "resume_count": self.resume_count,
+            "saved": self.saved,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+    async def follow(self, after_seq: int = 0) -> AsyncIterator[dict]:
+        """Yields every event after `after_seq`, then new ones as they arrive, until the batch ends."""
+        next_index = after_seq
+        while True:
+            while next_index < len(self.events):
+                yield self.events[next_index]
+                next_index += 1
+            if self.status != "running":
+                return
+            await self._changed.wait()
+
+
+_batches: Dict[str, Batch] = {}
+
+
+def create_batch(resume_count: int, job_id: Optional[int] = None) -> Batch:
+    _prune_finished()
+    batch = Batch(resume_count=resume_count, job_id=job_id)
+    _batches[batch.id] = batch
+    return batch
+
+
+def get_batch(batch_id: str) -> Optional[Batch]:
+    return _batches.get(batch_id)
+
+
+def _prune_finished():
+    cutoff = time.time() - FINISHED_BATCH_TTL_SECONDS
+    for batch_id in [b.id for b in _batches.values() if b.finished_at and b.finished_at < cutoff]:
+        del _batches[batch_id]
+
+
+def format_sse(event: dict) -> str:
+    """Serializes an event as a Server-Sent Events message; `id` lets clients resume with Last-Event-ID."""
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
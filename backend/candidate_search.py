@@ -0,0 +1,184 @@
+"""
+Semantic search over every stored candidate: the top matches for a job, without LLM calls.
+
+Each candidate's resume embedding is stored in the candidates table when it is saved; this
+module mirrors them into a local vector index (analyzer.vector_index) and searches it with the
+embedding of the job's structured JD. The index is a cache of the database; processes sharing
+its directory take turns through its file lock, and all index work runs in worker threads so
+the event loop keeps serving other requests. Embed candidates stored before this existed, or after a
+change of EMBEDDING_BACKEND/EMBEDDING_MODEL, with:
+
+    python -m backend.candidate_search
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analyzer import config, embeddings
+from analyzer.vector_index import VectorIndex
+
+from . import models
+from .database import AsyncSessionLocal, async_engine
+
+SYNC_CHUNK_SIZE = 1000
+BACKFILL_CHUNK_SIZE = 200
+
+_index: Optional[VectorIndex] = None
+_index_created = threading.Lock()
+_sync_lock = asyncio.Lock()
+
+
+def get_index() -> VectorIndex:
+    global _index
+    with _index_created:
+        if _index is None:
+            _index = VectorIndex(config.EMBEDDING_INDEX_DIR, config.EMBEDDING_DIM, embeddings.model_name())
+    return _index
+
+
+def _locked(func, *args, exclusive: bool = True):
+    """Calls `func(index, *args)` under the index's file lock; blocking, so run it in a thread."""
+    index = get_index()
+    with index.locked(exclusive=exclusive):
+        return func(index, *args)
+
+
+async def _add_to_index(db: AsyncSession, query) -> int:
+    rows = (await db.execute(query)).all()
+    if rows:
+        # Adding may retrain the k-means lists and always writes the memmaps.
+        await asyncio.to_thread(
+            _locked, VectorIndex.add, [row.id for row in rows], [embeddings.from_bytes(row.embedding) for row in rows]
+        )
+    return len(rows)
+
+
+async def sync_index(db: AsyncSession) -> int:
+    """
+    Adds the embeddings stored since the last sync to the local index; returns how many.
+    New candidates have higher ids than anything indexed, so they are found by id; candidates
+    embedded later by the backfill, and deleted candidates whose vectors are dropped, are found
+    by comparing the counts and then the ids.
+    """
+    async with _sync_lock:
+        model = embeddings.model_name()
+        embedded = select(models.Candidate.id, models.Candidate.embedding).filter(models.Candidate.embedding_model == model)
+        added = 0
+        while True:
+            last_id = await asyncio.to_thread(_locked, VectorIndex.max_id, exclusive=False)
+            count = await _add_to_index(
+                db, embedded.filter(models.Candidate.id > last_id).order_by(models.Candidate.id).limit(SYNC_CHUNK_SIZE)
+            )
+            added += count
+            if count < SYNC_CHUNK_SIZE:
+                break
+
+        stored = (await db.execute(select(func.count(models.Candidate.id)).filter(models.Candidate.embedding_model == model))).scalar_one()
+        if stored != await asyncio.to_thread(_locked, len, exclusive=False):
+            ids = set((await db.execute(select(models.Candidate.id).filter(models.Candidate.embedding_model == model))).scalars().all())
+            indexed = await asyncio.to_thread(_locked, VectorIndex.ids, exclusive=False)
+            missing = sorted(ids - indexed)
+            for start in range(0, len(missing), SYNC_CHUNK_SIZE):
+                added += await _add_to_index(db, embedded.filter(models.Candidate.id.in_(missing[start:start + SYNC_CHUNK_SIZE])))
+            await _remove_from_index(indexed - ids)
+        if added:
+            print(f"Added {added} candidate embeddings to the search index.")
+        return added
+
+
+async def _remove_from_index(ids) -> int:
+    """Drops the vectors of candidates that no longer exist (or were re-embedded with another model)."""
+    removed = await asyncio.to_thread(_locked, VectorIndex.remove, ids) if ids else 0
+    if removed:
+        print(f"Removed {removed} deleted candidates from the search index.")
+    return removed
+
+
+async def top_candidates_for_job(db: AsyncSession, job: models.Job, limit: int = 20, include_screened: bool = False) -> List[dict]:
+    """
+    The stored candidates whose resumes are most similar to the job's structured JD, best first.
+    Candidates already screened for the job are left out unless `include_screened`.
+    """
+    await sync_index(db)
+    screened = set((await db.execute(
+        select(models.Screening.candidate_id).filter(models.Screening.job_id == job.id)
+    )).scalars().all())
+    query_vector = (await embeddings.embed_texts_async([embeddings.job_text(job.structured_jd or {})]))[0]
+    while True:
+        ids, similarities = await asyncio.to_thread(
+            _locked, VectorIndex.search, query_vector, limit, () if include_screened else screened, exclusive=False
+        )
+        if len(ids) == 0:
+            return []
+        result = await db.execute(
+            select(models.Candidate.id, models.Candidate.full_name, models.Candidate.contact_info, models.Candidate.total_experience)
+            .filter(models.Candidate.id.in_(ids.tolist()))
+        )
+        candidates = {row.id: row for row in result.all()}
+        # Candidates deleted since they were indexed are dropped from the index and the search repeated.
+        if not await _remove_from_index(set(ids.tolist()) - set(candidates)):
+            break
+    return [
+        {
+            "candidate_id": candidate_id,
+            "full_name": candidates[candidate_id].full_name,
+            "contact_info": candidates[candidate_id].contact_info,
+            "total_experience": candidates[candidate_id].total_experience,
+            "similarity": round(float(similarity), 4),
+            "screened": candidate_id in screened,
+        }
+        for candidate_id, similarity in zip(ids.tolist(), similarities.tolist())
+        # Skips resumes with nothing in common with the job (and any candidate deleted meanwhile).
+        if candidate_id in candidates and similarity > 0
+    ]
+
+
+async def backfill_embeddings(chunk_size: int = BACKFILL_CHUNK_SIZE) -> dict:
+    """Embeds every candidate without an embedding of the current model, in chunks."""
+    started = time.perf_counter()
+    model = embeddings.model_name()
+    query = (
+        select(models.Candidate.id, models.Candidate.raw_resume_text)
+        .filter(or_(models.Candidate.embedding_model.is_(None), models.Candidate.embedding_model != model))
+        .order_by(models.Candidate.id)
+        .limit(chunk_size)
+    )
+    embedded = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(query.filter(models.Candidate.id > last_id))).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            vectors = await embeddings.embed_texts_async([row.raw_resume_text or "" for row in rows])
+            await db.execute(
+                update(models.Candidate),
+                [
+                    {"id": row.id, "embedding": embeddings.to_bytes(vector), "embedding_model": model}
+                    for row, vector in zip(rows, vectors)
+                ],
+            )
+            await db.commit()
+            embedded += len(rows)
+            print(f"Embedded {embedded} candidates...")
+    return {"model": model, "embedded": embedded, "seconds": round(time.perf_counter() - started, 3)}
+
+
+async def main(chunk_size: int):
+    try:
+        print(await backfill_embeddings(chunk_size=chunk_size))
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE, help="Candidates embedded per transaction.")
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size))
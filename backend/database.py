@@ -1,5 +1,7 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
@@ -11,7 +13,41 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("No DATABASE_URL found in environment variables")
 
+# Connection pool sizing for the async engine used by the API.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 300))
+
+
+def _to_async_url(database_url: str):
+    """
+    Converts a libpq-style Postgres URL into an asyncpg one.
+    asyncpg does not understand `sslmode`/`channel_binding` query parameters, so the
+    SSL mode is passed as a connect argument instead.
+    """
+    url = make_url(database_url)
+    query = dict(url.query)
+    connect_args = {}
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    return url, connect_args
+
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+ASYNC_DATABASE_URL, _async_connect_args = _to_async_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,  # Serverless Postgres drops idle connections.
+)
+# expire_on_commit=False keeps loaded rows usable after commit, which responses rely on.
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
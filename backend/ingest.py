@@ -0,0 +1,180 @@
+# Resume uploads are spooled to disk and read back one at a time as they are screened, so the
+# memory a batch needs does not grow with its size. Besides individual PDFs, a request may carry
+# zip or tar archives of resumes; their members are streamed into the spool one by one.
+import asyncio
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import BinaryIO, List, Optional, Tuple
+
+from fastapi import UploadFile
+
+from analyzer import metrics
+
+# Directory for spooled uploads (system temp directory by default).
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR") or None
+# Larger files, including archive members, are rejected rather than spooled.
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", 10 * 1024 * 1024))
+MAX_ARCHIVE_MEMBERS = int(os.getenv("MAX_ARCHIVE_MEMBERS", 5000))
+# Resumes of one request or batch screened at the same time, how many more are read ahead of
+# them, and the most resume bytes held in memory at once (each resume's bytes are dropped as
+# soon as its text is extracted).
+SCREENING_CONCURRENCY = int(os.getenv("SCREENING_CONCURRENCY", 32))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 8))
+INGEST_MAX_BUFFERED_BYTES = int(os.getenv("INGEST_MAX_BUFFERED_BYTES", 64 * 1024 * 1024))
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+ARCHIVE_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed", "application/x-tar", "application/gzip", "application/x-gzip"}
+_COPY_CHUNK_BYTES = 1024 * 1024
+
+_buffered_bytes = 0
+metrics.Gauge(
+    "resume_screener_ingest_buffered_bytes",
+    "Resume bytes read from the spool and not yet released after text extraction.",
+    lambda: _buffered_bytes,
+)
+
+
+class SpooledResume:
+    """One resume file in a spool; `read()` loads its bytes."""
+    def __init__(self, filename: str, content_type: str, path: str, size: int):
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path
+        self.size = size
+
+    def read_sync(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    async def read(self) -> bytes:
+        return await asyncio.to_thread(self.read_sync)
+
+
+def _is_archive(filename: str, content_type: Optional[str]) -> bool:
+    return (filename or "").lower().endswith(ARCHIVE_SUFFIXES) or content_type in ARCHIVE_CONTENT_TYPES
+
+
+def _member_content_type(filename: str) -> str:
+    return "application/pdf" if filename.lower().endswith(".pdf") else "application/octet-stream"
+
+
+class ResumeSpool:
+    """
+    A temporary directory holding the resumes of one request or batch, removed on close.
+
+        async with ResumeSpool() as spool:
+            await spool.add_uploads(resume_files)
+            await screen_resumes(spool.resumes, ...)
+
+    `rejected` lists (filename, reason) for files that were too large or unreadable archives.
+    """
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix="resumes-", dir=INGEST_SPOOL_DIR)
+        self.resumes: List[SpooledResume] = []
+        self.rejected: List[Tuple[str, str]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def add_uploads(self, uploads: List[UploadFile]):
+        for upload in uploads:
+            await asyncio.to_thread(self.add_file, upload.filename or "resume", upload.content_type, upload.file)
+
+    def add_file(self, filename: str, content_type: Optional[str], fileobj: BinaryIO):
+        """Spools one file, or every file member of a zip/tar archive."""
+        if not _is_archive(filename, content_type):
+            self._spool(filename, content_type, fileobj)
+            return
+        try:
+            is_zip = zipfile.is_zipfile(fileobj)
+            fileobj.seek(0)
+            if is_zip:
+                self._add_zip(filename, fileobj)
+            else:
+                self._add_tar(filename, fileobj)
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+            print(f"Could not read archive {filename}: {e}")
+            self.rejected.append((filename, f"Unreadable archive: {e}"))
+
+    def _add_zip(self, archive_name: str, fileobj: BinaryIO):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                name = self._member_name(archive_name, info.filename, info.is_dir())
+                if name:
+                    with archive.open(info) as member:
+                        self._spool(name, _member_content_type(name), member)
+
+    def _add_tar(self, archive_name: str, fileobj: BinaryIO):
+        with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+            for info in archive:
+                name = self._member_name(archive_name, info.name, not info.isfile())
+                if name:
+                    member = archive.extractfile(info)
+                    if member is not None:
+                        with member:
+                            self._spool(name, _member_content_type(name), member)
+
+    def _member_name(self, archive_name: str, path: str, is_dir: bool) -> Optional[str]:
+        """The resume name of an archive member, or None for directories and metadata files."""
+        name = os.path.basename(path.rstrip("/"))
+        if is_dir or not name or name.startswith(".") or "__MACOSX" in path:
+            return None
+        if len(self.resumes) + len(self.rejected) >= MAX_ARCHIVE_MEMBERS:
+            self.rejected.append((f"{archive_name}/{path}", f"The archives of this upload hold more than {MAX_ARCHIVE_MEMBERS} files."))
+            return None
+        return name
+
+    def _spool(self, filename: str, content_type: Optional[str], source: BinaryIO):
+        # Spool files are numbered, so names from uploads and archives never touch the file system.
+        path = os.path.join(self.directory, f"{len(self.resumes) + len(self.rejected):06d}")
+        size = 0
+        with open(path, "wb") as target:
+            while True:
+                chunk = source.read(_COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_RESUME_BYTES:
+                    break
+                target.write(chunk)
+        if size > MAX_RESUME_BYTES:
+            os.remove(path)
+            self.rejected.append((filename, f"File is larger than {MAX_RESUME_BYTES} bytes."))
+            return
+        self.resumes.append(SpooledResume(filename, content_type or "application/octet-stream", path, size))
+
+
+class ByteBudget:
+    """
+    Caps the resume bytes in memory at once at `limit`. A single resume larger than the limit
+    reserves the whole budget. Meant for one producer; `release` may be called from any task.
+    """
+    def __init__(self, limit: int = INGEST_MAX_BUFFERED_BYTES):
+        self.limit = limit
+        self.in_use = 0
+        self._released = asyncio.Event()
+
+    async def acquire(self, size: int) -> int:
+        global _buffered_bytes
+        size = min(size, self.limit)
+        while self.in_use + size > self.limit:
+            self._released.clear()
+            await self._released.wait()
+        self.in_use += size
+        _buffered_bytes += size
+        return size
+
+    def release(self, size: int):
+        global _buffered_bytes
+        self.in_use -= size
+        _buffered_bytes -= size
+        self._released.set()
@@ -1,19 +1,31 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Header, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from decimal import Decimal
 import uuid
 import asyncio # Import asyncio for concurrent processing
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 # Import the two separate, now ASYNCHRONOUS functions
-from analyzer.main import deconstruct_jd, analyze_single_resume
-from analyzer.parsers import extract_text_from_pdf, extract_text_from_txt
-
-from . import crud, models, schemas
-from .database import SessionLocal, engine
-
-models.Base.metadata.create_all(bind=engine)
+from analyzer.main import deconstruct_jd
+from analyzer.parsers import extract_pdf_document_async, extract_text_from_txt, shutdown_extraction_pool
+from analyzer.cache import get_llm_cache
+from analyzer.experience import experience_stats
+from analyzer.token_usage import token_usage_report
+from analyzer.stage_outputs import output_repair_stats
+from analyzer import config, fingerprint, metrics, tracing
+
+from . import async_crud, batches, ingest, models, schemas, work_queue
+from .screening import analyze_provisional_screening, run_query, screen_resumes, screening_summary, shortlist_resumes
+from .rescore import job_score_bands, rescore_screenings
+from .candidate_search import top_candidates_for_job
+from .database import AsyncSessionLocal, async_engine
+from .migrations import upgrade_schema
+from .writer import ScreeningWriter
+
+upgrade_schema()
 
 app = FastAPI(
     title="Smart Resume Screener API",
@@ -29,41 +41,42 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
+_lag_sampler: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_event_loop_lag_sampler():
+    global _lag_sampler
+    _lag_sampler = asyncio.create_task(tracing.sample_event_loop_lag())
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    if _lag_sampler:
+        _lag_sampler.cancel()
+    shutdown_extraction_pool()
+    await async_engine.dispose()
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # --- GET Endpoints for Frontend (Changed to async) ---
 
 @app.get("/jobs/", response_model=List[schemas.Job])
-async def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_jobs(
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Retrieve a list of all jobs in the database with candidate counts.
-    (FastAPI runs the synchronous DB code in a thread pool).
+    Retrieve a page of jobs, oldest first, with candidate counts.
+    To fetch the next page, pass the `created_at` and `id` of the last job as `after_created_at` and `after_id`.
     """
     try:
-        jobs = crud.get_jobs(db, skip=skip, limit=limit)
-        if not jobs:
-            return []
-        
-        jobs_with_counts = []
-        for job in jobs:
-            candidate_count = db.query(models.Screening)\
-                               .filter(models.Screening.job_id == job.id)\
-                               .count()
-            
-            job_dict = {
-                "id": job.id,
-                "title": job.title,
-                "created_at": job.created_at,
-                "candidate_count": candidate_count
-            }
-            jobs_with_counts.append(job_dict)
-        
-        return jobs_with_counts
+        jobs = await async_crud.get_jobs_with_candidate_counts(
+            db, limit=limit, after_created_at=after_created_at, after_id=after_id
+        )
+        return [dict(job) for job in jobs]
     except Exception as e:
         print(f"Error fetching jobs: {e}")
         raise HTTPException(
@@ -73,23 +86,19 @@ async def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
 
 
 @app.get("/jobs/{job_id}/screenings/", response_model=List[schemas.Screening])
-async def read_screenings_for_job(job_id: int, db: Session = Depends(get_db)):
+async def read_screenings_for_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """
     Retrieve a ranked list of all screenings for a specific job.
-    (FastAPI runs the synchronous DB code in a thread pool).
     """
     try:
-        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        job = await async_crud.get_job(db, job_id=job_id)
         if not job:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Job with id {job_id} not found"
             )
         
-        screenings = db.query(models.Screening)\
-                       .filter(models.Screening.job_id == job_id)\
-                       .order_by(models.Screening.final_score.desc())\
-                       .all()
+        screenings = await async_crud.get_screenings_for_job(db, job_id=job_id)
         
         return screenings
     except HTTPException:
@@ -102,130 +111,291 @@ async def read_screenings_for_job(job_id: int, db: Session = Depends(get_db)):
         )
 
 
-# --- Reusable async helper function for processing a single resume ---
-async def _process_and_save_resume(
-    resume_file: UploadFile, 
-    structured_jd: dict, 
-    job_id: int, 
-    db: Session
-) -> Optional[models.Screening]:
+@app.get("/jobs/{job_id}/ranked-screenings/", response_model=schemas.RankedScreeningsPage)
+async def read_ranked_screenings_for_job(
+    job_id: int,
+    limit: int = 50,
+    after_score: Optional[Decimal] = None,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Helper coroutine to fully process one resume file and save results to the DB.
-    Returns the screening object or None if processing fails.
+    Retrieve one page of a job's ranked screenings with only the summary fields.
+    Use the returned `next_after_score`/`next_after_id` to request the next page, and
+    GET /screenings/{screening_id} for the full analysis of a single screening.
     """
-    print(f"\n--- Processing resume: {resume_file.filename} ---")
-    if resume_file.content_type != 'application/pdf':
-        print(f"Skipping non-PDF file: {resume_file.filename}")
-        return None
-
-    resume_bytes = await resume_file.read()
-
     try:
-        # 1. Run the core asynchronous analyzer for the current resume.
-        analysis_result = await analyze_single_resume(
-            structured_jd=structured_jd, 
-            resume_file_content=resume_bytes,
-            resume_filename=resume_file.filename
+        job = await async_crud.get_job(db, job_id=job_id)
+        if not job:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Job with id {job_id} not found"
+            )
+
+        items = await async_crud.get_ranked_screening_summaries(
+            db, job_id=job_id, limit=limit, after_score=after_score, after_id=after_id
         )
-        if "error" in analysis_result:
-            print(f"Skipping resume {resume_file.filename} due to analysis error: {analysis_result['error']}")
-            return None
+        total_count = await async_crud.count_screenings_for_job(db, job_id=job_id)
+        next_cursor = items[-1] if len(items) == limit else None
+
+        return {
+            "job_id": job.id,
+            "job_title": job.title,
+            "total_count": total_count,
+            "items": [dict(item) for item in items],
+            "next_after_score": next_cursor["final_score"] if next_cursor else None,
+            "next_after_id": next_cursor["id"] if next_cursor else None,
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Skipping resume {resume_file.filename} due to unexpected error during analysis: {e}")
-        return None
-
-    # 2. Extract raw text from resume for database storage.
-    resume_text = extract_text_from_pdf(resume_bytes)
-    if not resume_text:
-        print(f"Skipping resume {resume_file.filename} because text could not be extracted.")
-        return None
-
-    # 3. Prepare data and handle Candidate creation/retrieval.
-    structured_resume = analysis_result.get("structured_resume", {})
-    candidate_contact = structured_resume.get("contact_info", f"unknown_{uuid.uuid4()}@example.com")
-    candidate_name = structured_resume.get("full_name", "Unknown Candidate")
-
-    db_candidate = crud.get_candidate_by_contact(db, contact=candidate_contact)
-    if not db_candidate:
-        candidate_schema = schemas.CandidateCreate(
-            contact_info=candidate_contact,
-            full_name=candidate_name,
-            raw_resume_text=resume_text,
-            structured_resume=structured_resume,
-            total_experience=Decimal(str(analysis_result["llm_analysis"]["experience_match_analysis"]["calculated_candidate_years"]))
+        print(f"Error fetching ranked screenings for job {job_id}: {e}")
+        raise HTTPException(
+            status_code=500, 
+            detail="Failed to retrieve screenings from database"
         )
-        db_candidate = crud.create_candidate(db, candidate=candidate_schema)
-    
-    # 4. Check if this candidate was already screened for this job
-    existing_screening = db.query(models.Screening)\
-        .filter(models.Screening.job_id == job_id)\
-        .filter(models.Screening.candidate_id == db_candidate.id)\
-        .first()
-    if existing_screening:
-        print(f"Candidate {candidate_name} already screened for this job. Skipping.")
-        return None
-
-    # 5. Create the final screening record in the database.
-    screening_schema = schemas.ScreeningCreate(
-        final_score=Decimal(str(analysis_result.get("final_score"))),
-        quality_multiplier=Decimal(str(analysis_result["quality_assessment"]["quality_score"])),
-        skill_match_analysis=analysis_result.get("llm_analysis", {}),
-        red_flags=analysis_result.get("quality_assessment", {}).get("red_flags", [])
-    )
-    
-    db_screening = crud.create_screening(db, screening=screening_schema, job_id=job_id, candidate_id=db_candidate.id)
-    print(f"--- Successfully processed and saved: {resume_file.filename} ---")
-    return db_screening
 
 
-# --- POST Endpoints (Changed to be fully async and concurrent) ---
+@app.get("/jobs/{job_id}/score-bands")
+async def read_score_bands(job_id: int, profile: Optional[List[str]] = Query(None), db: AsyncSession = Depends(get_db)):
+    """
+    Percentile bands (p25/p50/p75/p90) of a job's final scores under one or more scoring
+    profiles (`?profile=v1&profile=v2`), computed from the stored analyses without saving anything.
+    """
+    job = await async_crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    try:
+        return await job_score_bands(db, job_id=job_id, profiles=profile or [config.SCORING_PROFILE])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/screen/", response_model=List[schemas.Screening])
-async def screen_multiple_resumes(
-    job_title: Optional[str] = Form(None),
-    jd_file: UploadFile = File(...),
-    resume_files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
-):
-    # 1. Process the Job Description asynchronously.
+
+@app.get("/jobs/{job_id}/matches", response_model=List[schemas.CandidateMatch])
+async def read_job_matches(job_id: int, limit: int = 20, include_screened: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    The stored candidates, from every job, whose resumes are semantically closest to this job's
+    requirements. Uses local embeddings only, so no LLM calls are made.
+    """
+    job = await async_crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    return await top_candidates_for_job(db, job, limit=limit, include_screened=include_screened)
+
+
+@app.patch("/jobs/{job_id}")
+async def update_job(job_id: int, job_update: schemas.JobUpdate, db: AsyncSession = Depends(get_db)):
+    """
+    Change the per-resume pipeline ("multi_call" or "single_pass") used for the job's next
+    screenings; null restores the PIPELINE_MODE default.
+    """
+    _check_pipeline_mode(job_update.pipeline_mode)
+    job = await async_crud.update_job_pipeline_mode(db, job_id=job_id, pipeline_mode=job_update.pipeline_mode)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    return {"id": job.id, "title": job.title, "pipeline_mode": job.pipeline_mode}
+
+
+@app.get("/screenings/{screening_id}", response_model=schemas.Screening)
+async def read_screening(screening_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve a single screening with its full analysis, job and candidate.
+    """
+    screening = await async_crud.get_screening_by_id(db, screening_id=screening_id)
+    if not screening:
+        raise HTTPException(status_code=404, detail=f"Screening with id {screening_id} not found")
+    return screening
+
+
+@app.post("/screenings/{screening_id}/analyze", response_model=schemas.Screening)
+async def analyze_screening(screening_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Run the full AI analysis for a screening that only has a provisional (keyword-based)
+    score because its resume was not shortlisted, and replace its score.
+    """
+    screening = await async_crud.get_screening_by_id(db, screening_id=screening_id)
+    if not screening:
+        raise HTTPException(status_code=404, detail=f"Screening with id {screening_id} not found")
+    if not screening.provisional:
+        raise HTTPException(status_code=400, detail="Screening already has a full analysis.")
+    updated = await analyze_provisional_screening(screening_id)
+    if updated is None:
+        raise HTTPException(status_code=500, detail="Failed to analyze the resume.")
+    return updated
+
+
+@app.get("/llm-cache/stats")
+async def read_llm_cache_stats():
+    """
+    Hit/miss and eviction counters for the LLM response cache.
+    """
+    llm_cache = get_llm_cache()
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.stats()}
+
+
+@app.get("/experience/stats")
+async def read_experience_stats():
+    """
+    How many experience calculations were done locally and how many fell back to the LLM.
+    """
+    return experience_stats()
+
+
+@app.get("/llm-output/stats")
+async def read_llm_output_stats():
+    """
+    How many LLM outputs were valid, repaired by re-asking for their missing or invalid fields,
+    or still invalid after that, and how many responses were cut off or held no JSON object.
+    """
+    return output_repair_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    """
+    Prometheus metrics of this process: span durations per pipeline stage, LLM call, PDF
+    extraction and database query or write; LLM calls, tokens, retries and scheduler waits by
+    model and stage; per-resume events; and event-loop lag.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/token-usage")
+async def read_token_usage():
+    """
+    Prompt and completion tokens used by this process, per LLM stage, and whether prompt compaction is on.
+    """
+    return token_usage_report()
+
+
+async def _read_jd_text(jd_file: UploadFile) -> str:
     jd_bytes = await jd_file.read()
     if jd_file.content_type == 'text/plain':
         jd_text = extract_text_from_txt(jd_bytes)
     elif jd_file.content_type == 'application/pdf':
-        jd_text = extract_text_from_pdf(jd_bytes)
+        jd_text = (await extract_pdf_document_async(jd_bytes))["text"]
     else:
         raise HTTPException(status_code=400, detail="Unsupported JD file type.")
     
     if not jd_text:
         raise HTTPException(status_code=400, detail="Could not extract text from JD file.")
-    
-    # Await the async LLM call
-    structured_jd = await deconstruct_jd(job_description_text=jd_text)
-    if "error" in structured_jd:
-        raise HTTPException(status_code=500, detail=structured_jd["error"])
-    
-    # 2. Prepare data and handle Job creation/retrieval.
+    return jd_text
+
+
+async def _find_job_for_jd(db: AsyncSession, jd_text: str) -> Tuple[Optional[models.Job], List[dict]]:
+    """
+    Looks a job description up before it is deconstructed. Returns the job with the same
+    normalized text, whose structured JD can be reused, and otherwise the stored jobs that
+    are likely near duplicates of it.
+    """
+    db_job = await async_crud.get_job_by_text_hash(db, text_hash=fingerprint.hash_text(jd_text))
+    if db_job and db_job.structured_jd:
+        print(f"Reusing the analysis of job {db_job.id} ({db_job.title}) for an identical description.")
+        return db_job, []
+
+    signature = fingerprint.minhash_signature(jd_text)
+    near_duplicates = []
+    for candidate in await async_crud.get_jobs_sharing_minhash_bands(db, bands=fingerprint.lsh_bands(signature)):
+        similarity = fingerprint.estimate_similarity(signature, candidate["minhash"] or [])
+        if similarity >= config.JD_NEAR_DUPLICATE_THRESHOLD:
+            near_duplicates.append({"job_id": candidate["id"], "title": candidate["title"], "similarity": round(similarity, 3)})
+    near_duplicates.sort(key=lambda job: job["similarity"], reverse=True)
+    if near_duplicates:
+        print(f"Job description is a likely near duplicate of: {near_duplicates}")
+    return None, near_duplicates
+
+
+def _check_pipeline_mode(pipeline_mode: Optional[str]) -> Optional[str]:
+    if pipeline_mode is not None and pipeline_mode not in config.PIPELINE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown pipeline mode '{pipeline_mode}'. Known modes: {list(config.PIPELINE_MODES)}")
+    return pipeline_mode
+
+
+async def _get_or_create_job(
+    db: AsyncSession, job_title: Optional[str], jd_text: str, structured_jd: dict, pipeline_mode: Optional[str] = None
+) -> models.Job:
     final_job_title = job_title if job_title else structured_jd.get("job_title", f"Untitled Job - {uuid.uuid4().hex[:6]}")
-    db_job = crud.get_job_by_title(db, title=final_job_title)
+    db_job = await async_crud.get_job_by_title(db, title=final_job_title)
     if not db_job:
+        signature = fingerprint.minhash_signature(jd_text)
         job_schema = schemas.JobCreate(
             title=final_job_title,
             raw_jd_text=jd_text,
-            structured_jd=structured_jd
+            structured_jd=structured_jd,
+            text_hash=fingerprint.hash_text(jd_text),
+            minhash=signature,
+            minhash_bands=fingerprint.lsh_bands(signature),
+            pipeline_mode=pipeline_mode
         )
-        db_job = crud.create_job(db, job=job_schema)
+        db_job = await async_crud.create_job(db, job=job_schema)
+    return db_job
 
-    # 3. Create a list of concurrent tasks, one for each resume.
-    tasks = [
-        _process_and_save_resume(resume_file, structured_jd, db_job.id, db) 
-        for resume_file in resume_files
-    ]
 
-    # 4. Run all resume processing tasks in parallel.
-    results = await asyncio.gather(*tasks)
-    
-    # 5. Filter out any Nones from tasks that were skipped or failed.
-    processed_screenings = [res for res in results if res is not None]
+def _shortlist_limits(top_k: Optional[int], min_score: Optional[float]) -> dict:
+    """Shortlist limits of a request, defaulting to SHORTLIST_TOP_K / SHORTLIST_MIN_SCORE."""
+    return {
+        "shortlist_top_k": top_k if top_k is not None else config.SHORTLIST_TOP_K,
+        "shortlist_min_score": min_score if min_score is not None else config.SHORTLIST_MIN_SCORE,
+    }
+
+
+async def _spool_resume_uploads(resume_files: List[UploadFile]) -> ingest.ResumeSpool:
+    """
+    Copies uploaded resumes, and the members of uploaded zip/tar archives, to a spool on disk
+    (see backend.ingest); they are read back one at a time while being screened.
+    """
+    spool = ingest.ResumeSpool()
+    try:
+        await spool.add_uploads(resume_files)
+    except BaseException:
+        spool.close()
+        raise
+    for filename, reason in spool.rejected:
+        print(f"Skipping upload {filename}: {reason}")
+    return spool
+
+
+# --- POST Endpoints (Changed to be fully async and concurrent) ---
+
+@app.post("/screen/", response_model=List[schemas.Screening])
+async def screen_multiple_resumes(
+    job_title: Optional[str] = Form(None),
+    jd_file: UploadFile = File(...),
+    resume_files: List[UploadFile] = File(...),
+    shortlist_top_k: Optional[int] = Form(None),
+    shortlist_min_score: Optional[float] = Form(None),
+    pipeline_mode: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Screen resumes against a job description. `resume_files` may include zip or tar archives
+    of resumes. `pipeline_mode` applies to a new job only; an existing job keeps its own
+    (see PATCH /jobs/{job_id}).
+    """
+    _check_pipeline_mode(pipeline_mode)
+    # 1. Process the Job Description asynchronously, unless the same description was analyzed before.
+    jd_text = await _read_jd_text(jd_file)
+    db_job, _ = await _find_job_for_jd(db, jd_text)
+    if db_job:
+        structured_jd = db_job.structured_jd
+    else:
+        # Await the async LLM call
+        structured_jd = await deconstruct_jd(job_description_text=jd_text)
+        if "error" in structured_jd:
+            raise HTTPException(status_code=500, detail=structured_jd["error"])
+
+        # 2. Prepare data and handle Job creation/retrieval.
+        db_job = await _get_or_create_job(db, job_title, jd_text, structured_jd, pipeline_mode)
+
+    # 3. Screen the resumes concurrently, streaming them from the upload spool.
+    async with await _spool_resume_uploads(resume_files) as spool:
+        processed_screenings = await screen_resumes(
+            spool.resumes, structured_jd, db_job.id,
+            pipeline_mode=db_job.pipeline_mode,
+            **_shortlist_limits(shortlist_top_k, shortlist_min_score)
+        )
 
     if not processed_screenings:
         raise HTTPException(status_code=400, detail="No valid new resumes were processed.")
@@ -237,13 +407,15 @@ async def screen_multiple_resumes(
 async def add_candidates_to_job(
     job_id: int,
     resume_files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    shortlist_top_k: Optional[int] = Form(None),
+    shortlist_min_score: Optional[float] = Form(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Add new candidates to an existing job concurrently.
+    Add new candidates to an existing job concurrently. `resume_files` may include zip or tar archives of resumes.
     """
     # 1. Fetch the job and verify it exists
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    db_job = await async_crud.get_job(db, job_id=job_id)
     if not db_job:
         raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
     
@@ -252,17 +424,13 @@ async def add_candidates_to_job(
     if not structured_jd:
         raise HTTPException(status_code=400, detail="Job description structure not found")
         
-    # 3. Create a list of concurrent tasks, one for each resume.
-    tasks = [
-        _process_and_save_resume(resume_file, structured_jd, db_job.id, db) 
-        for resume_file in resume_files
-    ]
-    
-    # 4. Run all resume processing tasks in parallel.
-    results = await asyncio.gather(*tasks)
-
-    # 5. Filter out any Nones from tasks that were skipped or failed.
-    processed_screenings = [res for res in results if res is not None]
+    # 3. Screen the resumes concurrently, streaming them from the upload spool.
+    async with await _spool_resume_uploads(resume_files) as spool:
+        processed_screenings = await screen_resumes(
+            spool.resumes, structured_jd, db_job.id,
+            pipeline_mode=db_job.pipeline_mode,
+            **_shortlist_limits(shortlist_top_k, shortlist_min_score)
+        )
     
     if not processed_screenings:
         raise HTTPException(status_code=400, detail="No valid new resumes were processed.")
@@ -270,20 +438,232 @@ async def add_candidates_to_job(
     return processed_screenings
 
 
+# --- Asynchronous batch endpoints ---
+# Submission returns a batch id at once; progress and each saved screening are streamed
+# from GET /batches/{batch_id}/events as Server-Sent Events. With SCREENING_EXECUTION=queue
+# the resumes are screened by `python -m backend.worker` processes instead of this one.
+
+async def _follow_queued_batch(batch: batches.Batch):
+    """Publishes the outcome of each work item of a queued batch until all of them are done."""
+    reported = set()
+    while True:
+        items = await run_query(work_queue.get_batch_items, batch_id=batch.id)
+        for item in items:
+            if item["status"] not in work_queue.FINISHED_STATUSES or item["id"] in reported:
+                continue
+            reported.add(item["id"])
+            screening = None
+            if item["status"] == "saved" and item["screening_id"]:
+                screening = await run_query(async_crud.get_screening_by_id, screening_id=item["screening_id"])
+            if screening:
+                batch.publish("resume_saved", resume=item["filename"], screening=screening_summary(screening))
+            elif item["status"] == "saved":
+                batch.publish("resume_skipped", resume=item["filename"], reason="Screening was deleted.")
+            else:
+                batch.publish(f"resume_{item['status']}", resume=item["filename"], reason=item["last_error"])
+        if len(reported) == len(items):
+            return
+        await asyncio.sleep(work_queue.WORK_POLL_INTERVAL_SECONDS)
+
+
+async def _run_batch(
+    batch: batches.Batch,
+    spool: ingest.ResumeSpool,
+    job_title: Optional[str] = None,
+    jd_text: Optional[str] = None,
+    structured_jd: Optional[dict] = None,
+    shortlist: Optional[dict] = None,
+    pipeline_mode: Optional[str] = None
+):
+    try:
+        if structured_jd is None:
+            batch.publish("jd_started")
+            async with AsyncSessionLocal() as db:
+                db_job, near_duplicates = await _find_job_for_jd(db, jd_text)
+            reused = db_job is not None
+            if reused:
+                structured_jd = db_job.structured_jd
+            else:
+                structured_jd = await deconstruct_jd(job_description_text=jd_text)
+                if "error" in structured_jd:
+                    batch.finish("failed", reason=structured_jd["error"])
+                    return
+                async with AsyncSessionLocal() as db:
+                    db_job = await _get_or_create_job(db, job_title, jd_text, structured_jd, pipeline_mode)
+            batch.job_id = db_job.id
+            pipeline_mode = db_job.pipeline_mode
+            batch.publish(
+                "jd_finished",
+                job_id=db_job.id,
+                job_title=db_job.title,
+                reused=reused,
+                near_duplicates=near_duplicates
+            )
+
+        for filename, reason in spool.rejected:
+            batch.publish("resume_failed", resume=filename, reason=reason, retryable=False)
+        resumes = spool.resumes
+        shortlist = shortlist or {}
+        if work_queue.SCREENING_EXECUTION == "queue":
+            for resume in resumes:
+                batch.publish("resume_queued", resume=resume.filename)
+            if shortlist.get("shortlist_top_k") is not None or shortlist.get("shortlist_min_score") is not None:
+                # Shortlisting needs every resume at once, so it runs here; workers get the shortlist only.
+                async with ScreeningWriter() as writer:
+                    resumes, _, _ = await shortlist_resumes(
+                        resumes, structured_jd, batch.job_id, writer,
+                        top_k=shortlist["shortlist_top_k"], min_score=shortlist["shortlist_min_score"],
+                        on_event=batch.publish
+                    )
+            # Enqueued a chunk at a time, so only one chunk's bytes are in memory.
+            for start in range(0, len(resumes), work_queue.ENQUEUE_CHUNK_SIZE):
+                chunk = [
+                    (resume.filename, resume.content_type, await resume.read())
+                    for resume in resumes[start:start + work_queue.ENQUEUE_CHUNK_SIZE]
+                ]
+                await run_query(work_queue.enqueue_resumes, batch_id=batch.id, job_id=batch.job_id, resumes=chunk)
+            await _follow_queued_batch(batch)
+        else:
+            for resume in resumes:
+                batch.publish("resume_queued", resume=resume.filename)
+            await screen_resumes(
+                resumes, structured_jd, batch.job_id, on_event=batch.publish, pipeline_mode=pipeline_mode, **shortlist
+            )
+        batch.finish("completed")
+    except Exception as e:
+        print(f"Batch {batch.id} failed: {e}")
+        batch.finish("failed", reason=str(e))
+    finally:
+        spool.close()
+
+
+@app.post("/batches/", status_code=202)
+async def submit_screening_batch(
+    job_title: Optional[str] = Form(None),
+    jd_file: UploadFile = File(...),
+    resume_files: List[UploadFile] = File(...),
+    shortlist_top_k: Optional[int] = Form(None),
+    shortlist_min_score: Optional[float] = Form(None),
+    pipeline_mode: Optional[str] = Form(None)
+):
+    """
+    Start screening resumes against a new job description in the background.
+    Returns the batch id immediately; follow progress at /batches/{batch_id}/events.
+    """
+    _check_pipeline_mode(pipeline_mode)
+    jd_text = await _read_jd_text(jd_file)
+    # Uploads are only readable during the request, so they are spooled now; the batch removes the spool.
+    spool = await _spool_resume_uploads(resume_files)
+    batch = batches.create_batch(resume_count=len(spool.resumes) + len(spool.rejected))
+    batch.task = asyncio.create_task(_run_batch(
+        batch, spool, job_title=job_title, jd_text=jd_text,
+        shortlist=_shortlist_limits(shortlist_top_k, shortlist_min_score),
+        pipeline_mode=pipeline_mode
+    ))
+    return batch.summary()
+
+
+@app.post("/jobs/{job_id}/batches/", status_code=202)
+async def submit_candidates_batch(
+    job_id: int,
+    resume_files: List[UploadFile] = File(...),
+    shortlist_top_k: Optional[int] = Form(None),
+    shortlist_min_score: Optional[float] = Form(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start adding candidates to an existing job in the background.
+    Returns the batch id immediately; follow progress at /batches/{batch_id}/events.
+    """
+    db_job = await async_crud.get_job(db, job_id=job_id)
+    if not db_job:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    if not db_job.structured_jd:
+        raise HTTPException(status_code=400, detail="Job description structure not found")
+
+    spool = await _spool_resume_uploads(resume_files)
+    batch = batches.create_batch(resume_count=len(spool.resumes) + len(spool.rejected), job_id=db_job.id)
+    batch.task = asyncio.create_task(_run_batch(
+        batch, spool, structured_jd=db_job.structured_jd,
+        shortlist=_shortlist_limits(shortlist_top_k, shortlist_min_score),
+        pipeline_mode=db_job.pipeline_mode
+    ))
+    return batch.summary()
+
+
+@app.get("/batches/{batch_id}")
+async def read_batch(batch_id: str):
+    """
+    Current status and counters of a screening batch.
+    """
+    batch = batches.get_batch(batch_id)
+    if batch:
+        return batch.summary()
+    # Queued batches outlive the API process that accepted them, so fall back to their work items.
+    items = await run_query(work_queue.get_batch_items, batch_id=batch_id)
+    if not items:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    counts = {status: sum(1 for item in items if item["status"] == status) for status in work_queue.FINISHED_STATUSES}
+    return {
+        "batch_id": batch_id,
+        "job_id": items[0]["job_id"],
+        "status": "completed" if sum(counts.values()) == len(items) else "running",
+        "resume_count": len(items),
+        **counts,
+    }
+
+
+@app.get("/batches/{batch_id}/events")
+async def stream_batch_events(batch_id: str, last_event_id: Optional[int] = Header(None)):
+    """
+    Server-Sent Events stream of a batch: JD and per-resume stage progress, each saved screening
+    as soon as it is persisted, and a final batch_completed/batch_failed event. Past events are
+    replayed first; reconnecting clients resume after their Last-Event-ID.
+    """
+    batch = batches.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+
+    async def event_stream():
+        async for event in batch.follow(after_seq=last_event_id or 0):
+            yield batches.format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/rescore/")
+async def rescore(job_id: Optional[int] = None, profile: Optional[str] = None):
+    """
+    Recompute the final scores of a job's screenings, or of all screenings, with a scoring
+    weight profile. Uses only the stored analyses, so no LLM calls are made.
+    """
+    if job_id is not None:
+        async with AsyncSessionLocal() as db:
+            if not await async_crud.get_job(db, job_id=job_id):
+                raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    try:
+        return await rescore_screenings(job_id=job_id, profile=profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # --- DELETE Endpoints (Changed to async) ---
 
 @app.delete("/jobs/{job_id}")
-async def delete_job(job_id: int, db: Session = Depends(get_db)):
+async def delete_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a job and all its associated screenings.
-    (FastAPI runs the synchronous DB code in a thread pool).
     """
     try:
-        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        job = await async_crud.get_job(db, job_id=job_id)
         if not job:
             raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
         
-        success = crud.delete_job(db, job_id)
+        success = await async_crud.delete_job(db, job_id)
         if success:
             return {"message": f"Job {job_id} and all associated screenings deleted successfully"}
         else:
@@ -296,17 +676,16 @@ async def delete_job(job_id: int, db: Session = Depends(get_db)):
 
 
 @app.delete("/screenings/{screening_id}")
-async def delete_screening(screening_id: int, db: Session = Depends(get_db)):
+async def delete_screening(screening_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a specific candidate screening from a job.
-    (FastAPI runs the synchronous DB code in a thread pool).
     """
     try:
-        screening = db.query(models.Screening).filter(models.Screening.id == screening_id).first()
+        screening = await async_crud.get_screening_by_id(db, screening_id=screening_id)
         if not screening:
             raise HTTPException(status_code=404, detail=f"Screening with id {screening_id} not found")
         
-        success = crud.delete_screening(db, screening_id)
+        success = await async_crud.delete_screening(db, screening_id)
         if success:
             return {"message": f"Screening {screening_id} deleted successfully"}
         else:
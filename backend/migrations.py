@@ -0,0 +1,71 @@
+"""
+Brings an existing database up to the current models. `create_all` only creates missing tables,
+so the columns, indexes and constraints added to tables that already existed are added here
+with idempotent statements. Run at startup by the API, the workers and the CLI, or by hand:
+
+    python -m backend.migrations
+"""
+from sqlalchemy import text
+
+from . import models
+from .database import engine
+
+# Any two processes upgrading at once (the API and its workers) take turns on this advisory lock.
+_LOCK_ID = 7_245_301
+
+# Additions to the tables of the original schema, in the order they were introduced.
+_STATEMENTS = [
+    # Content hashes (resume dedup) and job description fingerprints.
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64)",
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_file_hash ON candidates (file_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_text_hash ON candidates (text_hash)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash INTEGER[]",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash_bands VARCHAR(32)[]",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_text_hash ON jobs (text_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_minhash_bands ON jobs USING gin (minhash_bands)",
+    # Keyset pagination and ranked listings.
+    "CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_screenings_final_score ON screenings (final_score)",
+    "CREATE INDEX IF NOT EXISTS ix_screenings_job_id ON screenings (job_id)",
+    # Scoring profiles, provisional scores, embeddings and per-job pipeline modes.
+    "ALTER TABLE screenings ADD COLUMN IF NOT EXISTS scoring_profile VARCHAR(20)",
+    "ALTER TABLE screenings ADD COLUMN IF NOT EXISTS provisional BOOLEAN NOT NULL DEFAULT false",
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS embedding BYTEA",
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_embedding_model ON candidates (embedding_model)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS pipeline_mode VARCHAR(20)",
+]
+
+# Batched screening inserts rely on ON CONFLICT (job_id, candidate_id). Before the index can be
+# built, repeated screenings of a candidate for a job are removed, keeping the first one.
+_DEDUPE_SCREENINGS = """
+DELETE FROM screenings duplicate
+USING screenings kept
+WHERE duplicate.job_id = kept.job_id
+  AND duplicate.candidate_id = kept.candidate_id
+  AND duplicate.id > kept.id
+"""
+_UNIQUE_SCREENINGS = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_screenings_job_candidate ON screenings (job_id, candidate_id)"
+)
+
+
+def upgrade_schema(bind=engine):
+    """Creates missing tables, then adds whatever the existing ones lack. Safe to run repeatedly."""
+    with bind.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": _LOCK_ID})
+        models.Base.metadata.create_all(bind=connection)
+        for statement in _STATEMENTS:
+            connection.execute(text(statement))
+        if connection.execute(text("SELECT to_regclass('uq_screenings_job_candidate')")).scalar() is None:
+            removed = connection.execute(text(_DEDUPE_SCREENINGS)).rowcount
+            if removed:
+                print(f"Removed {removed} repeated screenings of a candidate for the same job.")
+            connection.execute(text(_UNIQUE_SCREENINGS))
+
+
+if __name__ == "__main__":
+    upgrade_schema()
+    print("Database schema is up to date.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Text, Numeric, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB , ARRAY
 from sqlalchemy.sql import func
@@ -7,11 +7,24 @@ from .database import Base
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Supports keyset pagination of the job listing.
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        # Finds jobs sharing a MinHash LSH band with a new description (array overlap).
+        Index("ix_jobs_minhash_bands", "minhash_bands", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), index=True)
     raw_jd_text = Column(Text)
     structured_jd = Column(JSONB)
+    # Fingerprints of the description text: exact match on the normalized text, and a MinHash
+    # signature with its LSH band keys for near duplicates (see analyzer.fingerprint).
+    text_hash = Column(String(64), index=True, nullable=True)
+    minhash = Column(ARRAY(Integer), nullable=True)
+    minhash_bands = Column(ARRAY(String(32)), nullable=True)
+    # Per-resume pipeline for this job's screenings (analyzer.config.PIPELINE_MODES); None uses PIPELINE_MODE.
+    pipeline_mode = Column(String(20), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     screenings = relationship("Screening", back_populates="job")
@@ -25,22 +38,82 @@ class Candidate(Base):
     raw_resume_text = Column(Text)
     structured_resume = Column(JSONB)
     total_experience = Column(Numeric(4, 2))  # e.g., 10.50 years
+    file_hash = Column(String(64), index=True)  # sha256 of the uploaded PDF bytes
+    text_hash = Column(String(64), index=True)  # sha256 of the normalized extracted text
+    # float32 vector of raw_resume_text for semantic search (analyzer.embeddings), and its model.
+    embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(String(100), index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     screenings = relationship("Screening", back_populates="candidate")
 
 class Screening(Base):
     __tablename__ = "screenings"
+    __table_args__ = (
+        # A candidate is screened at most once per job; batch inserts rely on this for ON CONFLICT.
+        UniqueConstraint("job_id", "candidate_id", name="uq_screenings_job_candidate"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    final_score = Column(Numeric(5, 2))  # e.g., 95.75
+    final_score = Column(Numeric(5, 2), index=True)  # e.g., 95.75
     skill_match_analysis = Column(JSONB)
     red_flags = Column(ARRAY(String), nullable=True)
     quality_multiplier = Column(Numeric(3, 2)) # e.g., 0.95
+    scoring_profile = Column(String(20), nullable=True)  # Weight profile of final_score (analyzer.scoring)
+    # Keyword-based score of a resume that was not shortlisted for the LLM analysis (analyzer.prefilter).
+    provisional = Column(Boolean, default=False, server_default="false", nullable=False)
     screened_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
 
     job = relationship("Job", back_populates="screenings")
-    candidate = relationship("Candidate", back_populates="screenings")
\ No newline at end of file
+    candidate = relationship("Candidate", back_populates="screenings")
+
+class ScreeningWorkItem(Base):
+    """One queued resume of a screening batch, processed by a worker process (see backend.worker)."""
+    __tablename__ = "screening_work_items"
+    __table_args__ = (
+        # Workers claim the oldest available items of a status.
+        Index("ix_screening_work_items_claim", "status", "available_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String(32), index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"))
+    filename = Column(String(255))
+    content_type = Column(String(100))
+    resume_bytes = Column(LargeBinary)
+    status = Column(String(20), default="queued")  # queued, running, saved, skipped, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    available_at = Column(DateTime(timezone=True), server_default=func.now())
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    screening_id = Column(Integer, ForeignKey("screenings.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class StageResult(Base):
+    """
+    The output of one per-resume pipeline stage from a screening attempt that failed, so the
+    next attempt under the same settings only repeats the stages that are missing or failed
+    (analyzer.pipeline.StageCheckpoint).
+    Removed once the resume is saved.
+    """
+    __tablename__ = "stage_results"
+    __table_args__ = (
+        UniqueConstraint("resume_hash", "job_id", "settings", "stage", name="uq_stage_results_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_hash = Column(String(64))  # sha256 of the normalized resume text (analyzer.fingerprint)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), index=True)
+    # Prompt version, pipeline mode, models and compaction that produced it (analyzer.main.stage_settings).
+    settings = Column(String(255))
+    stage = Column(String(50))
+    status = Column(String(20))  # finished, failed
+    output = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,176 @@
+"""
+Re-scores stored screenings with a scoring profile, straight from the database and without LLM calls.
+
+    python -m backend.rescore --profile v1 [--job-id 12]
+
+The same pass is available as POST /rescore/.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from typing import List, Optional
+
+from sqlalchemy import Integer, Numeric, bindparam, case, cast, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONPATH
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analyzer import config, scoring
+from analyzer.batch_scoring import JobScoringBatch, percentile_bands
+
+from . import models
+from .database import AsyncSessionLocal, async_engine
+
+RESCORE_CHUNK_SIZE = 5000
+
+
+def _array_length(element):
+    """Length of a JSONB array, 0 when the value is missing or not an array."""
+    return case((func.jsonb_typeof(element) == "array", func.jsonb_array_length(element)), else_=0)
+
+
+def _scoring_inputs_query():
+    """
+    Screenings with the inputs of their score. The score only needs proficiency levels and list
+    lengths, so those are extracted in SQL rather than decoding the full analysis and resume
+    documents of every row.
+    """
+    analysis = models.Screening.skill_match_analysis
+    resume = models.Candidate.structured_resume
+    return (
+        select(
+            models.Screening.id,
+            models.Screening.job_id,
+            models.Screening.final_score,
+            models.Screening.scoring_profile,
+            models.Screening.quality_multiplier,
+            func.jsonb_build_array(
+                func.jsonb_path_query_array(analysis, cast("$.skill_match_analysis.must_have_matches[*].proficiency_level", JSONPATH)),
+                func.jsonb_path_query_array(analysis, cast("$.skill_match_analysis.nice_to_have_matches[*].proficiency_level", JSONPATH)),
+            ).label("levels"),
+            analysis["experience_match_analysis"]["calculated_candidate_years"].astext.label("candidate_exp"),
+            _array_length(resume["certifications_and_awards"]).label("certifications"),
+            _array_length(resume["leadership_and_extracurriculars"]).label("leadership"),
+        )
+        .join(models.Candidate, models.Candidate.id == models.Screening.candidate_id)
+    )
+
+
+def _batch_from_rows(requirements: dict, rows: list) -> JobScoringBatch:
+    return JobScoringBatch.from_level_lists(
+        requirements,
+        [row.levels[0] for row in rows],
+        [row.levels[1] for row in rows],
+        [float(row.candidate_exp or 0) for row in rows],
+        [row.certifications for row in rows],
+        [row.leadership for row in rows],
+        [float(row.quality_multiplier if row.quality_multiplier is not None else 1) for row in rows],
+    )
+
+
+async def _get_requirements(db: AsyncSession, job_ids: set) -> dict:
+    result = await db.execute(select(models.Job.id, models.Job.structured_jd).filter(models.Job.id.in_(job_ids)))
+    structured_jds = dict(result.all())
+    return {job_id: structured_jds.get(job_id) or {} for job_id in job_ids}
+
+
+def _check_profiles(profiles: List[str]):
+    for profile in profiles:
+        if profile not in scoring.WEIGHT_PROFILES:
+            raise ValueError(f"Unknown scoring profile '{profile}'. Known profiles: {sorted(scoring.WEIGHT_PROFILES)}")
+
+
+async def rescore_screenings(job_id: Optional[int] = None, profile: Optional[str] = None, chunk_size: int = RESCORE_CHUNK_SIZE) -> dict:
+    """
+    Recomputes `final_score` of every screening of a job, or of all jobs, from the stored skill
+    analysis, structured resume and quality multiplier. Reads the scoring inputs in keyset-paginated
+    chunks, scores each job's rows of a chunk in one vectorized pass, and writes the chunk's
+    changed scores back in one UPDATE.
+    """
+    profile = profile or config.SCORING_PROFILE
+    _check_profiles([profile])
+
+    started = time.perf_counter()
+    query = _scoring_inputs_query().order_by(models.Screening.id).limit(chunk_size)
+    if job_id is not None:
+        query = query.filter(models.Screening.job_id == job_id)
+
+    requirements_by_job = {}
+    total = 0
+    updated = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(query.filter(models.Screening.id > last_id))).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            total += len(rows)
+
+            rows_by_job = defaultdict(list)
+            for row in rows:
+                rows_by_job[row.job_id].append(row)
+            missing_jobs = rows_by_job.keys() - requirements_by_job.keys()
+            if missing_jobs:
+                requirements_by_job.update(await _get_requirements(db, missing_jobs))
+
+            changed = []
+            for job, job_rows in rows_by_job.items():
+                new_scores = _batch_from_rows(requirements_by_job[job], job_rows).final_scores([profile])[0]
+                for row, new_score in zip(job_rows, new_scores.tolist()):
+                    if row.final_score is None or new_score != row.final_score or row.scoring_profile != profile:
+                        changed.append((row.id, new_score))
+
+            if changed:
+                # Two array parameters unnested server-side: one small statement however many rows changed.
+                ids, scores = zip(*changed)
+                rescored = func.unnest(
+                    bindparam("ids", list(ids), type_=ARRAY(Integer)),
+                    bindparam("scores", list(scores), type_=ARRAY(Numeric(5, 2))),
+                ).table_valued("id", "final_score").render_derived(name="rescored")
+                await db.execute(
+                    update(models.Screening)
+                    .where(models.Screening.id == rescored.c.id)
+                    .values(final_score=rescored.c.final_score, scoring_profile=profile)
+                )
+                await db.commit()
+                updated += len(changed)
+
+    return {
+        "profile": profile,
+        "job_id": job_id,
+        "screenings": total,
+        "updated": updated,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def job_score_bands(db: AsyncSession, job_id: int, profiles: List[str]) -> dict:
+    """
+    Percentile bands of a job's final scores under each profile, without writing anything.
+    Lets a new weight profile be compared with the current one before re-scoring.
+    """
+    _check_profiles(profiles)
+    rows = (await db.execute(_scoring_inputs_query().filter(models.Screening.job_id == job_id))).all()
+    requirements = (await _get_requirements(db, {job_id}))[job_id]
+    scores = _batch_from_rows(requirements, rows).final_scores(profiles)
+    return {
+        "job_id": job_id,
+        "screening_count": len(rows),
+        "bands": {profile: percentile_bands(scores[index]) for index, profile in enumerate(profiles)},
+    }
+
+
+async def main(job_id: Optional[int], profile: Optional[str]):
+    try:
+        print(await rescore_screenings(job_id=job_id, profile=profile))
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--job-id", type=int, default=None, help="Only re-score this job (default: all jobs).")
+    parser.add_argument("--profile", default=None, help=f"Scoring profile (default: {config.SCORING_PROFILE}).")
+    args = parser.parse_args()
+    asyncio.run(main(args.job_id, args.profile))
@@ -11,8 +11,13 @@ class CandidateBase(BaseModel):
 
 class CandidateCreate(CandidateBase):
     raw_resume_text: str
-    structured_resume: Dict[str, Any]
-    total_experience: Decimal
+    # Both are None for candidates only screened provisionally (analyzer.prefilter).
+    structured_resume: Optional[Dict[str, Any]] = None
+    total_experience: Optional[Decimal] = None
+    file_hash: Optional[str] = None
+    text_hash: Optional[str] = None
+    embedding: Optional[bytes] = None
+    embedding_model: Optional[str] = None
 
 class Candidate(CandidateBase):
     id: int
@@ -29,11 +34,19 @@ class JobBase(BaseModel):
 class JobCreate(JobBase):
     raw_jd_text: str
     structured_jd: Dict[str, Any]
+    text_hash: Optional[str] = None
+    minhash: Optional[List[int]] = None
+    minhash_bands: Optional[List[str]] = None
+    pipeline_mode: Optional[str] = None
+
+class JobUpdate(BaseModel):
+    pipeline_mode: Optional[str] = None
 
 class Job(JobBase):
     id: int
     created_at: datetime
     candidate_count: int = 0 
+    pipeline_mode: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -45,6 +58,8 @@ class ScreeningBase(BaseModel):
     quality_multiplier: Decimal
     skill_match_analysis: Dict[str, Any]
     red_flags: Optional[List[str]] = []
+    scoring_profile: Optional[str] = None
+    provisional: bool = False
 
 class ScreeningCreate(ScreeningBase):
     pass
@@ -59,4 +74,33 @@ class Screening(ScreeningBase):
     candidate: Candidate
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ScreeningSummary(BaseModel):
+    """Ranked-list row: only what the results table shows."""
+    id: int
+    candidate_id: int
+    full_name: Optional[str] = None
+    final_score: Decimal
+    executive_summary: Optional[str] = None
+    red_flag_count: int = 0
+    provisional: bool = False
+    screened_at: datetime
+
+class CandidateMatch(BaseModel):
+    """A stored candidate found by semantic search for a job."""
+    candidate_id: int
+    full_name: Optional[str] = None
+    contact_info: str
+    total_experience: Optional[Decimal] = None
+    similarity: float
+    screened: bool = False
+
+class RankedScreeningsPage(BaseModel):
+    job_id: int
+    job_title: str
+    total_count: int
+    items: List[ScreeningSummary]
+    # Cursor for the next page; both are None on the last page.
+    next_after_score: Optional[Decimal] = None
+    next_after_id: Optional[int] = None
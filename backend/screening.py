@@ -0,0 +1,421 @@
+# Resume screening shared by the API endpoints and the queue workers.
+import asyncio
+import uuid
+from decimal import Decimal
+from typing import Callable, List, Optional, Tuple
+
+from analyzer.main import analyze_single_resume, stage_settings
+from analyzer.parsers import extract_pdf_document_async
+from analyzer.prefilter import SkillMatcher, provisional_analysis, select_shortlist
+from analyzer import embeddings, fingerprint, metrics, pipeline, tracing
+
+from . import async_crud, ingest, models, schemas
+from .database import AsyncSessionLocal
+from .writer import ScreeningWriter
+
+
+async def run_query(query_func, **kwargs):
+    """
+    Runs one async_crud function in a short-lived session of its own. Resume tasks run
+    concurrently and spend most of their time waiting on the LLM, so they must not share
+    a session or hold a pooled connection between queries.
+    """
+    with tracing.span(f"db.{query_func.__name__}"):
+        async with AsyncSessionLocal() as db:
+            return await query_func(db, **kwargs)
+
+
+@tracing.traced("resume", resume="resume_filename", job_id="job_id")
+async def process_and_save_resume(
+    resume_filename: str,
+    content_type: str,
+    resume_bytes: bytes,
+    structured_jd: dict, 
+    job_id: int,
+    writer: ScreeningWriter,
+    on_event: Optional[Callable[..., None]] = None,
+    resume_document: Optional[dict] = None,
+    provisional_result: Optional[dict] = None,
+    pipeline_mode: Optional[str] = None
+) -> Optional[models.Screening]:
+    """
+    Helper coroutine to fully process one resume file and save results to the DB.
+    Results are persisted through the batch's shared writer. `on_event(event_type, **fields)`,
+    if given, receives progress events for this resume. `resume_document` is the already
+    extracted text, if any; with `provisional_result` (see `shortlist_resumes`) that result is
+    saved instead of running the LLM analysis. `pipeline_mode` is the job's (see analyze_single_resume).
+    When an attempt fails, including when a stage only has a fallback result, the stages it
+    finished are stored (models.StageResult), so retrying the resume for the same job only runs
+    the stages that are missing or failed.
+    Returns the screening object or None if processing fails.
+    """
+    def emit(event_type: str, **fields):
+        if event_type != "stage":
+            metrics.RESUME_EVENTS.inc(event=event_type)
+        if on_event:
+            on_event(event_type, resume=resume_filename, **fields)
+
+    print(f"\n--- Processing resume: {resume_filename} ---")
+    if content_type != 'application/pdf':
+        print(f"Skipping non-PDF file: {resume_filename}")
+        emit("resume_skipped", reason="Not a PDF file.")
+        return None
+
+    # 1. Look the resume up by content before spending any LLM calls on it.
+    file_hash = fingerprint.hash_bytes(resume_bytes)
+    db_candidate = await run_query(async_crud.get_candidate_by_file_hash, file_hash=file_hash)
+    if db_candidate:
+        # Same bytes as a stored resume, so the stored text is exactly what extraction would return.
+        resume_document = {"text": db_candidate.raw_resume_text or ""}
+    else:
+        # Extract once, off the event loop; the text feeds both the analyzer and the database.
+        if resume_document is None:
+            resume_document = await extract_pdf_document_async(resume_bytes)
+        resume_text = resume_document["text"]
+        if not resume_text:
+            print(f"Skipping resume {resume_filename} because text could not be extracted.")
+            emit("resume_failed", reason="Text could not be extracted from the PDF.", retryable=False)
+            return None
+        # Fall back to the normalized text, which also catches re-exported copies of the same resume.
+        text_hash = fingerprint.hash_text(resume_text)
+        db_candidate = await run_query(async_crud.get_candidate_by_text_hash, text_hash=text_hash)
+    # Only the text is needed from here on; callers release their memory budget on this event.
+    del resume_bytes
+    emit("resume_extracted", known_candidate=db_candidate is not None)
+
+    known_resume = None
+    if db_candidate:
+        if await run_query(async_crud.get_screening, job_id=job_id, candidate_id=db_candidate.id):
+            print(f"Resume {resume_filename} already screened for this job. Skipping.")
+            emit("resume_skipped", reason="Already screened for this job.")
+            return None
+        # Candidates only screened provisionally have no parsed resume to reuse.
+        if db_candidate.structured_resume:
+            known_resume = {
+                "structured_resume": db_candidate.structured_resume,
+                "experience_years": float(db_candidate.total_experience or 0),
+            }
+
+    checkpoint = None
+    if provisional_result is not None:
+        print(f"Resume {resume_filename} was not shortlisted; saving its provisional score.")
+        analysis_result = provisional_result
+    else:
+        # Stages that finished in an earlier failed attempt at this resume and job are not run again.
+        stage_key = (fingerprint.hash_text(resume_document["text"]), job_id, stage_settings(pipeline_mode))
+        checkpoint, has_stored_stages = await _load_stage_checkpoint(*stage_key)
+        try:
+            # 2. Run the core asynchronous analyzer for the current resume.
+            analysis_result = await analyze_single_resume(
+                structured_jd=structured_jd, 
+                resume_document=resume_document,
+                resume_filename=resume_filename,
+                known_resume=known_resume,
+                on_event=lambda stage_event: emit("stage", **stage_event),
+                pipeline_mode=pipeline_mode,
+                checkpoint=checkpoint
+            )
+            if "error" in analysis_result:
+                print(f"Skipping resume {resume_filename} due to analysis error: {analysis_result['error']}")
+                await _save_stage_checkpoint(*stage_key, checkpoint)
+                emit("resume_failed", reason=analysis_result["error"])
+                return None
+            if analysis_result["incomplete_stages"]:
+                # A fallback score is not saved; a retry repeats only the stages that failed.
+                reason = f"Incomplete analysis: the {', '.join(analysis_result['incomplete_stages'])} stage failed."
+                print(f"Skipping resume {resume_filename}: {reason}")
+                await _save_stage_checkpoint(*stage_key, checkpoint)
+                emit("resume_failed", reason=reason)
+                return None
+        except Exception as e:
+            print(f"Skipping resume {resume_filename} due to unexpected error during analysis: {e}")
+            await _save_stage_checkpoint(*stage_key, checkpoint)
+            emit("resume_failed", reason=str(e))
+            return None
+
+    # 3. Prepare the Candidate (unless it is already stored) and Screening rows.
+    structured_resume = analysis_result.get("structured_resume", {})
+    candidate_name = structured_resume.get("full_name", "Unknown Candidate")
+    provisional = analysis_result.get("provisional", False)
+
+    candidate_schema = None
+    if not db_candidate:
+        try:
+            embedding = embeddings.to_bytes((await embeddings.embed_texts_async([resume_text]))[0])
+        except Exception as e:
+            # Search can do without this candidate until `python -m backend.candidate_search`.
+            print(f"Could not embed resume {resume_filename}: {e}")
+            embedding = None
+        candidate_schema = schemas.CandidateCreate(
+            contact_info=structured_resume.get("contact_info", f"unknown_{uuid.uuid4()}@example.com"),
+            full_name=candidate_name,
+            raw_resume_text=resume_text,
+            # A provisional result has only a guessed name and contact, not a parsed resume.
+            structured_resume=None if provisional else structured_resume,
+            total_experience=None if provisional else _experience_years(analysis_result),
+            file_hash=file_hash,
+            text_hash=text_hash,
+            embedding=embedding,
+            embedding_model=embeddings.model_name() if embedding else None
+        )
+
+    # A known candidate first stored from a provisional result gets this analysis's parse, so
+    # later jobs reuse it (known_resume) and rescoring can read it.
+    parsed_resume = None
+    if db_candidate and not provisional and (db_candidate.structured_resume is None or db_candidate.total_experience is None):
+        parsed_resume = {"structured_resume": structured_resume, "total_experience": _experience_years(analysis_result)}
+
+    # 4. Hand both to the batch writer, which upserts the candidate on contact info and
+    # skips the screening if this candidate was already screened for the job.
+    try:
+        db_screening = await writer.submit(
+            job_id,
+            _screening_schema(analysis_result),
+            candidate=candidate_schema,
+            candidate_id=db_candidate.id if db_candidate else None,
+            parsed_resume=parsed_resume
+        )
+    except Exception as e:
+        print(f"Skipping resume {resume_filename} due to an error while saving: {e}")
+        if checkpoint is not None:
+            await _save_stage_checkpoint(*stage_key, checkpoint)
+        emit("resume_failed", reason=f"Failed to save: {e}")
+        return None
+    if checkpoint is not None and has_stored_stages:
+        await run_query(async_crud.delete_stage_results, resume_hash=stage_key[0], job_id=job_id)
+    if db_screening is None:
+        print(f"Candidate {candidate_name} already screened for this job. Skipping.")
+        emit("resume_skipped", reason="Candidate already screened for this job.")
+        return None
+    print(f"--- Successfully processed and saved: {resume_filename} ---")
+    emit("resume_saved", screening=screening_summary(db_screening))
+    return db_screening
+
+
+async def _load_stage_checkpoint(resume_hash: str, job_id: int, settings: str) -> Tuple[pipeline.StageCheckpoint, bool]:
+    """The stage results stored for the resume and job under `settings`; also whether any were stored."""
+    stored = await run_query(async_crud.get_stage_results, resume_hash=resume_hash, job_id=job_id, settings=settings)
+    return pipeline.StageCheckpoint({row.stage: row.output for row in stored if row.status == "finished"}), bool(stored)
+
+
+async def _save_stage_checkpoint(resume_hash: str, job_id: int, settings: str, checkpoint: pipeline.StageCheckpoint):
+    # Best effort: the resume has failed already, and without these a retry just runs every stage.
+    try:
+        await run_query(
+            async_crud.save_stage_results,
+            resume_hash=resume_hash,
+            job_id=job_id,
+            settings=settings,
+            finished=checkpoint.finished,
+            failed=checkpoint.failed
+        )
+    except Exception as e:
+        print(f"Could not store the stage results of a failed resume: {e}")
+
+
+def _experience_years(analysis_result: dict) -> Decimal:
+    return Decimal(str(analysis_result["llm_analysis"]["experience_match_analysis"]["calculated_candidate_years"]))
+
+
+def _screening_schema(analysis_result: dict) -> schemas.ScreeningCreate:
+    return schemas.ScreeningCreate(
+        final_score=Decimal(str(analysis_result.get("final_score"))),
+        quality_multiplier=Decimal(str(analysis_result.get("quality_assessment", {}).get("quality_score", 1.0))),
+        skill_match_analysis=analysis_result.get("llm_analysis", {}),
+        red_flags=analysis_result.get("quality_assessment", {}).get("red_flags", []),
+        scoring_profile=analysis_result.get("scoring_profile"),
+        provisional=analysis_result.get("provisional", False)
+    )
+
+
+def screening_summary(screening: models.Screening) -> dict:
+    return schemas.ScreeningSummary(
+        id=screening.id,
+        candidate_id=screening.candidate_id,
+        full_name=screening.candidate.full_name,
+        final_score=screening.final_score,
+        executive_summary=(screening.skill_match_analysis or {}).get("executive_summary"),
+        red_flag_count=len(screening.red_flags or []),
+        provisional=bool(screening.provisional),
+        screened_at=screening.screened_at
+    ).model_dump(mode="json")
+
+
+async def _process_resumes(
+    entries: List[tuple],
+    structured_jd: dict,
+    job_id: int,
+    writer: ScreeningWriter,
+    on_event: Optional[Callable[..., None]] = None,
+    pipeline_mode: Optional[str] = None
+) -> List[Optional[models.Screening]]:
+    """
+    Runs `process_and_save_resume` for (resume, document, provisional_result) entries, at most
+    ingest.SCREENING_CONCURRENCY at a time, and returns their results in order. One producer
+    reads the spooled resumes into a bounded queue within an ingest.ByteBudget; each resume's
+    share is released as soon as its text is extracted, so memory does not grow with the batch.
+    """
+    if not entries:
+        return []
+    results: List[Optional[models.Screening]] = [None] * len(entries)
+    budget = ingest.ByteBudget()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=ingest.INGEST_QUEUE_SIZE)
+    consumers = min(ingest.SCREENING_CONCURRENCY, len(entries))
+
+    async def produce():
+        for index, (resume, document, provisional_result) in enumerate(entries):
+            reserved = await budget.acquire(resume.size)
+            await queue.put({
+                "index": index, "resume": resume, "document": document, "provisional_result": provisional_result,
+                "reserved": reserved, "content": await resume.read(),
+            })
+        for _ in range(consumers):
+            await queue.put(None)
+
+    async def consume():
+        while (item := await queue.get()) is not None:
+            released = False
+
+            def on_resume_event(event_type: str, **fields):
+                nonlocal released
+                if event_type == "resume_extracted" and not released:
+                    released = True
+                    budget.release(item["reserved"])
+                if on_event:
+                    on_event(event_type, **fields)
+            try:
+                resume = item["resume"]
+                # Popped, so the bytes live only in process_and_save_resume, which drops them after extraction.
+                results[item["index"]] = await process_and_save_resume(
+                    resume.filename, resume.content_type, item.pop("content"), structured_jd, job_id, writer,
+                    on_resume_event, resume_document=item["document"], provisional_result=item["provisional_result"],
+                    pipeline_mode=pipeline_mode
+                )
+            finally:
+                if not released:
+                    budget.release(item["reserved"])
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(consume()) for _ in range(consumers)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
+
+
+async def shortlist_resumes(
+    resumes: List[ingest.SpooledResume],
+    structured_jd: dict,
+    job_id: int,
+    writer: ScreeningWriter,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    on_event: Optional[Callable[..., None]] = None
+) -> Tuple[List[ingest.SpooledResume], List[Optional[dict]], List[models.Screening]]:
+    """
+    Ranks PDF resumes by a keyword-based score against the JD skills (analyzer.prefilter) and
+    keeps the `top_k` best and/or those scoring at least `min_score` for the LLM analysis. The
+    others are saved right away with their provisional score.
+    Returns the shortlisted resumes, their extracted documents, and the provisional screenings.
+    Non-PDFs and resumes without extractable text are passed through to be reported as usual.
+    """
+    pdfs = [index for index, resume in enumerate(resumes) if resume.content_type == 'application/pdf']
+    documents: List[Optional[dict]] = [None] * len(resumes)
+    # Every text is needed for the ranking, but only a few resumes' bytes are read at a time.
+    extraction_slots = asyncio.Semaphore(ingest.SCREENING_CONCURRENCY)
+
+    async def extract(resume: ingest.SpooledResume) -> dict:
+        async with extraction_slots:
+            return await extract_pdf_document_async(await resume.read())
+    for index, document in zip(pdfs, await asyncio.gather(*(extract(resumes[index]) for index in pdfs))):
+        documents[index] = document
+    ranked = [index for index in pdfs if documents[index]["text"]]
+
+    matcher = SkillMatcher(structured_jd)
+    provisional_results = {
+        index: provisional_analysis(structured_jd, documents[index], resumes[index].filename, matcher.match(documents[index]["text"]))
+        for index in ranked
+    }
+    chosen = select_shortlist([provisional_results[index]["final_score"] for index in ranked], top_k=top_k, min_score=min_score)
+    shortlisted = {ranked[position] for position in chosen}
+    print(f"Shortlisted {len(shortlisted)} of {len(ranked)} resumes for the full analysis.")
+    if on_event:
+        on_event("shortlist_finished", shortlisted=len(shortlisted), provisional=len(ranked) - len(shortlisted))
+
+    provisional_screenings = await _process_resumes(
+        [(resumes[index], documents[index], provisional_results[index]) for index in ranked if index not in shortlisted],
+        structured_jd, job_id, writer, on_event
+    )
+    keep = [index for index in range(len(resumes)) if index in shortlisted or index not in provisional_results]
+    return (
+        [resumes[index] for index in keep],
+        [documents[index] for index in keep],
+        [screening for screening in provisional_screenings if screening is not None],
+    )
+
+
+async def screen_resumes(
+    resumes: List[ingest.SpooledResume],
+    structured_jd: dict,
+    job_id: int,
+    on_event: Optional[Callable[..., None]] = None,
+    shortlist_top_k: Optional[int] = None,
+    shortlist_min_score: Optional[float] = None,
+    pipeline_mode: Optional[str] = None
+) -> List[models.Screening]:
+    """
+    Screens spooled resumes (see backend.ingest) against one job and returns the screenings
+    that were saved. With a shortlist limit, only the shortlisted resumes get the LLM analysis
+    (see `shortlist_resumes`). `pipeline_mode` is the job's.
+    """
+    async with ScreeningWriter() as writer:
+        documents = [None] * len(resumes)
+        provisional_screenings = []
+        if shortlist_top_k is not None or shortlist_min_score is not None:
+            resumes, documents, provisional_screenings = await shortlist_resumes(
+                resumes, structured_jd, job_id, writer, top_k=shortlist_top_k, min_score=shortlist_min_score, on_event=on_event
+            )
+        results = await _process_resumes(
+            [(resume, document, None) for resume, document in zip(resumes, documents)],
+            structured_jd, job_id, writer, on_event, pipeline_mode=pipeline_mode
+        )
+    # Filter out any Nones from tasks that were skipped or failed.
+    return provisional_screenings + [res for res in results if res is not None]
+
+
+async def analyze_provisional_screening(screening_id: int) -> Optional[models.Screening]:
+    """
+    Runs the full LLM analysis for a provisionally scored screening, e.g. a candidate a recruiter
+    picked from below the shortlist cut-off, and replaces its score. Returns the updated
+    screening, or None if the analysis failed.
+    """
+    screening = await run_query(async_crud.get_screening_by_id, screening_id=screening_id)
+    candidate = screening.candidate
+    known_resume = None
+    if candidate.structured_resume:
+        known_resume = {
+            "structured_resume": candidate.structured_resume,
+            "experience_years": float(candidate.total_experience or 0),
+        }
+    analysis_result = await analyze_single_resume(
+        structured_jd=screening.job.structured_jd,
+        resume_document={"text": candidate.raw_resume_text or ""},
+        resume_filename=candidate.full_name or f"candidate {candidate.id}",
+        known_resume=known_resume,
+        pipeline_mode=screening.job.pipeline_mode
+    )
+    if "error" in analysis_result:
+        print(f"Full analysis of screening {screening_id} failed: {analysis_result['error']}")
+        return None
+    if analysis_result["incomplete_stages"]:
+        print(f"Full analysis of screening {screening_id} is incomplete: {analysis_result['incomplete_stages']} failed")
+        return None
+    return await run_query(
+        async_crud.update_screening_analysis,
+        screening_id=screening_id,
+        screening=_screening_schema(analysis_result),
+        structured_resume=analysis_result.get("structured_resume", {}),
+        total_experience=_experience_years(analysis_result)
+    )
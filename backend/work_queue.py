@@ -0,0 +1,163 @@
+# Postgres-backed work queue for screening batches. Items are claimed with
+# SELECT ... FOR UPDATE SKIP LOCKED under a time-limited lease, so any number of worker
+# processes can share the queue and items held by a crashed worker become claimable again.
+import os
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# Execution mode of the /batches/ endpoints: "inline" screens inside the API process,
+# "queue" enqueues one work item per resume for `python -m backend.worker`.
+SCREENING_EXECUTION = os.getenv("SCREENING_EXECUTION", "inline")
+
+WORK_LEASE_SECONDS = int(os.getenv("WORK_LEASE_SECONDS", 300))
+WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", 3))
+WORK_RETRY_DELAY_SECONDS = int(os.getenv("WORK_RETRY_DELAY_SECONDS", 30))
+WORK_POLL_INTERVAL_SECONDS = float(os.getenv("WORK_POLL_INTERVAL_SECONDS", 1.0))
+# Resumes of a batch inserted per statement; only one chunk's bytes are read into memory at a time.
+ENQUEUE_CHUNK_SIZE = int(os.getenv("ENQUEUE_CHUNK_SIZE", 50))
+
+FINISHED_STATUSES = ("saved", "skipped", "failed")
+
+
+async def enqueue_resumes(db: AsyncSession, batch_id: str, job_id: int, resumes: List[tuple]) -> int:
+    """
+    Queue (filename, content_type, bytes) resumes of a batch in one multi-row insert.
+    """
+    if not resumes:
+        return 0
+    await db.execute(pg_insert(models.ScreeningWorkItem).values([
+        {
+            "batch_id": batch_id,
+            "job_id": job_id,
+            "filename": filename,
+            "content_type": content_type,
+            "resume_bytes": content,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": WORK_MAX_ATTEMPTS,
+        }
+        for filename, content_type, content in resumes
+    ]))
+    await db.commit()
+    return len(resumes)
+
+
+async def claim_items(db: AsyncSession, worker_id: str, limit: int) -> List[models.ScreeningWorkItem]:
+    """
+    Lease up to `limit` items to this worker: queued items whose retry delay has passed, and
+    running items whose lease has expired because their worker died.
+    """
+    now = func.now()
+    claimable = select(models.ScreeningWorkItem.id).filter(
+        or_(
+            and_(models.ScreeningWorkItem.status == "queued", models.ScreeningWorkItem.available_at <= now),
+            and_(models.ScreeningWorkItem.status == "running", models.ScreeningWorkItem.lease_expires_at < now),
+        ),
+        models.ScreeningWorkItem.attempts < models.ScreeningWorkItem.max_attempts,
+    ).order_by(models.ScreeningWorkItem.id).limit(limit).with_for_update(skip_locked=True)
+
+    result = await db.execute(
+        update(models.ScreeningWorkItem)
+        .where(models.ScreeningWorkItem.id.in_(claimable.scalar_subquery()))
+        .values(
+            status="running",
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=WORK_LEASE_SECONDS),
+            attempts=models.ScreeningWorkItem.attempts + 1,
+        )
+        .returning(models.ScreeningWorkItem)
+        .execution_options(synchronize_session=False)
+    )
+    items = result.scalars().all()
+    await db.commit()
+    return items
+
+
+async def renew_leases(db: AsyncSession, worker_id: str, item_ids: List[int]):
+    """
+    Extend the leases of items this worker is still processing.
+    """
+    if not item_ids:
+        return
+    await db.execute(
+        update(models.ScreeningWorkItem)
+        .where(models.ScreeningWorkItem.id.in_(item_ids))
+        .where(models.ScreeningWorkItem.lease_owner == worker_id)
+        .where(models.ScreeningWorkItem.status == "running")
+        .values(lease_expires_at=func.now() + timedelta(seconds=WORK_LEASE_SECONDS))
+    )
+    await db.commit()
+
+
+async def finish_item(
+    db: AsyncSession,
+    item: models.ScreeningWorkItem,
+    worker_id: str,
+    status: str,
+    screening_id: Optional[int] = None,
+    error: Optional[str] = None,
+    retry: bool = True,
+):
+    """
+    Record the outcome of an item. A retryable failure is put back in the queue after a delay
+    until the item runs out of attempts. The resume bytes are dropped once the item is final.
+    """
+    values = {"lease_owner": None, "lease_expires_at": None, "last_error": error}
+    if status == "failed" and retry and item.attempts < item.max_attempts:
+        values.update(status="queued", available_at=func.now() + timedelta(seconds=WORK_RETRY_DELAY_SECONDS))
+    else:
+        values.update(status=status, screening_id=screening_id, finished_at=func.now(), resume_bytes=None)
+    await db.execute(
+        update(models.ScreeningWorkItem)
+        .where(models.ScreeningWorkItem.id == item.id)
+        .where(models.ScreeningWorkItem.lease_owner == worker_id)
+        .values(**values)
+    )
+    await db.commit()
+
+
+async def fail_exhausted_items(db: AsyncSession) -> int:
+    """
+    Mark items as failed whose worker died on their final attempt, so batches still finish.
+    """
+    result = await db.execute(
+        update(models.ScreeningWorkItem)
+        .where(models.ScreeningWorkItem.status == "running")
+        .where(models.ScreeningWorkItem.lease_expires_at < func.now())
+        .where(models.ScreeningWorkItem.attempts >= models.ScreeningWorkItem.max_attempts)
+        .values(
+            status="failed",
+            last_error="Worker lease expired on the final attempt.",
+            finished_at=func.now(),
+            lease_owner=None,
+            resume_bytes=None,
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_batch_items(db: AsyncSession, batch_id: str):
+    """
+    Status of every item of a batch, without the resume bytes.
+    """
+    result = await db.execute(
+        select(
+            models.ScreeningWorkItem.id,
+            models.ScreeningWorkItem.job_id,
+            models.ScreeningWorkItem.filename,
+            models.ScreeningWorkItem.status,
+            models.ScreeningWorkItem.attempts,
+            models.ScreeningWorkItem.last_error,
+            models.ScreeningWorkItem.screening_id,
+        )
+        .filter(models.ScreeningWorkItem.batch_id == batch_id)
+        .order_by(models.ScreeningWorkItem.id)
+    )
+    return result.mappings().all()
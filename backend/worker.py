@@ -0,0 +1,154 @@
+"""
+Screening worker: claims queued resumes from the screening_work_items table and screens them.
+
+    python -m backend.worker --concurrency 8 [--metrics-port 9100]
+
+Run as many workers, on as many machines, as the LLM rate limits allow; they coordinate
+through row locks only. Stopping a worker with SIGINT/SIGTERM lets it finish its in-flight
+items, and items of a worker that died are picked up again once their lease expires.
+With --metrics-port the worker serves its Prometheus metrics (see GET /metrics of the API).
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from analyzer import metrics, tracing
+from analyzer.parsers import shutdown_extraction_pool
+
+from . import async_crud, models, work_queue
+from .database import async_engine
+from .migrations import upgrade_schema
+from .screening import process_and_save_resume, run_query
+from .writer import ScreeningWriter
+
+upgrade_schema()
+
+# Jobs are re-read after this long, so a changed pipeline mode reaches running workers.
+JOB_CACHE_SECONDS = 60
+
+
+class Worker:
+    def __init__(self, concurrency: int, poll_interval: float = work_queue.WORK_POLL_INTERVAL_SECONDS):
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+        self._in_flight: Dict[int, asyncio.Task] = {}
+        self._jobs: Dict[int, Tuple[float, Optional[models.Job]]] = {}
+
+    def stop(self):
+        if not self._stopping.is_set():
+            print(f"Worker {self.id} stopping after {len(self._in_flight)} in-flight items.")
+            self._stopping.set()
+
+    async def run(self):
+        print(f"Worker {self.id} started with concurrency {self.concurrency}.")
+        async with ScreeningWriter() as writer:
+            heartbeat = asyncio.create_task(self._renew_leases())
+            try:
+                while not self._stopping.is_set():
+                    free = self.concurrency - len(self._in_flight)
+                    items = []
+                    if free > 0:
+                        items = await run_query(work_queue.claim_items, worker_id=self.id, limit=free)
+                        await run_query(work_queue.fail_exhausted_items)
+                    for item in items:
+                        task = asyncio.create_task(self._process(item, writer))
+                        self._in_flight[item.id] = task
+                        task.add_done_callback(lambda _, item_id=item.id: self._in_flight.pop(item_id, None))
+                    if not items:
+                        # Idle or at capacity: wake up on the next poll, a finished item or a stop request.
+                        waiters = [asyncio.create_task(self._stopping.wait()), *self._in_flight.values()]
+                        await asyncio.wait(waiters, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                        waiters[0].cancel()
+                if self._in_flight:
+                    await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
+            finally:
+                heartbeat.cancel()
+        print(f"Worker {self.id} stopped.")
+
+    async def _renew_leases(self):
+        # Renew well before expiry so slow LLM calls never lose their item to another worker.
+        while True:
+            await asyncio.sleep(work_queue.WORK_LEASE_SECONDS / 3)
+            try:
+                await run_query(work_queue.renew_leases, worker_id=self.id, item_ids=list(self._in_flight))
+            except Exception as e:
+                print(f"Worker {self.id} failed to renew leases: {e}")
+
+    async def _get_job(self, job_id: int) -> Optional[models.Job]:
+        fetched_at, job = self._jobs.get(job_id, (None, None))
+        if fetched_at is None or time.monotonic() - fetched_at > JOB_CACHE_SECONDS:
+            job = await run_query(async_crud.get_job, job_id=job_id)
+            self._jobs[job_id] = (time.monotonic(), job)
+        return job
+
+    async def _process(self, item: models.ScreeningWorkItem, writer: ScreeningWriter):
+        outcome = {"status": "failed", "error": None, "retry": True}
+
+        def on_event(event_type: str, **fields):
+            if event_type == "resume_skipped":
+                outcome.update(status="skipped", error=fields.get("reason"))
+            elif event_type == "resume_failed":
+                outcome.update(error=fields.get("reason"), retry=fields.get("retryable", True))
+
+        screening = None
+        try:
+            job = await self._get_job(item.job_id)
+            if job and job.structured_jd:
+                screening = await process_and_save_resume(
+                    item.filename, item.content_type, item.resume_bytes, job.structured_jd, item.job_id, writer, on_event,
+                    pipeline_mode=job.pipeline_mode
+                )
+            else:
+                outcome.update(error="Job description structure not found.", retry=False)
+        except Exception as e:
+            print(f"Worker {self.id} failed on item {item.id}: {e}")
+            outcome["error"] = str(e)
+
+        if screening is not None:
+            outcome.update(status="saved", error=None)
+        try:
+            await run_query(
+                work_queue.finish_item,
+                item=item,
+                worker_id=self.id,
+                status=outcome["status"],
+                screening_id=screening.id if screening is not None else None,
+                error=outcome["error"],
+                retry=outcome["retry"],
+            )
+        except Exception as e:
+            # The lease runs out and the item is claimed again.
+            print(f"Worker {self.id} could not record the result of item {item.id}: {e}")
+
+
+async def main(concurrency: int, metrics_port: Optional[int] = None):
+    worker = Worker(concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    metrics_server = await metrics.serve(metrics_port) if metrics_port else None
+    lag_sampler = asyncio.create_task(tracing.sample_event_loop_lag())
+    try:
+        await worker.run()
+    finally:
+        lag_sampler.cancel()
+        if metrics_server:
+            metrics_server.close()
+        shutdown_extraction_pool()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", 8)),
+                        help="Resumes screened at the same time by this process.")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port.")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.metrics_port))
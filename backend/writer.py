@@ -0,0 +1,195 @@
+import asyncio
+import os
+from typing import List, Optional
+
+from sqlalchemy import bindparam, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import selectinload
+
+from analyzer import tracing
+
+from . import models, schemas
+from .database import AsyncSessionLocal
+
+# A flush happens when this many results are pending, or when the oldest has waited this long.
+SCREENING_FLUSH_SIZE = int(os.getenv("SCREENING_FLUSH_SIZE", 25))
+SCREENING_FLUSH_INTERVAL_SECONDS = float(os.getenv("SCREENING_FLUSH_INTERVAL_SECONDS", 1.0))
+
+
+def _missing_json(column):
+    """The JSONB column as SQL NULL when it holds nothing, including a stored JSON null."""
+    return func.nullif(column, literal_column("'null'::jsonb"))
+
+
+class _PendingResult:
+    def __init__(self, job_id: int, screening: schemas.ScreeningCreate,
+                 candidate: Optional[schemas.CandidateCreate], candidate_id: Optional[int],
+                 parsed_resume: Optional[dict]):
+        self.job_id = job_id
+        self.screening = screening
+        self.candidate = candidate
+        self.candidate_id = candidate_id
+        self.parsed_resume = parsed_resume
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class ScreeningWriter:
+    """
+    Collects finished analyses and persists them in a few multi-row statements per flush:
+    candidates are upserted on `contact_info` (filling in only what the stored row is missing) and
+    screenings inserted with ON CONFLICT DO NOTHING on (job_id, candidate_id). Callers await `submit`, which resolves once their row is written.
+
+        async with ScreeningWriter() as writer:
+            screening = await writer.submit(job_id, screening_schema, candidate=candidate_schema)
+    """
+    def __init__(self, flush_size: int = SCREENING_FLUSH_SIZE, flush_interval: float = SCREENING_FLUSH_INTERVAL_SECONDS):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: List[_PendingResult] = []
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        self._flusher = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._closed = True
+        self._wakeup.set()
+        await self._flusher
+
+    async def submit(
+        self,
+        job_id: int,
+        screening: schemas.ScreeningCreate,
+        candidate: Optional[schemas.CandidateCreate] = None,
+        candidate_id: Optional[int] = None,
+        parsed_resume: Optional[dict] = None,
+    ) -> Optional[models.Screening]:
+        """
+        Queues one result. Pass `candidate_id` for a candidate that already exists, otherwise the
+        `candidate` to upsert. `parsed_resume` ({"structured_resume", "total_experience"}) fills in
+        an existing candidate's parse where it is missing, e.g. one only screened provisionally.
+        Returns the stored screening, or None if the candidate was already screened for this job.
+        """
+        if candidate is None and candidate_id is None:
+            raise ValueError("Either candidate or candidate_id is required.")
+        if self._closed:
+            raise RuntimeError("ScreeningWriter is closed.")
+        pending = _PendingResult(job_id, screening, candidate, candidate_id, parsed_resume)
+        self._pending.append(pending)
+        if len(self._pending) >= self.flush_size:
+            self._wakeup.set()
+        return await pending.future
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                batch = self._pending[:self.flush_size]
+                del self._pending[:self.flush_size]
+                await self._flush(batch)
+            if self._closed:
+                return
+
+    async def _flush(self, batch: List[_PendingResult]):
+        try:
+            with tracing.span("db.write_screenings", rows=len(batch)):
+                stored = await self._write(batch)
+        except Exception as e:
+            print(f"Error writing {len(batch)} screenings: {e}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        for pending, screening in zip(batch, stored):
+            if not pending.future.done():
+                pending.future.set_result(screening)
+
+    async def _write(self, batch: List[_PendingResult]) -> List[Optional[models.Screening]]:
+        async with AsyncSessionLocal() as db:
+            # 1. Upsert new candidates in one statement. Rows are deduplicated first, since
+            # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement.
+            candidate_rows = {}
+            for pending in batch:
+                if pending.candidate_id is None:
+                    candidate_rows.setdefault(pending.candidate.contact_info, pending.candidate.model_dump())
+            candidate_ids = {}
+            if candidate_rows:
+                stmt = pg_insert(models.Candidate).values(list(candidate_rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[models.Candidate.contact_info],
+                    # Existing candidates keep their data; only missing parses, content hashes and embeddings are filled in.
+                    set_={
+                        "structured_resume": func.coalesce(
+                            _missing_json(models.Candidate.structured_resume), stmt.excluded.structured_resume
+                        ),
+                        "total_experience": func.coalesce(models.Candidate.total_experience, stmt.excluded.total_experience),
+                        "file_hash": func.coalesce(models.Candidate.file_hash, stmt.excluded.file_hash),
+                        "text_hash": func.coalesce(models.Candidate.text_hash, stmt.excluded.text_hash),
+                        "embedding": func.coalesce(models.Candidate.embedding, stmt.excluded.embedding),
+                        "embedding_model": func.coalesce(models.Candidate.embedding_model, stmt.excluded.embedding_model),
+                    },
+                ).returning(models.Candidate.id, models.Candidate.contact_info)
+                result = await db.execute(stmt)
+                candidate_ids = {contact: candidate_id for candidate_id, contact in result.all()}
+            for pending in batch:
+                if pending.candidate_id is None:
+                    pending.candidate_id = candidate_ids[pending.candidate.contact_info]
+
+            # Known candidates stored without a parse get the one from this full analysis.
+            parse_rows = [
+                {"b_id": pending.candidate_id, "b_resume": pending.parsed_resume["structured_resume"],
+                 "b_experience": pending.parsed_resume["total_experience"]}
+                for pending in batch if pending.parsed_resume is not None
+            ]
+            if parse_rows:
+                candidates = models.Candidate.__table__
+                await db.execute(
+                    update(candidates)
+                    .where(candidates.c.id == bindparam("b_id"))
+                    .values(
+                        structured_resume=func.coalesce(
+                            _missing_json(candidates.c.structured_resume), bindparam("b_resume", type_=JSONB)
+                        ),
+                        total_experience=func.coalesce(candidates.c.total_experience, bindparam("b_experience")),
+                    ),
+                    parse_rows,
+                )
+
+            # 2. Insert screenings; the unique (job_id, candidate_id) constraint drops repeats.
+            screening_rows = {}
+            for pending in batch:
+                screening_rows.setdefault(
+                    (pending.job_id, pending.candidate_id),
+                    {**pending.screening.model_dump(), "job_id": pending.job_id, "candidate_id": pending.candidate_id},
+                )
+            stmt = pg_insert(models.Screening).values(list(screening_rows.values()))
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=[models.Screening.job_id, models.Screening.candidate_id]
+            ).returning(models.Screening.id, models.Screening.job_id, models.Screening.candidate_id)
+            result = await db.execute(stmt)
+            inserted = {(job_id, candidate_id): screening_id for screening_id, job_id, candidate_id in result.all()}
+            await db.commit()
+
+            # 3. Load the new rows with their relations for the response in one query.
+            screenings = {}
+            if inserted:
+                result = await db.execute(
+                    select(models.Screening)
+                    .options(selectinload(models.Screening.job), selectinload(models.Screening.candidate))
+                    .filter(models.Screening.id.in_(inserted.values()))
+                )
+                screenings = {screening.id: screening for screening in result.scalars().all()}
+
+        stored = []
+        for pending in batch:
+            # Only the first submission of a (job, candidate) pair gets the new row.
+            screening_id = inserted.pop((pending.job_id, pending.candidate_id), None)
+            stored.append(screenings.get(screening_id))
+        return stored
@@ -0,0 +1,102 @@
+"""
+Compares the per-dict scoring loop with the vectorized batch scorer in analyzer.batch_scoring,
+scoring every candidate under several weight profiles, and checks that both agree exactly.
+
+    python -m benchmarks.batch_scoring --candidates 10000 100000 --profiles 3
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from analyzer import scoring
+from analyzer.batch_scoring import JobScoringBatch
+
+REQUIREMENTS = {
+    "seniority_level": "Mid-level",
+    "required_experience_years": 3,
+    "must_have_skills": ["Python", "SQL", "FastAPI", "Docker", "AWS"],
+    "nice_to_have_skills": ["Kubernetes", "Terraform", "Redis"],
+}
+
+
+def make_what_if_profiles(count: int) -> list:
+    """v1 plus variants of it registered for the benchmark only, e.g. heavier experience weight."""
+    profiles = ["v1"]
+    for index in range(1, count):
+        name = f"benchmark-{index}"
+        scoring.WEIGHT_PROFILES[name] = {
+            band: {key: weight + (index if key == "experience" else index % 2) for key, weight in weights.items()}
+            for band, weights in scoring.WEIGHT_PROFILES["v1"].items()
+        }
+        profiles.append(name)
+    return profiles
+
+
+def make_screenings(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+
+    def matches(skills):
+        return [{"skill": skill, "proficiency_level": rng.choice([0, 1, 2, 3, "2"])} for skill in skills if rng.random() < 0.8]
+
+    return [
+        {
+            "analysis": {"skill_match_analysis": {
+                "must_have_matches": matches(REQUIREMENTS["must_have_skills"]),
+                "nice_to_have_matches": matches(REQUIREMENTS["nice_to_have_skills"]),
+            }},
+            "resume": {
+                "certifications_and_awards": ["cert"] * rng.randint(0, 3),
+                "leadership_and_extracurriculars": ["role"] * rng.randint(0, 2),
+            },
+            "candidate_exp": round(rng.uniform(0, 12), 1),
+            "quality_multiplier": round(rng.uniform(0.5, 1.0), 2),
+        }
+        for _ in range(count)
+    ]
+
+
+def run(count: int, profiles: list) -> dict:
+    screenings = make_screenings(count)
+
+    started = time.perf_counter()
+    loop_scores = [
+        [
+            scoring.final_score(
+                scoring.weighted_score(s["analysis"], REQUIREMENTS, s["resume"], s["candidate_exp"], profile=profile),
+                s["quality_multiplier"],
+            )
+            for s in screenings
+        ]
+        for profile in profiles
+    ]
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = JobScoringBatch.from_screenings(REQUIREMENTS, screenings)
+    build_time = time.perf_counter() - started
+    started = time.perf_counter()
+    batch_scores = batch.final_scores(profiles)
+    score_time = time.perf_counter() - started
+
+    assert np.array_equal(batch_scores, np.array(loop_scores)), "Vectorized scores differ from the scalar function."
+    return {
+        "candidates": count,
+        "profiles": len(profiles),
+        "dict_loop_s": round(loop_time, 4),
+        "columns_build_s": round(build_time, 4),
+        "vectorized_score_s": round(score_time, 4),
+        "speedup_scoring": round(loop_time / score_time, 1),
+        "speedup_including_build": round(loop_time / (build_time + score_time), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--profiles", type=int, default=3, help="Number of weight profiles scored per pass.")
+    args = parser.parse_args()
+    profiles = make_what_if_profiles(args.profiles)
+    for count in args.candidates:
+        print(run(count, profiles))
@@ -0,0 +1,237 @@
+"""
+Local stand-in for the Groq chat-completions API, for benchmarks that must not spend quota.
+
+    python -m benchmarks.fake_groq --port 8001 --latency-ms 800 --throttle-rate 0.02 --tpm 60000
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8001. Every prompt of analyzer.prompts
+gets a canned JSON answer derived from the text it carries (JD skills found in the resume,
+the resume's email and date ranges, ...), so the pipeline runs end to end with plausible
+output. Latency is drawn per request from a fixed, uniform or lognormal distribution plus a
+per-output-token cost; 429s are injected at random and whenever a model's requests or tokens
+per minute would be exceeded, with a retry-after header like the real API. GET /stats returns
+the request counters.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+import zlib
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Phrases identifying each prompt template of analyzer.prompts.
+PROMPT_KINDS = [
+    ("repair", "### CORRECTION ###"),
+    ("single_pass", "Read the resume once"),
+    ("jd", "structured hiring rubric"),
+    ("skill_analysis", "optimistic AI recruitment analyst"),
+    ("holistic", "You are a data extraction tool"),
+    ("experience", "You are a specialized calculator"),
+    ("quality", "assessing the quality of a candidate's resume"),
+]
+
+KNOWN_SKILLS = [
+    "Python", "Java", "Go", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "PostgreSQL", "MySQL",
+    "FastAPI", "Django", "Flask", "Spring Boot", "Docker", "Kubernetes", "AWS", "Azure", "GCP",
+    "Terraform", "Redis", "Kafka", "Git", "REST APIs", "Machine Learning",
+]
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_DATE_RANGE = re.compile(r"((?:[A-Z][a-z]{2,8}\s+)?\d{4})\s*[-–]\s*((?:[A-Z][a-z]{2,8}\s+)?\d{4}|Present|Current)", re.IGNORECASE)
+_YEARS = re.compile(r"(\d+)\+?\s*(?:years|yrs)", re.IGNORECASE)
+
+
+def _between(prompt: str, start: str, end: str) -> str:
+    _, _, rest = prompt.partition(start)
+    return rest.partition(end)[0] if rest else ""
+
+
+def _mentions(text: str, skill: str) -> int:
+    return len(re.findall(rf"(?<!\w){re.escape(skill)}(?!\w)", text, re.IGNORECASE))
+
+
+def _skill_analysis(prompt: str, resume_text: str) -> dict:
+    try:
+        skills = json.loads(_between(prompt, "### REQUIRED SKILLS (JSON from Job Description) ###", "### END OF REQUIRED SKILLS ###"))
+    except ValueError:
+        skills = {}
+
+    def matches(names):
+        return [
+            {"skill": name, "proficiency_level": min(3, _mentions(resume_text, name)), "evidence_from_resume": f"Mentions {name}."}
+            for name in names
+        ]
+    return {
+        "skill_match_analysis": {
+            "must_have_matches": matches(skills.get("must_have_skills", [])),
+            "nice_to_have_matches": matches(skills.get("nice_to_have_skills", [])),
+        },
+        "executive_summary": "Candidate with relevant experience; a few of the requested skills are not evident.",
+    }
+
+
+def _holistic(resume_text: str) -> dict:
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    email = _EMAIL.search(resume_text)
+    experience = []
+    for line in lines:
+        match = _DATE_RANGE.search(line)
+        if match:
+            experience.append({"title": line[:match.start()].strip(" ,|") or "Role", "duration": f"{match.group(1)} - {match.group(2)}"})
+    return {
+        "full_name": lines[0] if lines else "Unknown",
+        "contact_info": email.group(0) if email else "Not Found",
+        "experience_and_projects": experience,
+        "certifications_and_awards": [line for line in lines if "certif" in line.lower()][:3],
+        "leadership_and_extracurriculars": [line for line in lines if "led " in line.lower()][:3],
+    }
+
+
+def _quality(resume_text: str) -> dict:
+    return {"quality_score": round(0.65 + (zlib.crc32(resume_text.encode()) % 31) / 100, 2), "red_flags": []}
+
+
+def canned_response(prompt: str) -> dict:
+    """The answer to one prompt, by the template it was made from."""
+    kind = next((kind for kind, marker in PROMPT_KINDS if marker in prompt), "unknown")
+    resume_text = _between(prompt, "### RESUME TEXT ###", "### END OF RESUME TEXT ###")
+    if kind == "repair":
+        fields = prompt.rsplit("following the schema above:", 1)[-1].strip().split(", ")
+        answer = canned_response(prompt.partition("### CORRECTION ###")[0])
+        return {field: answer.get(field) for field in fields}
+    if kind == "jd":
+        jd_text = _between(prompt, "### JOB DESCRIPTION TEXT ###", "### END OF JOB DESCRIPTION TEXT ###")
+        found = [skill for skill in KNOWN_SKILLS if _mentions(jd_text, skill)]
+        years = _YEARS.search(jd_text)
+        return {
+            "job_title": (jd_text.strip().splitlines() or ["Software Engineer"])[0][:80],
+            "seniority_level": "Senior" if "senior" in jd_text.lower() else "Mid-level",
+            "required_experience_years": int(years.group(1)) if years else 0,
+            "must_have_skills": found[:5],
+            "nice_to_have_skills": found[5:10],
+        }
+    if kind == "skill_analysis":
+        return _skill_analysis(prompt, resume_text)
+    if kind == "holistic":
+        return _holistic(resume_text)
+    if kind == "experience":
+        entries = json.loads(_between(prompt, "### EXPERIENCE LIST ###", "### END OF EXPERIENCE LIST ###") or "[]")
+        return {"total_experience_years": float(len(entries))}
+    if kind == "quality":
+        return _quality(resume_text)
+    if kind == "single_pass":
+        response = {**_skill_analysis(prompt, resume_text), "quality": _quality(resume_text)}
+        if "SECTION: resume" in prompt:
+            response["resume"] = _holistic(resume_text)
+        return response
+    return {}
+
+
+class _Bucket:
+    def __init__(self, per_minute: Optional[float]):
+        self.rate = per_minute / 60.0 if per_minute else None
+        self.capacity = per_minute or 0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, amount: float) -> Optional[float]:
+        """Takes `amount`, or returns how many seconds until it would be available."""
+        if self.rate is None:
+            return None
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            self.level -= amount
+            return None
+        return (amount - self.level) / self.rate
+
+
+def create_app(settings: argparse.Namespace) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    rng = random.Random(settings.seed)
+    buckets: Dict[str, tuple] = {}
+    stats = {"requests": 0, "completed": 0, "throttled": 0, "injected_throttles": 0, "prompt_tokens": 0, "completion_tokens": 0, "by_kind": {}}
+
+    def latency(completion_tokens: int) -> float:
+        base = settings.latency_ms / 1000
+        if settings.latency_dist == "uniform":
+            base = rng.uniform(0, 2 * base)
+        elif settings.latency_dist == "lognormal":
+            base = rng.lognormvariate(0, settings.latency_sigma) * base
+        return base + completion_tokens * settings.ms_per_output_token / 1000
+
+    def throttled(retry_after: float, reason: str) -> JSONResponse:
+        stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": f"{max(retry_after, 0.1):.2f}"},
+            content={"error": {"message": f"Rate limit reached: {reason}", "type": "tokens", "code": "rate_limit_exceeded"}},
+        )
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "unknown")
+        prompt = "\n".join(message.get("content") or "" for message in body.get("messages", []))
+        if rng.random() < settings.throttle_rate:
+            stats["injected_throttles"] += 1
+            return throttled(settings.retry_after, "injected")
+
+        answer = canned_response(prompt)
+        content = json.dumps(answer)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        requests_bucket, tokens_bucket = buckets.setdefault(model, (_Bucket(settings.rpm), _Bucket(settings.tpm)))
+        wait = requests_bucket.take(1) or tokens_bucket.take(prompt_tokens + completion_tokens)
+        if wait:
+            return throttled(wait, "requests or tokens per minute")
+
+        await asyncio.sleep(latency(completion_tokens))
+        kind = next((kind for kind, marker in PROMPT_KINDS if marker in prompt), "unknown")
+        stats["by_kind"][kind] = stats["by_kind"].get(kind, 0) + 1
+        stats["completed"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    @app.get("/stats")
+    async def read_stats():
+        return stats
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median (lognormal) or mean latency per request.")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread of the lognormal distribution.")
+    parser.add_argument("--ms-per-output-token", type=float, default=2.0, help="Added latency per completion token.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with an injected 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds of injected 429s.")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests per minute per model (default: unlimited).")
+    parser.add_argument("--tpm", type=float, default=None, help="Tokens per minute per model (default: unlimited).")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = build_parser().parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,80 @@
+"""
+Measures how long PDF extraction stalls the event loop, comparing the old inline
+PyMuPDF call against the process-pool extraction service in analyzer.parsers.
+
+    python -m benchmarks.pdf_extraction_stall --resumes 100 --pages 3
+"""
+import argparse
+import asyncio
+import time
+
+import fitz
+
+from analyzer import parsers
+
+SAMPLE_LINE = "Built and operated FastAPI services on PostgreSQL with Docker, Kubernetes and AWS; improved p95 latency by 35%."
+
+
+def make_synthetic_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        for line_number in range(lines_per_page):
+            page.insert_text((40, 40 + line_number * 16), f"{page_number}.{line_number} {SAMPLE_LINE}", fontsize=9)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+async def _watch_loop(interval: float, stop: asyncio.Event, lags: list):
+    # Every tick that arrives late is time the loop spent unable to serve anything else.
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(mode: str, documents: list, interval: float) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(_watch_loop(interval, stop, lags))
+    await asyncio.sleep(interval)
+
+    async def extract_inline(content: bytes):
+        return parsers.extract_pdf_document(content)
+
+    extract = extract_inline if mode == "inline" else parsers.extract_pdf_document_async
+    started = time.perf_counter()
+    results = await asyncio.gather(*(extract(content) for content in documents))
+    wall_time = time.perf_counter() - started
+
+    stop.set()
+    await watcher
+    assert all(result["text"] for result in results)
+    return {
+        "mode": mode,
+        "documents": len(documents),
+        "wall_time_s": round(wall_time, 3),
+        "max_loop_stall_ms": round(max(lags, default=0.0) * 1000, 1),
+        "total_loop_stall_ms": round(sum(lags) * 1000, 1),
+    }
+
+
+async def main(resumes: int, pages: int, interval: float):
+    documents = [make_synthetic_pdf(pages) for _ in range(resumes)]
+    # Start the pool's workers before timing so process spawn cost is not counted.
+    await parsers.extract_pdf_document_async(documents[0])
+    try:
+        for mode in ("inline", "process_pool"):
+            print(await _run(mode, documents, interval))
+    finally:
+        parsers.shutdown_extraction_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.005, help="Event-loop probe interval in seconds.")
+    args = parser.parse_args()
+    asyncio.run(main(args.resumes, args.pages, args.interval))
@@ -0,0 +1,133 @@
+"""
+Agreement of the single-pass pipeline with the multi-call one on a fixed resume corpus.
+
+    python -m benchmarks.pipeline_modes [--resumes path/to/pdfs] [--jd jd.txt] [--output report.json]
+
+Every resume is analyzed in both modes with the LLM cache off (GROQ_API_KEY needed). The
+report has the LLM calls and tokens per resume of each mode, how many single-pass sections
+had to be asked for again, and how closely the single-pass results agree with the multi-call
+ones: skill levels, quality score, experience years, contact info, final score and ranking.
+Without --resumes the synthetic resumes of benchmarks.prompt_compaction are used.
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import cache, token_usage
+from analyzer.main import analyze_single_resume, deconstruct_jd
+from analyzer.parsers import extract_pdf_document
+from benchmarks.prompt_compaction import REQUIREMENTS, load_resumes
+
+SECTION_STAGES = ["skill_analysis", "holistic", "quality"]
+
+
+async def run_mode(structured_jd: dict, documents: list, mode: str) -> tuple:
+    """Results of every resume in one mode, and the token usage of the run."""
+    token_usage.reset()
+    results = await asyncio.gather(*(
+        analyze_single_resume(structured_jd, document, name, pipeline_mode=mode) for name, document in documents
+    ), return_exceptions=True)
+    results = [None if isinstance(result, Exception) or "error" in result else result for result in results]
+    return results, token_usage.token_usage_report()
+
+
+def _levels(result: dict) -> dict:
+    matches = result["llm_analysis"].get("skill_match_analysis", {})
+    levels = {}
+    for match in matches.get("must_have_matches", []) + matches.get("nice_to_have_matches", []):
+        try:
+            levels[str(match.get("skill", "")).strip().lower()] = int(match.get("proficiency_level"))
+        except (TypeError, ValueError):
+            continue
+    return levels
+
+
+def _ranks(values: list) -> np.ndarray:
+    return np.argsort(np.argsort(values)).astype(float)
+
+
+def agreement(multi: list, single: list) -> dict:
+    pairs = [(a, b) for a, b in zip(multi, single) if a is not None and b is not None]
+    if not pairs:
+        return {"compared": 0}
+    skills_compared = skills_equal = skills_within_one = 0
+    for a, b in pairs:
+        levels_a, levels_b = _levels(a), _levels(b)
+        for skill in levels_a.keys() & levels_b.keys():
+            skills_compared += 1
+            skills_equal += levels_a[skill] == levels_b[skill]
+            skills_within_one += abs(levels_a[skill] - levels_b[skill]) <= 1
+
+    def mean_abs_diff(value):
+        return round(float(np.mean([abs(float(value(a)) - float(value(b))) for a, b in pairs])), 4)
+
+    scores_a = [float(a["final_score"]) for a, _ in pairs]
+    scores_b = [float(b["final_score"]) for _, b in pairs]
+    rank_correlation = None
+    if len(pairs) > 2:
+        rank_correlation = round(float(np.corrcoef(_ranks(scores_a), _ranks(scores_b))[0, 1]), 4)
+    return {
+        "compared": len(pairs),
+        "skill_levels_compared": skills_compared,
+        "skill_level_exact": round(skills_equal / skills_compared, 4) if skills_compared else None,
+        "skill_level_within_one": round(skills_within_one / skills_compared, 4) if skills_compared else None,
+        "quality_score_mean_abs_diff": mean_abs_diff(lambda r: r["quality_assessment"]["quality_score"]),
+        "experience_years_mean_abs_diff": mean_abs_diff(lambda r: r["llm_analysis"]["experience_match_analysis"]["calculated_candidate_years"]),
+        "contact_info_equal": round(float(np.mean([
+            str(a["structured_resume"].get("contact_info", "")).lower() == str(b["structured_resume"].get("contact_info", "")).lower()
+            for a, b in pairs
+        ])), 4),
+        "final_score_mean_abs_diff": mean_abs_diff(lambda r: r["final_score"]),
+        "final_score_rank_correlation": rank_correlation,
+    }
+
+
+def mode_summary(results: list, usage: dict, resumes: int) -> dict:
+    stages = usage["stages"]
+    return {
+        "failed": sum(result is None for result in results),
+        "llm_calls_per_resume": round(sum(stage["calls"] for stage in stages.values()) / resumes, 3),
+        "prompt_tokens_per_resume": round(usage["prompt_tokens"] / resumes, 1),
+        "completion_tokens_per_resume": round(usage["completion_tokens"] / resumes, 1),
+        "calls_by_stage": {name: stage["calls"] for name, stage in stages.items()},
+    }
+
+
+async def compare(path: str, count: int, jd_path: str) -> dict:
+    cache.set_llm_cache(None)
+    structured_jd = REQUIREMENTS
+    if jd_path:
+        structured_jd = await deconstruct_jd(Path(jd_path).read_text())
+        if "error" in structured_jd:
+            raise SystemExit(f"Could not deconstruct the job description: {structured_jd['error']}")
+    documents = [(name, extract_pdf_document(data)) for name, data in load_resumes(path, count)]
+    documents = [(name, document) for name, document in documents if document["text"]]
+
+    multi, multi_usage = await run_mode(structured_jd, documents, "multi_call")
+    single, single_usage = await run_mode(structured_jd, documents, "single_pass")
+    retried = {stage: single_usage["stages"].get(stage, {}).get("calls", 0) for stage in SECTION_STAGES}
+    return {
+        "resumes": len(documents),
+        "multi_call": mode_summary(multi, multi_usage, len(documents)),
+        "single_pass": {
+            **mode_summary(single, single_usage, len(documents)),
+            "sections_retried": retried,
+        },
+        "agreement": agreement(multi, single),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", default=None, help="Directory of PDF resumes (default: synthetic ones).")
+    parser.add_argument("--count", type=int, default=20, help="Number of synthetic resumes.")
+    parser.add_argument("--jd", default=None, help="Job description text file (default: a fixed backend role).")
+    parser.add_argument("--output", default=None, help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+    report = asyncio.run(compare(args.resumes, args.count, args.jd))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
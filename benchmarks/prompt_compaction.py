@@ -0,0 +1,126 @@
+"""
+Token accounting of the per-resume prompts with and without prompt compaction.
+
+    python -m benchmarks.prompt_compaction [--resumes path/to/pdfs] [--live]
+
+By default the prompts are only built, and their tokens estimated, for a set of synthetic
+two-page resumes. With --live every resume is analyzed for real in both modes (GROQ_API_KEY
+needed, LLM cache off) and the prompt and completion tokens reported by the provider are shown.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from pathlib import Path
+
+import fitz
+
+# analyzer.main creates the Groq client at import time; offline runs never call it.
+os.environ.setdefault("GROQ_API_KEY", "offline")
+
+from analyzer import cache, config, token_usage  # noqa: E402
+from analyzer.compaction import count_tokens  # noqa: E402
+from analyzer.main import analyze_single_resume, build_resume_prompts  # noqa: E402
+from analyzer.parsers import extract_pdf_document  # noqa: E402
+
+REQUIREMENTS = {
+    "job_title": "Backend Engineer",
+    "seniority_level": "Mid-level",
+    "required_experience_years": 3,
+    "must_have_skills": ["Python", "SQL", "FastAPI", "Docker", "AWS"],
+    "nice_to_have_skills": ["Kubernetes", "Terraform", "Redis"],
+}
+STAGES = ["skill_analysis", "holistic", "quality"]
+
+
+def synthetic_resume(seed: int) -> bytes:
+    """A two-page resume with the artifacts PyMuPDF typically returns: wrapped and hyphenated
+    lines, bullet glyphs, column spacing and a header/footer repeated on each page."""
+    rng = random.Random(seed)
+    skills = rng.sample(["Python", "SQL", "FastAPI", "Docker", "AWS", "Kubernetes", "Redis", "Java", "React", "Go"], 6)
+    def bullets():
+        return "\n".join([
+            f"•   Built and main-\ntained {rng.choice(skills)} services handling {rng.randint(1, 50)}M requests per day with\na focus on reliability, observability and cost.",
+            f"●   Reduced p95 latency by {rng.randint(10, 60)}% by rewriting the {rng.choice(skills)} data\naccess layer and adding caching.",
+            f"▪   Led a team of {rng.randint(2, 8)} engineers through the migration of a monolith to\n{rng.choice(skills)}-based microservices.",
+        ])
+
+    pages = [
+        f"JANE DOE {seed}\njane{seed}@example.com   |   +1 555 0100   |   github.com/jane{seed}\nCURRICULUM VITAE\n\n"
+        "SUMMARY\nBackend engineer with a track record of building scalable sys-\ntems for fintech and e-commerce clients.\n\n"
+        "EXPERIENCE\n" + "\n".join(
+            f"Senior Engineer, Company {job}        Jan {2015 + 2 * job} - Dec {2016 + 2 * job}\n" + bullets()
+            for job in range(3)
+        ),
+        "PROJECTS\n" + "\n".join(
+            f"Project {index}: {rng.choice(skills)} platform\n•   Designed the   architecture and implemented the core\nmodules." for index in range(3)
+        ) + "\n\nSKILLS\n" + ",   ".join(skills) + "\n\nEDUCATION\nB.Sc. Computer Science, State University        2011 - 2015\n\n"
+        "REFERENCES\nAvailable upon request.\nJohn Smith, Engineering Manager, Company 1",
+    ]
+    doc = fitz.open()
+    for number, text in enumerate(pages, start=1):
+        page = doc.new_page()
+        page.insert_text((40, 30), f"Jane Doe {seed} — Resume — Confidential", fontsize=8)
+        page.insert_text((40, 60), text, fontsize=9)
+        page.insert_text((280, 820), f"Page {number} of {len(pages)}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def load_resumes(path: str, count: int) -> list:
+    if path:
+        return [(pdf.name, pdf.read_bytes()) for pdf in sorted(Path(path).glob("*.pdf"))]
+    return [(f"synthetic-{seed}.pdf", synthetic_resume(seed)) for seed in range(count)]
+
+
+def estimate(documents: list, compaction: bool) -> dict:
+    """Average estimated prompt tokens per stage and per resume."""
+    config.PROMPT_COMPACTION = compaction
+    totals = {stage: 0 for stage in STAGES}
+    for document in documents:
+        for stage, prompt in build_resume_prompts(REQUIREMENTS, document["text"]).items():
+            totals[stage] += count_tokens(prompt)
+    averages = {stage: round(total / len(documents), 1) for stage, total in totals.items()}
+    averages["per_resume"] = round(sum(averages.values()), 1)
+    return averages
+
+
+async def measure(documents: list, compaction: bool) -> dict:
+    """Provider-reported tokens per stage from real analyses."""
+    config.PROMPT_COMPACTION = compaction
+    token_usage.reset()
+    await asyncio.gather(*(
+        analyze_single_resume(REQUIREMENTS, document, f"resume-{index}") for index, document in enumerate(documents)
+    ))
+    return token_usage.token_usage_report()["stages"]
+
+
+def run(path: str, count: int, live: bool) -> dict:
+    documents = [extract_pdf_document(data) for _, data in load_resumes(path, count)]
+    documents = [document for document in documents if document["text"]]
+    before, after = estimate(documents, False), estimate(documents, True)
+    report = {
+        "resumes": len(documents),
+        "estimated_prompt_tokens": {
+            stage: {"before": before[stage], "after": after[stage], "reduction": f"{1 - after[stage] / before[stage]:.1%}"}
+            for stage in before
+        },
+    }
+    if live:
+        cache.set_llm_cache(None)
+        report["measured"] = {
+            "before": asyncio.run(measure(documents, False)),
+            "after": asyncio.run(measure(documents, True)),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", default=None, help="Directory of PDF resumes (default: synthetic ones).")
+    parser.add_argument("--count", type=int, default=20, help="Number of synthetic resumes.")
+    parser.add_argument("--live", action="store_true", help="Also run the real pipeline in both modes.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.resumes, args.count, args.live), indent=2))
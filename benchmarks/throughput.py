@@ -0,0 +1,259 @@
+"""
+End-to-end screening throughput of the API against the local Groq stand-in (benchmarks.fake_groq).
+
+    python -m benchmarks.throughput --sizes 10,100,1000 [--archive] [--spawn-fake] [--groq-url http://127.0.0.1:8001] [--output results.json]
+
+For each batch size a fresh job is screened through POST /screen/ and then as many more
+resumes are added through POST /jobs/{id}/add-candidates/, all with new synthetic PDFs so
+nothing is answered from the database. The app runs in this process (DATABASE_URL needed)
+and is called through httpx's ASGI transport, so the figures are the app's own: resumes per
+minute, p50/p95/p99 per-resume latency, event-loop lag, the time spent in database
+queries, and the process's peak resident memory after each request. With --archive each
+batch is uploaded as one zip file (needed above 1,000 files per request). The LLM cache is off and the per-model limits are raised unless set in the
+environment, so the fake's latency and 429s are what the pipeline has to absorb.
+
+The report is written as JSON (default benchmarks/results/throughput-<commit>.json) with the
+commit and settings it was measured with; --baseline prints the change against an earlier report.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import metrics  # Reads no configuration, unlike the modules imported in run().
+
+DEFAULT_GROQ_URL = "http://127.0.0.1:8001"
+
+JD_TEXT = """Backend Engineer ({tag})
+We are looking for a Mid-level backend engineer with 3+ years of experience.
+Must have: Python, SQL, FastAPI, Docker and AWS.
+Nice to have: Kubernetes, Terraform and Redis.
+"""
+
+
+def _configure_environment(groq_url: str):
+    # analyzer.config and the Groq client read these at import time.
+    os.environ["GROQ_BASE_URL"] = groq_url
+    os.environ.setdefault("GROQ_API_KEY", "offline")
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    for model in ("STRUCTURING", "ANALYSIS"):
+        os.environ.setdefault(f"{model}_MODEL_CONCURRENCY", "64")
+        os.environ.setdefault(f"{model}_MODEL_RPM", "1000000")
+        os.environ.setdefault(f"{model}_MODEL_TPM", "1000000000")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _percentiles(values: list, scale: float = 1.0) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * scale
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3), "max": round(float(max(values)) * scale, 3)}
+
+
+class Probes:
+    """Per-resume latency, event-loop lag and database time of the app under test."""
+
+    def __init__(self, screening_module, engine, lag_interval: float = 0.05):
+        self.latencies, self.loop_lag = [], []
+        self.db_queries, self.db_seconds = 0, 0.0
+        self.lag_interval = lag_interval
+        original = screening_module.process_and_save_resume
+
+        async def timed_process_and_save_resume(*args, **kwargs):
+            started = time.perf_counter()
+            coroutine = original(*args, **kwargs)
+            del args, kwargs  # Leave the resume bytes to the coroutine, which drops them after extraction.
+            try:
+                return await coroutine
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+        screening_module.process_and_save_resume = timed_process_and_save_resume
+
+        from sqlalchemy import event
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - conn.info["query_started_at"].pop()
+
+    def reset(self):
+        self.latencies, self.loop_lag = [], []
+        self.db_queries, self.db_seconds = 0, 0.0
+
+    async def sample_loop_lag(self):
+        while True:
+            expected = time.perf_counter() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _fake_stats(groq_url: str) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=groq_url, timeout=5) as client:
+        return (await client.get("/stats")).json()
+
+
+async def _timed_request(client, probes: Probes, groq_url: str, method: str, url: str, **kwargs) -> tuple:
+    """The measurements of one request, and its response body."""
+    probes.reset()
+    stats_before = await _fake_stats(groq_url)
+    sampler = asyncio.create_task(probes.sample_loop_lag())
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    finally:
+        sampler.cancel()
+    elapsed = time.perf_counter() - started
+    stats_after = await _fake_stats(groq_url)
+    body = response.json()
+    saved = len(body) if response.status_code == 200 else 0
+    return {
+        "status": response.status_code,
+        "error": body.get("detail") if response.status_code != 200 else None,
+        "saved": saved,
+        "seconds": round(elapsed, 3),
+        "resumes_per_minute": round(saved / elapsed * 60, 2) if elapsed else None,
+        "resume_latency_seconds": _percentiles(probes.latencies),
+        "loop_lag_ms": _percentiles(probes.loop_lag, 1000),
+        "db": {"queries": probes.db_queries, "seconds": round(probes.db_seconds, 3)},
+        "peak_rss_mb": round(metrics.peak_resident_memory_bytes() / 2**20, 1),
+        "llm": {
+            key: stats_after[key] - stats_before[key]
+            for key in ("requests", "completed", "throttled", "prompt_tokens", "completion_tokens")
+        },
+    }, body
+
+
+async def run(sizes: list, groq_url: str, archive: bool = False) -> list:
+    import httpx
+
+    from backend import screening
+    from backend.database import async_engine
+    from backend.main import app
+    from benchmarks.prompt_compaction import synthetic_resume
+
+    probes = Probes(screening, async_engine)
+    seed = time.time_ns() // 1000  # New resumes on every run, never seen by the database.
+    runs = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for size in sizes:
+            def batch():
+                nonlocal seed
+                seed += size
+                resumes = [(f"resume-{number}.pdf", synthetic_resume(number)) for number in range(seed - size, seed)]
+                if not archive:
+                    return [("resume_files", (name, data, "application/pdf")) for name, data in resumes]
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, "w") as zipped:
+                    for name, data in resumes:
+                        zipped.writestr(name, data)
+                return [("resume_files", ("resumes.zip", buffer.getvalue(), "application/zip"))]
+
+            tag = f"throughput {size} {seed}"
+            screen, screenings = await _timed_request(
+                client, probes, groq_url, "POST", "/screen/",
+                data={"job_title": f"Backend Engineer ({tag})"},
+                files=[("jd_file", ("jd.txt", JD_TEXT.format(tag=tag).encode(), "text/plain"))] + batch(),
+            )
+            print(f"/screen/ with {size} resumes: {screen['resumes_per_minute']} resumes/min, p95 {screen['resume_latency_seconds']['p95']}s")
+            result = {"size": size, "screen": screen}
+            if screen["status"] == 200:
+                result["add_candidates"], _ = await _timed_request(
+                    client, probes, groq_url, "POST", f"/jobs/{screenings[0]['job_id']}/add-candidates/", files=batch(),
+                )
+                print(f"/add-candidates/ with {size} resumes: {result['add_candidates']['resumes_per_minute']} resumes/min")
+            runs.append(result)
+    return runs
+
+
+def _spawn_fake(groq_url: str, fake_args: list) -> subprocess.Popen:
+    port = groq_url.rsplit(":", 1)[-1].strip("/")
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_groq", "--port", port] + fake_args)
+    for _ in range(100):
+        try:
+            asyncio.run(_fake_stats(groq_url))
+            return process
+        except Exception:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"The fake Groq server did not start on {groq_url}.")
+
+
+def compare_to_baseline(report: dict, baseline: dict) -> list:
+    """Relative change of throughput and latency per batch size and endpoint."""
+    previous = {run["size"]: run for run in baseline.get("runs", [])}
+    changes = []
+    for run in report["runs"]:
+        for endpoint in ("screen", "add_candidates"):
+            old, new = previous.get(run["size"], {}).get(endpoint), run.get(endpoint)
+            if not old or not new or not old.get("resumes_per_minute"):
+                continue
+            changes.append({
+                "size": run["size"],
+                "endpoint": endpoint,
+                "resumes_per_minute": round(new["resumes_per_minute"] / old["resumes_per_minute"] - 1, 4),
+                "resume_latency_p95": round(new["resume_latency_seconds"]["p95"] / old["resume_latency_seconds"]["p95"] - 1, 4)
+                if old["resume_latency_seconds"]["p95"] else None,
+            })
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100", help="Comma-separated batch sizes (resumes per request).")
+    parser.add_argument("--groq-url", default=DEFAULT_GROQ_URL, help="Base URL of the fake Groq server.")
+    parser.add_argument("--archive", action="store_true", help="Upload each batch as one zip file.")
+    parser.add_argument("--spawn-fake", action="store_true", help="Start benchmarks.fake_groq for the run.")
+    parser.add_argument("--fake-args", default="", help="Extra options for the spawned fake, e.g. \"--throttle-rate 0.05 --tpm 200000\".")
+    parser.add_argument("--output", default=None, help="Report file (default: benchmarks/results/throughput-<commit>.json).")
+    parser.add_argument("--baseline", default=None, help="An earlier report to compare with.")
+    args = parser.parse_args()
+
+    _configure_environment(args.groq_url)
+    fake = _spawn_fake(args.groq_url, args.fake_args.split()) if args.spawn_fake else None
+    try:
+        commit = _git_commit()
+        report = {
+            "commit": commit,
+            "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "settings": {
+                "groq_url": args.groq_url,
+                "archive": args.archive,
+                "fake_args": args.fake_args if args.spawn_fake else None,
+                "pipeline_mode": os.getenv("PIPELINE_MODE", "multi_call"),
+                "model_limits": {key: value for key, value in os.environ.items() if key.endswith(("_MODEL_CONCURRENCY", "_MODEL_RPM", "_MODEL_TPM"))},
+            },
+        }
+        report["runs"] = asyncio.run(run([int(size) for size in args.sizes.split(",")], args.groq_url, args.archive))
+    finally:
+        if fake:
+            fake.terminate()
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        report["compared_to"] = {"commit": baseline.get("commit"), "changes": compare_to_baseline(report, baseline)}
+        print(json.dumps(report["compared_to"], indent=2))
+
+    output = Path(args.output or f"benchmarks/results/throughput-{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output}")
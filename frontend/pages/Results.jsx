@@ -6,6 +6,10 @@ export default function Results() {
   const { jobId } = useParams();
   const navigate = useNavigate();
   const [screenings, setScreenings] = useState([]);
+  const [jobTitle, setJobTitle] = useState("Job Results");
+  const [totalCount, setTotalCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [notFound, setNotFound] = useState(false);
@@ -20,9 +24,31 @@ export default function Results() {
     fetchScreenings();
   }, [jobId]);
 
+  const PAGE_SIZE = 50;
+
+  const fetchRankedPage = (cursor) => {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (cursor) {
+      params.set("after_score", cursor.afterScore);
+      params.set("after_id", cursor.afterId);
+    }
+    return fetch(`${API_BASE_URL}/jobs/${jobId}/ranked-screenings/?${params}`);
+  };
+
+  const applyPage = (page, append) => {
+    setScreenings((prev) => (append ? [...prev, ...page.items] : page.items));
+    setJobTitle(page.job_title);
+    setTotalCount(page.total_count);
+    setNextCursor(
+      page.next_after_id !== null
+        ? { afterScore: page.next_after_score, afterId: page.next_after_id }
+        : null
+    );
+  };
+
   const fetchScreenings = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/screenings/`);
+      const response = await fetchRankedPage(null);
 
       if (response.status === 404) {
         setNotFound(true);
@@ -35,7 +61,7 @@ export default function Results() {
       }
 
       const data = await response.json();
-      setScreenings(data);
+      applyPage(data, false);
       setNotFound(false);
     } catch (err) {
       setError(err.message);
@@ -44,6 +70,35 @@ export default function Results() {
     }
   };
 
+  const loadMoreScreenings = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetchRankedPage(nextCursor);
+      if (!response.ok) {
+        throw new Error("Failed to fetch screenings");
+      }
+      applyPage(await response.json(), true);
+    } catch (err) {
+      alert(`Error loading more candidates: ${err.message}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // The ranked list only carries summary fields; the full analysis is fetched on demand.
+  const openAnalysis = async (screeningId) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/screenings/${screeningId}`);
+      if (!response.ok) {
+        throw new Error("Failed to fetch screening details");
+      }
+      setSelectedCandidate(await response.json());
+    } catch (err) {
+      alert(`Error loading analysis: ${err.message}`);
+    }
+  };
+
   const handleAddResumes = async (e) => {
     const files = Array.from(e.target.files);
     if (files.length === 0) return;
@@ -215,9 +270,6 @@ export default function Results() {
     );
   }
 
-  const jobTitle =
-    screenings.length > 0 ? screenings[0].job.title : "Job Results";
-
   return (
     <div className="min-h-screen bg-gradient-to-br from-indigo-50 via-white to-purple-50">
       <div className="max-w-7xl mx-auto p-6">
@@ -263,8 +315,8 @@ export default function Results() {
                       d="M17 20h5v-2a3 3 0 00-5.356-1.857M17 20H7m10 0v-2c0-.656-.126-1.283-.356-1.857M7 20H2v-2a3 3 0 015.356-1.857M7 20v-2c0-.656.126-1.283.356-1.857m0 0a5.002 5.002 0 019.288 0M15 7a3 3 0 11-6 0 3 3 0 016 0zm6 3a2 2 0 11-4 0 2 2 0 014 0zM7 10a2 2 0 11-4 0 2 2 0 014 0z"
                     />
                   </svg>
-                  {screenings.length} candidate
-                  {screenings.length !== 1 ? "s" : ""} ranked
+                  {totalCount} candidate
+                  {totalCount !== 1 ? "s" : ""} ranked
                 </p>
               </div>
 
@@ -344,7 +396,7 @@ export default function Results() {
           <div className="grid gap-4">
             {screenings.map((screening, index) => {
               const summary =
-                screening.skill_match_analysis?.executive_summary ||
+                screening.executive_summary ||
                 "Executive summary not available for this screening.";
               const score = parseFloat(screening.final_score);
 
@@ -366,13 +418,21 @@ export default function Results() {
 
                       <div className="flex-1">
                         <h3 className="text-xl font-bold text-gray-900 mb-2">
-                          {screening.candidate.full_name || "Unknown Candidate"}
+                          {screening.full_name || "Unknown Candidate"}
+                          {screening.provisional && (
+                            <span
+                              className="ml-2 align-middle text-xs font-medium text-amber-800 bg-amber-100 px-2 py-0.5 rounded"
+                              title="Keyword-based score; this resume was not shortlisted for the AI analysis."
+                            >
+                              Provisional
+                            </span>
+                          )}
                         </h3>
                         <p className="text-gray-600 text-sm leading-relaxed mb-3">
                           {summary}
                         </p>
                         <button
-                          onClick={() => setSelectedCandidate(screening)}
+                          onClick={() => openAnalysis(screening.id)}
                           className="text-indigo-600 hover:text-indigo-800 text-sm font-medium flex items-center gap-1 transition"
                         >
                           View Detailed Analysis
@@ -416,7 +476,7 @@ export default function Results() {
                         onClick={(e) =>
                           handleDeleteScreening(
                             screening.id,
-                            screening.candidate.full_name,
+                            screening.full_name,
                             e
                           )
                         }
@@ -465,6 +525,15 @@ export default function Results() {
                 </div>
               );
             })}
+            {nextCursor && (
+              <button
+                onClick={loadMoreScreenings}
+                disabled={loadingMore}
+                className="bg-white text-indigo-600 border border-indigo-200 px-6 py-3 rounded-lg hover:bg-indigo-50 transition shadow-sm disabled:text-gray-400"
+              >
+                {loadingMore ? "Loading..." : "Load More Candidates"}
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -16,36 +16,77 @@ export default function Upload() {
   useEffect(() => {
     if (!loading) {
       setProgressSteps([]);
-      return;
     }
+  }, [loading]);
 
-    const steps = [
-      { text: "Deconstructing job description...", delay: 300 },
-      { text: "✓ Job description analyzed", delay: 1500 },
-    ];
-    formData.resumeFiles.forEach((file, idx) => {
-      steps.push(
-        { text: `Processing ${file.name}...`, delay: 2000 + idx * 5000 },
-        { text: `  • Extracting text from PDF...`, delay: 2300 + idx * 5000 },
-        { text: `  • Analyzing skills...`, delay: 2800 + idx * 5000 },
-        { text: `  • Parsing experience data...`, delay: 3500 + idx * 5000 },
-        { text: `  • Assessing resume quality...`, delay: 4200 + idx * 5000 },
-        { text: `  • Calculating match score...`, delay: 4800 + idx * 5000 },
-        { text: `✓ ${file.name} analyzed`, delay: 5500 + idx * 5000 }
-      );
-    });
+  // Turns a batch event from the server into a progress line, or null to skip it.
+  const describeEvent = (event) => {
+    switch (event.type) {
+      case "jd_started":
+        return "Deconstructing job description...";
+      case "jd_finished":
+        if (event.reused) return `✓ Same job description as "${event.job_title}", reusing its analysis`;
+        return event.near_duplicates?.length
+          ? `✓ Job description analyzed (similar to "${event.near_duplicates[0].title}")`
+          : "✓ Job description analyzed";
+      case "resume_extracted":
+        return `Processing ${event.resume}...`;
+      case "stage":
+        return event.status === "started"
+          ? `  • ${event.resume}: ${event.stage.replace("_", " ")}...`
+          : null;
+      case "resume_saved":
+        return `✓ ${event.resume} analyzed (score ${parseFloat(
+          event.screening.final_score
+        ).toFixed(1)})`;
+      case "shortlist_finished":
+        return `Shortlisted ${event.shortlisted} resumes for AI analysis; ${event.provisional} get a provisional keyword score`;
+      case "resume_skipped":
+        return `– ${event.resume} skipped: ${event.reason}`;
+      case "resume_failed":
+        return `✗ ${event.resume} failed: ${event.reason}`;
+      default:
+        return null;
+    }
+  };
 
-    const timers = steps.map((step, index) => {
-      return setTimeout(() => {
-        setProgressSteps((prev) => [...prev, step.text]);
-      }, step.delay);
+  const followBatch = (batchId) =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(
+        `${API_BASE_URL}/batches/${batchId}/events`
+      );
+      const handle = (message) => {
+        const event = JSON.parse(message.data);
+        const text = describeEvent(event);
+        if (text) {
+          setProgressSteps((prev) => [...prev, text]);
+        }
+        if (event.type === "batch_completed" || event.type === "batch_failed") {
+          source.close();
+          resolve(event);
+        }
+      };
+      [
+        "jd_started",
+        "jd_finished",
+        "resume_queued",
+        "shortlist_finished",
+        "resume_extracted",
+        "stage",
+        "resume_saved",
+        "resume_skipped",
+        "resume_failed",
+        "batch_completed",
+        "batch_failed",
+      ].forEach((type) => source.addEventListener(type, handle));
+      source.onerror = () => {
+        // EventSource reconnects on its own while the batch is running.
+        if (source.readyState === EventSource.CLOSED) {
+          reject(new Error("Lost connection to the screening progress stream"));
+        }
+      };
     });
 
-    return () => {
-      timers.forEach((timer) => clearTimeout(timer));
-    };
-  }, [loading, formData.resumeFiles]);
-
   const handleSubmit = async (e) => {
     e.preventDefault();
     setLoading(true);
@@ -75,7 +116,7 @@ export default function Upload() {
         data.append("resume_files", file);
       });
 
-      const response = await fetch(`${API_BASE_URL}/screen/`, {
+      const response = await fetch(`${API_BASE_URL}/batches/`, {
         method: "POST",
         body: data,
       });
@@ -85,12 +126,16 @@ export default function Upload() {
         throw new Error(errorData.detail || "Upload failed");
       }
 
-      const screenings = await response.json();
+      const batch = await response.json();
+      const result = await followBatch(batch.batch_id);
 
-      if (screenings && screenings.length > 0) {
-        navigate(`/jobs/${screenings[0].job_id}`);
+      if (result.type === "batch_failed") {
+        throw new Error(result.reason || "Screening failed");
+      }
+      if (result.saved > 0) {
+        navigate(`/jobs/${result.job_id}`);
       } else {
-        throw new Error("No screenings were created");
+        throw new Error("No valid new resumes were processed.");
       }
     } catch (err) {
       setError(err.message);
@@ -0,0 +1,147 @@
+"""
+Saving a full analysis for a candidate first stored from a provisional (not shortlisted) result.
+Needs a Postgres DATABASE_URL; the tables are created and the rows written are removed.
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from backend import models, schemas, screening  # noqa: E402
+from backend.database import AsyncSessionLocal, async_engine  # noqa: E402
+from backend.migrations import upgrade_schema  # noqa: E402
+from backend.writer import ScreeningWriter  # noqa: E402
+
+STRUCTURED_JD = {"job_title": "Backend Engineer", "must_have_skills": ["Python"], "required_experience_years": 3}
+
+
+def _full_analysis(contact_info: str) -> dict:
+    return {
+        "final_score": 82.5,
+        "scoring_profile": "balanced",
+        "quality_assessment": {"quality_score": 0.9, "red_flags": []},
+        "llm_analysis": {"experience_match_analysis": {"calculated_candidate_years": 6.5}},
+        "structured_resume": {"full_name": "Ada Example", "contact_info": contact_info, "certifications": ["AWS"]},
+        "incomplete_stages": [],
+    }
+
+
+async def _provisional_then_full(monkeypatch) -> dict:
+    contact_info = f"ada-{uuid.uuid4().hex}@example.com"
+    resume_text = f"Ada Example\n{contact_info}\nPython developer since 2018"
+    resume_bytes = f"%PDF-1.4 {contact_info}".encode()
+
+    async def no_embeddings(texts):
+        raise RuntimeError("embeddings are not needed here")
+    monkeypatch.setattr(screening.embeddings, "embed_texts_async", no_embeddings)
+
+    known_resumes = []
+
+    async def analyze(**kwargs):
+        known_resumes.append(kwargs["known_resume"])
+        return _full_analysis(contact_info)
+    monkeypatch.setattr(screening, "analyze_single_resume", analyze)
+
+    async with AsyncSessionLocal() as db:
+        jobs = [models.Job(title=f"writer test {i}", raw_jd_text="jd", structured_jd=STRUCTURED_JD) for i in range(3)]
+        db.add_all(jobs)
+        await db.commit()
+    job_ids = [job.id for job in jobs]
+
+    provisional = {
+        "final_score": 40.0,
+        "quality_assessment": {"quality_score": 1.0, "red_flags": []},
+        "llm_analysis": {"experience_match_analysis": {"calculated_candidate_years": 5}},
+        "structured_resume": {"full_name": "Ada Example", "contact_info": contact_info},
+        "provisional": True,
+    }
+    try:
+        async with ScreeningWriter(flush_interval=0.05) as writer:
+            first = await screening.process_and_save_resume(
+                "ada.pdf", "application/pdf", resume_bytes, STRUCTURED_JD, job_ids[0], writer,
+                resume_document={"text": resume_text}, provisional_result=provisional
+            )
+            second = await screening.process_and_save_resume(
+                "ada.pdf", "application/pdf", resume_bytes, STRUCTURED_JD, job_ids[1], writer
+            )
+            third = await screening.process_and_save_resume(
+                "ada.pdf", "application/pdf", resume_bytes, STRUCTURED_JD, job_ids[2], writer
+            )
+        async with AsyncSessionLocal() as db:
+            candidate = await db.get(models.Candidate, first.candidate_id)
+            return {
+                "screenings": [first, second, third],
+                "structured_resume": candidate.structured_resume,
+                "total_experience": candidate.total_experience,
+                "known_resumes": known_resumes,
+            }
+    finally:
+        async with AsyncSessionLocal() as db:
+            candidate_ids = set()
+            for job_id in job_ids:
+                for row in (await db.execute(
+                    models.Screening.__table__.select().where(models.Screening.job_id == job_id)
+                )).all():
+                    candidate_ids.add(row.candidate_id)
+                await db.execute(models.Screening.__table__.delete().where(models.Screening.job_id == job_id))
+                await db.execute(models.Job.__table__.delete().where(models.Job.id == job_id))
+            await db.execute(models.Candidate.__table__.delete().where(models.Candidate.id.in_(candidate_ids)))
+            await db.commit()
+        await async_engine.dispose()
+
+
+def test_full_analysis_fills_in_provisional_candidate(monkeypatch):
+    upgrade_schema()
+    outcome = asyncio.run(_provisional_then_full(monkeypatch))
+
+    first, second, third = outcome["screenings"]
+    assert first.provisional and not second.provisional and not third.provisional
+    assert first.candidate_id == second.candidate_id == third.candidate_id
+    # The parse from the first full analysis is stored on the candidate...
+    assert outcome["structured_resume"]["certifications"] == ["AWS"]
+    assert float(outcome["total_experience"]) == 6.5
+    # ...and reused by the next job instead of being parsed again.
+    assert outcome["known_resumes"][0] is None
+    assert outcome["known_resumes"][1]["structured_resume"]["certifications"] == ["AWS"]
+    assert outcome["known_resumes"][1]["experience_years"] == 6.5
+
+
+def test_writer_keeps_an_existing_parse(monkeypatch):
+    upgrade_schema()
+
+    async def run():
+        contact_info = f"kept-{uuid.uuid4().hex}@example.com"
+        async with AsyncSessionLocal() as db:
+            job = models.Job(title="writer test", raw_jd_text="jd", structured_jd=STRUCTURED_JD)
+            candidate = models.Candidate(
+                contact_info=contact_info, full_name="Kept", raw_resume_text="text",
+                structured_resume={"full_name": "Kept", "certifications": []}, total_experience=2
+            )
+            db.add_all([job, candidate])
+            await db.commit()
+        try:
+            async with ScreeningWriter(flush_interval=0.05) as writer:
+                await writer.submit(
+                    job.id,
+                    schemas.ScreeningCreate(final_score=50, quality_multiplier=1, skill_match_analysis={}),
+                    candidate_id=candidate.id,
+                    parsed_resume={"structured_resume": {"full_name": "Other"}, "total_experience": 9},
+                )
+            async with AsyncSessionLocal() as db:
+                stored = await db.get(models.Candidate, candidate.id)
+                return stored.structured_resume, stored.total_experience
+        finally:
+            async with AsyncSessionLocal() as db:
+                await db.execute(models.Screening.__table__.delete().where(models.Screening.job_id == job.id))
+                await db.execute(models.Job.__table__.delete().where(models.Job.id == job.id))
+                await db.execute(models.Candidate.__table__.delete().where(models.Candidate.id == candidate.id))
+                await db.commit()
+            await async_engine.dispose()
+
+    structured_resume, total_experience = asyncio.run(run())
+    assert structured_resume == {"full_name": "Kept", "certifications": []}
+    assert float(total_experience) == 2